@@ -1,30 +1,217 @@
 import re
-from collections import Counter
-
-def analyze_document(text, current_linguist_profiles, content_type):
-    # Heuristic: Risk based on keywords and length
-    pii_keywords = ["SSN", "passport", "medical record", "DOB", "address", "phone", "email"]
-    technical_keywords = ["algorithm", "API", "compliance", "regulation", "contract", "legal", "pharma", "clinical"]
-    legal_keywords = ["court", "law", "contract", "agreement", "witness"]
-    medical_keywords = ["patient", "diagnosis", "treatment", "clinical", "pharma"]
-    word_count = len(text.split())
-    sentence_count = max(1, text.count('.') + text.count('!') + text.count('?'))
-    avg_sentence_length = word_count / sentence_count
-    
+import json
+from collections import Counter, deque
+from keyword_scanner import KeywordScanner
+import text_stats
+import pii_detector
+
+# Heuristic: Risk based on keywords and length
+PII_KEYWORDS = ["SSN", "passport", "medical record", "DOB", "address", "phone", "email"]
+TECHNICAL_KEYWORDS = ["algorithm", "API", "compliance", "regulation", "contract", "legal", "pharma", "clinical"]
+LEGAL_KEYWORDS = ["court", "law", "contract", "agreement", "witness"]
+MEDICAL_KEYWORDS = ["patient", "diagnosis", "treatment", "clinical", "pharma"]
+
+DEFAULT_KEYWORD_SETS = {
+    "pii": PII_KEYWORDS,
+    "technical": TECHNICAL_KEYWORDS,
+    "legal": LEGAL_KEYWORDS,
+    "medical": MEDICAL_KEYWORDS,
+}
+
+# Bump whenever blueprint logic changes so blueprints stored by earlier versions are not reused
+ANALYZER_VERSION = 3
+
+# Scanners are compiled once per distinct keyword configuration
+_scanners = {}
+
+def build_keyword_sets(extra_keywords=None):
+    """Return the default keyword lists extended with an organization's own keywords.
+
+    extra_keywords maps a category ("pii", "technical", "legal", "medical") to
+    additional keywords, which are matched case-insensitively.
+    """
+    keyword_sets = {category: list(keywords) for category, keywords in DEFAULT_KEYWORD_SETS.items()}
+    for category, keywords in (extra_keywords or {}).items():
+        if category not in keyword_sets:
+            raise ValueError(f"Unknown keyword category: {category}")
+        for kw in keywords:
+            if kw.lower() not in keyword_sets[category]:
+                keyword_sets[category].append(kw.lower())
+    return keyword_sets
+
+def analyzer_fingerprint(keyword_sets=None):
+    """Identifies the analyzer logic and keyword configuration a blueprint was produced with."""
+    return f"{ANALYZER_VERSION}:{json.dumps(keyword_sets or DEFAULT_KEYWORD_SETS, sort_keys=True)}"
+
+def _needle(category, keyword):
+    """The string searched for in the lowercased text."""
+    return keyword.lower() if category == "pii" else keyword
+
+def get_scanner(keyword_sets=None):
+    keyword_sets = keyword_sets or DEFAULT_KEYWORD_SETS
+    needles = frozenset(_needle(category, kw) for category, keywords in keyword_sets.items() for kw in keywords)
+    scanner = _scanners.get(needles)
+    if scanner is None:
+        scanner = _scanners.setdefault(needles, KeywordScanner(needles))
+    return scanner
+
+def scan_keywords(text, keyword_sets=None):
+    """Count and locate every keyword in text: {keyword: [count, first_offset]}."""
+    return get_scanner(keyword_sets).scan(text.lower())
+
+def analyze_document(text, current_linguist_profiles, content_type, keyword_sets=None):
+    return analyze_document_stream([text], current_linguist_profiles, content_type, keyword_sets)
+
+def analyze_document_stream(chunks, current_linguist_profiles, content_type, keyword_sets=None):
+    """Analyze a document supplied as an iterable of text chunks.
+
+    Chunks are consumed one at a time (e.g. from document_processor.iter_text),
+    so the full text never has to be held in memory. The result is the same as
+    analyze_document on the concatenated text.
+    """
+    partial = EMPTY_PARTIAL
+    for chunk in chunks:
+        partial = merge_partials(partial, analyze_chunk(chunk, keyword_sets), keyword_sets)
+    return reduce_partial(partial, current_linguist_profiles, content_type, keyword_sets)
+
+def analyze_document_parallel(chunks, current_linguist_profiles, content_type, keyword_sets=None, executor=None,
+                              max_pending=8):
+    """Like analyze_document_stream, but chunks are analyzed concurrently on executor.
+
+    Use a ProcessPoolExecutor for real parallelism (the keyword scan holds the GIL).
+    At most max_pending chunks are in the executor at once, so memory stays bounded.
+    """
+    if executor is None:
+        return analyze_document_stream(chunks, current_linguist_profiles, content_type, keyword_sets)
+    partial = EMPTY_PARTIAL
+    pending = deque()
+    for chunk in chunks:
+        pending.append(executor.submit(analyze_chunk, chunk, keyword_sets))
+        if len(pending) >= max_pending:
+            partial = merge_partials(partial, pending.popleft().result(), keyword_sets)
+    while pending:
+        partial = merge_partials(partial, pending.popleft().result(), keyword_sets)
+    return reduce_partial(partial, current_linguist_profiles, content_type, keyword_sets)
+
+# Partial statistics of an empty piece of text; merging with it changes nothing
+EMPTY_PARTIAL = {"length": 0, "stats": text_stats.EMPTY_CHUNK, "pii": pii_detector.EMPTY_PARTIAL, "hits": {},
+                 "head": "", "tail": ""}
+
+def analyze_chunk(chunk, keyword_sets=None):
+    """Map step: statistics of one chunk of text, independent of its neighbours.
+
+    Besides text statistics, personal data found and keyword hits, a partial keeps enough of its edges
+    (the first/last few characters, and the word fragments in the statistics) for
+    merge_partials to fix up words and keywords that straddle the boundary
+    between two chunks.
+    """
+    if not chunk:
+        return EMPTY_PARTIAL
+    scanner = get_scanner(keyword_sets)
+    edge = max(0, scanner.max_length - 1)
+    lowered = chunk.lower()
+    return {
+        "length": len(lowered),
+        "stats": text_stats.chunk_stats(chunk),
+        "pii": pii_detector.chunk(chunk),
+        "hits": scanner.scan(lowered),
+        "head": lowered[:edge],
+        "tail": lowered[-edge:] if edge else "",
+    }
+
+def merge_partials(a, b, keyword_sets=None):
+    """Combine the partials of two adjacent pieces of text (a before b). Associative."""
+    if not a["length"]:
+        return b
+    if not b["length"]:
+        return a
+    scanner = get_scanner(keyword_sets)
+    edge = max(0, scanner.max_length - 1)
+    hits = {kw: list(entry) for kw, entry in a["hits"].items()}
+    for kw, (count, first) in b["hits"].items():
+        _add_hits(hits, kw, count, a["length"] + first)
+    # Keywords that start in a and end in b were seen by neither
+    boundary = len(a["tail"])
+    straddling = scanner.scan(a["tail"] + b["head"], skip_before=boundary, starts_before=boundary)
+    for kw, (count, first) in straddling.items():
+        _add_hits(hits, kw, count, a["length"] - boundary + first)
+    return {
+        "length": a["length"] + b["length"],
+        "stats": text_stats.merge(a["stats"], b["stats"]),
+        "pii": pii_detector.merge(a["pii"], b["pii"]),
+        "hits": hits,
+        "head": (a["head"] + b["head"])[:edge],
+        "tail": (a["tail"] + b["tail"])[-edge:] if edge else "",
+    }
+
+def reduce_partial(partial, current_linguist_profiles, content_type, keyword_sets=None):
+    """Reduce step: the blueprint for a whole document from its merged partial."""
+    keyword_sets = keyword_sets or DEFAULT_KEYWORD_SETS
+    stats = text_stats.summarize(text_stats.finish(partial["stats"]))
+    pii = pii_detector.finish(partial["pii"])
+    return _build_blueprint(stats, pii, partial["hits"], content_type, keyword_sets)
+
+def _add_hits(hits, kw, count, first):
+    entry = hits.get(kw)
+    if entry is None:
+        hits[kw] = [count, first]
+    else:
+        entry[0] += count
+        entry[1] = min(entry[1], first)
+
+def score_complexity(stats):
+    """Low, Medium or High from a document's text statistics (see text_stats.summarize)."""
+    points = 0
+    # Length
+    if stats["tokens"] > 3000:
+        points += 2
+    elif stats["tokens"] > 1000:
+        points += 1
+    # Sentence structure
+    if stats["avg_sentence_length"] > 30 or stats["p90_sentence_length"] > 50:
+        points += 2
+    elif stats["avg_sentence_length"] > 20:
+        points += 1
+    # Readability (LIX: above 50 is difficult, above 60 very difficult)
+    if stats["lix"] > 60:
+        points += 2
+    elif stats["lix"] > 50:
+        points += 1
+    # Figures and dates all have to be checked and localized
+    if stats["number_density"] + stats["date_density"] > 0.1:
+        points += 1
+    # Varied vocabulary (only meaningful once a document has some length)
+    if stats["words"] >= 200 and stats["type_token_ratio"] > 0.6:
+        points += 1
+    if points >= 3:
+        return "High"
+    if points >= 1:
+        return "Medium"
+    return "Low"
+
+def sensitive_data_summary(pii, found_keywords):
+    """Alert text from the personal data values found (pii_detector.finish) and PII keywords mentioned."""
+    if pii:
+        first = min(first for _, first in pii.values())
+        return (f"Potential PII/PHI detected: {pii_detector.describe(pii)} (first at character {first}). "
+                "Manual review required.")
+    if found_keywords:
+        return f"Potential PII/PHI detected (mentions {', '.join(found_keywords)}). Manual review required."
+    return "No obvious PII/PHI detected."
+
+def _build_blueprint(stats, pii, hits, content_type, keyword_sets):
+    def found(category):
+        return [kw for kw in keyword_sets[category] if _needle(category, kw) in hits]
+
     # Detect PII
-    found_pii = [kw for kw in pii_keywords if kw.lower() in text.lower()]
-    sensitive_summary = "Potential PII/PHI detected. Manual review required." if found_pii else "No obvious PII/PHI detected."
+    found_pii = found("pii")
+    sensitive_summary = sensitive_data_summary(pii, found_pii)
     
     # Complexity
-    if word_count > 3000 or avg_sentence_length > 30:
-        complexity = "High"
-    elif word_count > 1000:
-        complexity = "Medium"
-    else:
-        complexity = "Low"
+    complexity = score_complexity(stats)
     
     # Risk
-    if found_pii or complexity == "High":
+    if pii or found_pii or complexity == "High":
         risk_status = "Critical"
         risk_reason = "Sensitive data and/or high complexity detected."
     elif complexity == "Medium":
@@ -35,11 +222,11 @@ def analyze_document(text, current_linguist_profiles, content_type):
         risk_reason = "No major risks detected."
     
     # Key challenges
-    if content_type.lower() == "legal" or any(kw in text.lower() for kw in legal_keywords):
+    if content_type.lower() == "legal" or found("legal"):
         key_challenges = "Requires legal expertise."
-    elif content_type.lower() == "medical" or any(kw in text.lower() for kw in medical_keywords):
+    elif content_type.lower() == "medical" or found("medical"):
         key_challenges = "Requires medical expertise."
-    elif any(kw in text.lower() for kw in technical_keywords):
+    elif found("technical"):
         key_challenges = "Extensive technical terms."
     else:
         key_challenges = "General content."
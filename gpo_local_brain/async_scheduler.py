@@ -0,0 +1,128 @@
+import asyncio
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from scheduler import LocalBrainScheduler
+
+logger = logging.getLogger("GPO Local Brain Async Scheduler")
+
+
+class AsyncLocalBrainScheduler(LocalBrainScheduler):
+    """LocalBrainScheduler driven by an asyncio event loop.
+
+    Polling, linguist sync, outbox monitoring and error reports run as
+    separate tasks, so a slow cloud response to one of them no longer holds
+    up the others. HTTP calls still go through the shared pooled CloudClient
+    (whose outbox flusher uploads results on its own thread), each in an
+    executor thread; documents are extracted and analyzed on the worker pool.
+    """
+
+    shutdown_check_interval = 0.5  # seconds between checks of the external shutdown event
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loop = None
+        self.stopping = None
+        self.reports = set()
+        self.poll_executor = None
+
+    def run(self):
+        asyncio.run(self.serve())
+
+    def stop(self):
+        """Ask the scheduler to shut down; safe to call from any thread."""
+        self.shutdown_event.set()
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.stopping.set)
+
+    async def serve(self):
+        logger.info("Starting Local Brain Scheduler event loop.")
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        # Polls run on their own thread: asyncio.run would otherwise wait for a long poll still in flight
+        self.poll_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gpo-poll")
+        self.worker_pool.start()
+        await asyncio.to_thread(self.resume)
+        poll_task = asyncio.create_task(self._poll_loop())
+        tasks = [asyncio.create_task(coro) for coro in (
+            self._watch_shutdown(), self._linguist_loop(), self._outbox_loop())]
+        try:
+            await self.stopping.wait()
+        finally:
+            self.shutdown_event.set()
+            deadline = time.monotonic() + self.drain_timeout
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Cancelling would not stop a poll running in its thread. With shutdown_event set it accepts
+            # nothing more, so wait for it (within the drain deadline) before the pool and client go away.
+            await asyncio.wait([poll_task], timeout=max(0.0, deadline - time.monotonic()))
+            if not poll_task.done():
+                logger.warning("A poll was still in flight at the drain deadline.")
+                poll_task.cancel()
+            self.poll_executor.shutdown(wait=False)
+        # Let error reports already in progress go out
+        await asyncio.gather(*self.reports, return_exceptions=True)
+        self.drained = await asyncio.to_thread(self.worker_pool.shutdown, True, max(0.0, deadline - time.monotonic()))
+        await asyncio.to_thread(self.cloud.close)
+        self.loop = None
+        logger.info("Scheduler shutting down gracefully.")
+
+    def report_error(self, local_analysis_request_id, organization_id, error_type, error_message):
+        """Send the report as its own task so the caller does not wait on the cloud."""
+        loop = self.loop
+        if loop is None:
+            return super().report_error(local_analysis_request_id, organization_id, error_type, error_message)
+        args = (local_analysis_request_id, organization_id, error_type, error_message)
+        loop.call_soon_threadsafe(self._start_report, args)
+
+    def _start_report(self, args):
+        task = asyncio.create_task(asyncio.to_thread(super().report_error, *args))
+        self.reports.add(task)
+        task.add_done_callback(self.reports.discard)
+
+    async def _poll(self, wait=0):
+        return await self.loop.run_in_executor(self.poll_executor, self.poll_cloud_gpo, wait)
+
+    async def _sleep(self, seconds):
+        """Sleep for up to seconds; returns True if shutdown was requested meanwhile."""
+        try:
+            await asyncio.wait_for(self.stopping.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+        return self.stopping.is_set()
+
+    async def _watch_shutdown(self):
+        while not self.shutdown_event.is_set():
+            await asyncio.sleep(self.shutdown_check_interval)
+        self.stopping.set()
+
+    async def _poll_loop(self):
+        while not self.stopping.is_set():
+            started = time.time()
+            if not self.long_poll:
+                await self._poll()
+                await self._sleep(self.poll_interval)
+                continue
+            if self.worker_pool.available_slots(self.organization_id) <= 0:
+                # Wake as soon as a job finishes; with preemption keep polling for urgent requests
+                if not await asyncio.to_thread(self.worker_pool.wait_for_slot, 1, (self.organization_id,)) and not self.worker_pool.preempt:
+                    continue
+            submitted = await self._poll(self.long_poll_wait)
+            if submitted is None:
+                await self._sleep(self.long_poll_retry_interval)
+            elif submitted == 0 and time.time() - started < 1:
+                # The cloud answered at once with nothing new (e.g. requests still in flight here)
+                await self._sleep(1)
+
+    async def _linguist_loop(self):
+        while not self.stopping.is_set():
+            await asyncio.to_thread(self.sync_linguist_profiles)
+            self.last_linguist_sync = time.time()
+            await self._sleep(self.linguist_sync_interval)
+
+    async def _outbox_loop(self):
+        while not self.stopping.is_set():
+            await asyncio.to_thread(self.log_outbox_depth)
+            await asyncio.to_thread(self.journal.compact_if_due, self.journal_compact_interval)
+            await self._sleep(self.poll_interval)
@@ -0,0 +1,364 @@
+"""Local Brain throughput benchmark.
+
+Generates the synthetic corpus, then measures:
+
+- pipeline: extract_text + analyze_document for each file, one format at a
+  time in a fresh process (so peak RSS is per format)
+- end_to_end: the real scheduler, worker pool, extraction sandbox and cloud
+  client processing the whole corpus against a local stub Cloud GPO
+
+and writes throughput, p50/p95/p99 latency and peak RSS as JSON so runs can
+be compared across commits. End-to-end latency runs from the moment the stub
+first offers a request to the moment its result arrives, so it includes time
+spent waiting for a free worker.
+
+Usage:
+    python benchmarks/bench_throughput.py [--sizes small,medium] [--formats .pdf]
+        [--output results.json] [--compare previous.json] [--skip-end-to-end]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+LOCAL_BRAIN_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, LOCAL_BRAIN_DIR)
+
+from corpus import generate_corpus, SIZES, FORMATS
+
+ORGANIZATION_ID = "benchmark-org"
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of values (0-100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def peak_rss(who="self"):
+    """Peak resident set size in bytes, or None where the platform does not report it."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who == "self" else resource.RUSAGE_CHILDREN)
+    # Linux reports kilobytes, macOS bytes
+    return usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+
+def summarize(latencies, total_bytes, elapsed):
+    return {
+        "documents": len(latencies),
+        "bytes": total_bytes,
+        "seconds": round(elapsed, 4),
+        "documents_per_second": round(len(latencies) / elapsed, 3) if elapsed else None,
+        "megabytes_per_second": round(total_bytes / elapsed / 1e6, 3) if elapsed else None,
+        "latency_seconds": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies) if latencies else None,
+        },
+    }
+
+
+def run_pipeline(documents):
+    """extract_text + analyze_document for each document, in this process."""
+    from document_processor import extract_text
+    from ai_analyzer import analyze_document
+    latencies, extraction, analysis = [], [], []
+    started = time.perf_counter()
+    for doc in documents:
+        t0 = time.perf_counter()
+        text, error = extract_text(doc["path"])
+        if error:
+            raise RuntimeError(f"{doc['path']}: {error}")
+        t1 = time.perf_counter()
+        analyze_document(text, [], doc["content_type"])
+        t2 = time.perf_counter()
+        extraction.append(t1 - t0)
+        analysis.append(t2 - t1)
+        latencies.append(t2 - t0)
+    result = summarize(latencies, sum(doc["bytes"] for doc in documents), time.perf_counter() - started)
+    result["extraction_p50_seconds"] = percentile(extraction, 50)
+    result["analysis_p50_seconds"] = percentile(analysis, 50)
+    result["peak_rss_bytes"] = peak_rss()
+    return result
+
+
+class StubCloud:
+    """Just enough of the Cloud GPO API to drive a Local Brain: hands out the corpus as
+    analysis requests and records when each result comes back."""
+
+    def __init__(self, documents):
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.requests = {f"bench-{i}": doc for i, doc in enumerate(documents)}
+        self.pending = list(self.requests)
+        self.offered = {}
+        self.completed = {}
+        self.errors = []
+        handler = type("StubHandler", (_StubHandler,), {"cloud": self})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def next_requests(self, wait):
+        deadline = time.monotonic() + wait
+        with self.lock:
+            while not self.pending and time.monotonic() < deadline:
+                self.changed.wait(deadline - time.monotonic())
+            now = time.perf_counter()
+            for req_id in self.pending:
+                self.offered.setdefault(req_id, now)
+            return [{
+                "local_analysis_request_id": req_id,
+                "file_path": self.requests[req_id]["path"],
+                "content_type": self.requests[req_id]["content_type"],
+            } for req_id in self.pending]
+
+    def record(self, payload):
+        with self.lock:
+            req_id = payload.get("local_analysis_request_id")
+            if req_id in self.pending and "local_analysis_status" in payload and "timestamp" not in payload:
+                self.pending.remove(req_id)
+                self.completed[req_id] = (time.perf_counter(), payload["local_analysis_status"])
+                self.changed.notify_all()
+
+    def wait_until_done(self, timeout):
+        deadline = time.monotonic() + timeout
+        with self.lock:
+            while self.pending and time.monotonic() < deadline:
+                self.changed.wait(deadline - time.monotonic())
+            return not self.pending
+
+    def shutdown(self):
+        self.server.shutdown()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    cloud = None
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        return json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        if path.startswith("/api/local-brain-requests/"):
+            wait = 0
+            for pair in query.split("&"):
+                if pair.startswith("wait="):
+                    wait = min(float(pair[5:]), 5)
+            self._reply(200, {"requests": self.cloud.next_requests(wait)})
+        elif path.startswith("/api/organization-linguists/"):
+            self._reply(200, {"linguists": [], "full": True, "sync_token": "0", "total": 0})
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        body = self._body()
+        if self.path == "/api/local-analysis-results/batch":
+            for result in body.get("results", []):
+                self.cloud.record(result)
+            self._reply(200, {"errors": []})
+        elif self.path == "/api/local-analysis-results":
+            self.cloud.record(body)
+            self._reply(200, {"success": True})
+        elif self.path == "/api/local-brain-errors":
+            self.cloud.errors.append(body)
+            self._reply(200, {"success": True})
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def log_message(self, *args):
+        pass
+
+
+def run_end_to_end(documents, timeout=1800):
+    """Process the corpus through the real Local Brain service against a stub cloud."""
+    cloud = StubCloud(documents)
+    workdir = tempfile.mkdtemp(prefix="gpo-bench-")
+    os.environ.update({
+        "GPO_CLOUD_API_URL": cloud.url,
+        "GPO_ORGANIZATION_API_KEY": "benchmark",
+        "LOCAL_BRAIN_LONG_POLL": "true",
+        "LOCAL_BRAIN_LONG_POLL_WAIT": "1",
+        "LOCAL_BRAIN_OUTBOX_PATH": os.path.join(workdir, "outbox.db"),
+        "LOCAL_BRAIN_LINGUIST_SNAPSHOT_PATH": os.path.join(workdir, "linguists.json"),
+        # Measure real extraction and analysis, not cache reads
+        "LOCAL_BRAIN_CACHE_MAX_BYTES": "0",
+        "LOCAL_BRAIN_BLUEPRINT_STORE_MAX_ENTRIES": "0",
+        "LOCAL_BRAIN_METRICS_PORT": "0",
+    })
+    import main
+    from scheduler import LocalBrainScheduler
+    shutdown_event = threading.Event()
+    scheduler = LocalBrainScheduler(
+        process_document_callback=main.process_document_locally,
+        update_linguists_callback=main.update_linguists,
+        organization_id=ORGANIZATION_ID,
+        shutdown_event=shutdown_event,
+        cloud_client=main.cloud_client
+    )
+    started = time.perf_counter()
+    service = threading.Thread(target=scheduler.run, daemon=True)
+    service.start()
+    finished = cloud.wait_until_done(timeout)
+    elapsed = time.perf_counter() - started
+    shutdown_event.set()
+    service.join()
+    if main.extraction_sandbox is not None:
+        main.extraction_sandbox.close()
+    cloud.shutdown()
+    if not finished:
+        raise RuntimeError(f"{len(cloud.pending)} documents were not processed within {timeout}s")
+
+    failed = [req_id for req_id, (_, status) in cloud.completed.items() if status != "Analysis Complete"]
+    if failed:
+        raise RuntimeError(f"{len(failed)} documents failed, e.g. {cloud.requests[failed[0]]['path']}")
+    latencies = [done - cloud.offered[req_id] for req_id, (done, _) in cloud.completed.items()]
+    result = summarize(latencies, sum(doc["bytes"] for doc in documents), elapsed)
+    result["by_format"] = {}
+    for ext in sorted({doc["format"] for doc in documents}):
+        ids = [req_id for req_id, doc in cloud.requests.items() if doc["format"] == ext]
+        result["by_format"][ext] = summarize(
+            [cloud.completed[i][0] - cloud.offered[i] for i in ids],
+            sum(cloud.requests[i]["bytes"] for i in ids),
+            max(cloud.completed[i][0] for i in ids) - min(cloud.offered[i] for i in ids)
+        )
+    result["peak_rss_bytes"] = peak_rss()
+    result["peak_rss_children_bytes"] = peak_rss("children")
+    return result
+
+
+def run_in_subprocess(mode, manifest_path, fmt=None):
+    """Run one measurement in a fresh interpreter so its peak RSS is its own."""
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", mode, "--manifest", manifest_path]
+    if fmt:
+        cmd += ["--worker-format", fmt]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True, cwd=LOCAL_BRAIN_DIR)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=LOCAL_BRAIN_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, current):
+    """Print throughput and p95 changes against an earlier results file."""
+    def rows(results):
+        out = {f"pipeline {ext}": r for ext, r in results["pipeline"].items()}
+        if "end_to_end" in results:
+            out["end_to_end"] = results["end_to_end"]
+        return out
+    before, after = rows(previous["results"]), rows(current["results"])
+    print(f"\nCompared with {previous.get('commit')} ({previous.get('timestamp')}):")
+    for name, now in after.items():
+        old = before.get(name)
+        if not old:
+            continue
+        dps = (now["documents_per_second"] / old["documents_per_second"] - 1) * 100
+        p95 = (now["latency_seconds"]["p95"] / old["latency_seconds"]["p95"] - 1) * 100
+        print(f"  {name:<18} throughput {dps:+.1f}%   p95 latency {p95:+.1f}%")
+
+
+def print_summary(report):
+    print(f"\nLocal Brain benchmark ({report['commit']}, {report['corpus']['documents']} documents)")
+    print(f"  {'phase':<18} {'docs/s':>8} {'MB/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak RSS MB':>12}")
+    rows = [(f"pipeline {ext}", r) for ext, r in report["results"]["pipeline"].items()]
+    if "end_to_end" in report["results"]:
+        rows.append(("end_to_end", report["results"]["end_to_end"]))
+    for name, r in rows:
+        lat = r["latency_seconds"]
+        rss = r["peak_rss_bytes"] / 1e6 if r["peak_rss_bytes"] else float("nan")
+        print(f"  {name:<18} {r['documents_per_second']:>8} {r['megabytes_per_second']:>8} "
+              f"{lat['p50'] * 1000:>9.1f} {lat['p95'] * 1000:>9.1f} {lat['p99'] * 1000:>9.1f} {rss:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Brain throughput benchmark")
+    parser.add_argument("--sizes", default=",".join(SIZES), help="comma-separated corpus sizes")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="comma-separated file formats")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(), "gpo-benchmark-corpus"))
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--skip-end-to-end", action="store_true")
+    parser.add_argument("--worker", choices=["pipeline", "end-to-end"], help=argparse.SUPPRESS)
+    parser.add_argument("--worker-format", help=argparse.SUPPRESS)
+    parser.add_argument("--manifest", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        with open(args.manifest, "r", encoding="utf-8") as f:
+            documents = json.load(f)["documents"]
+        if args.worker == "pipeline":
+            result = run_pipeline([doc for doc in documents if doc["format"] == args.worker_format])
+        else:
+            result = run_end_to_end(documents)
+        print(json.dumps(result))
+        return
+
+    sizes = [s for s in args.sizes.split(",") if s]
+    formats = [f if f.startswith(".") else "." + f for f in args.formats.split(",") if f]
+    documents = generate_corpus(args.corpus_dir, sizes, formats, args.seed)
+    manifest_path = os.path.join(args.corpus_dir, "manifest.json")
+
+    results = {"pipeline": {}}
+    for ext in formats:
+        print(f"Running pipeline benchmark for {ext}...")
+        results["pipeline"][ext] = run_in_subprocess("pipeline", manifest_path, ext)
+    if not args.skip_end_to_end:
+        print("Running end-to-end benchmark...")
+        results["end_to_end"] = run_in_subprocess("end-to-end", manifest_path)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "corpus": {"seed": args.seed, "sizes": sizes, "formats": formats, "documents": len(documents),
+                   "bytes": sum(doc["bytes"] for doc in documents)},
+        "results": results,
+    }
+    output = args.output or os.path.join(
+        BENCH_DIR, "results", f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{report['commit'] or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_summary(report)
+    print(f"\nResults written to {output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Reproducible synthetic corpus for the Local Brain benchmarks.
+
+Documents are built from the sample documents of the Cloud GPO test scenario
+(gpo_product/sample_documents.py), repeated with a seeded paragraph shuffle
+to reach each size, and written as TXT, DOCX and PDF.
+"""
+import os
+import sys
+import json
+import random
+import textwrap
+from docx import Document
+
+PRODUCT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "gpo_product")
+
+# Copies of each sample document per size (one copy is about 3 KB of text)
+SIZES = {"small": 1, "medium": 30, "large": 300}
+FORMATS = (".txt", ".docx", ".pdf")
+
+PDF_LINES_PER_PAGE = 60
+PDF_LINE_WIDTH = 95
+
+
+def load_sample_documents():
+    sys.path.insert(0, os.path.abspath(PRODUCT_DIR))
+    from sample_documents import create_complex_documents
+    return create_complex_documents()
+
+
+def build_text(content, copies, rng):
+    """content repeated copies times; every copy after the first has its paragraphs shuffled."""
+    paragraphs = [p.strip() for p in textwrap.dedent(content).split("\n\n") if p.strip()]
+    out = []
+    for i in range(copies):
+        order = list(paragraphs)
+        if i:
+            rng.shuffle(order)
+        out.extend(order)
+    return "\n\n".join(out)
+
+
+def write_txt(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def write_docx(path, text):
+    doc = Document()
+    for line in text.split("\n"):
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+def write_pdf(path, text):
+    """A plain multi-page PDF with one Helvetica text line per source line (Latin-1 only)."""
+    lines = []
+    for line in text.split("\n"):
+        lines.extend(textwrap.wrap(line, PDF_LINE_WIDTH) or [""])
+    pages = [lines[i:i + PDF_LINES_PER_PAGE] for i in range(0, len(lines), PDF_LINES_PER_PAGE)] or [[]]
+
+    def escape(line):
+        line = line.encode("latin-1", "replace").decode("latin-1")
+        return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for page in pages:
+        stream = "BT /F1 10 Tf 12 TL 50 800 Td\n" + "".join(f"({escape(line)}) Tj T*\n" for line in page) + "ET"
+        stream = stream.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+WRITERS = {".txt": write_txt, ".docx": write_docx, ".pdf": write_pdf}
+
+
+def generate_corpus(out_dir, sizes=None, formats=None, seed=42):
+    """Write the corpus to out_dir and return its manifest (also saved as manifest.json).
+
+    Each entry has the file's path, format, size name, content type and byte size.
+    The same seed always produces the same text.
+    """
+    sizes = sizes or list(SIZES)
+    formats = formats or list(FORMATS)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = []
+    for size in sizes:
+        for index, sample in enumerate(load_sample_documents()):
+            rng = random.Random(f"{seed}-{size}-{index}")
+            text = build_text(sample["content"], SIZES[size], rng)
+            stem = os.path.splitext(sample["filename"])[0]
+            for ext in formats:
+                path = os.path.join(out_dir, f"{size}-{stem}{ext}")
+                WRITERS[ext](path, text)
+                manifest.append({
+                    "path": path,
+                    "format": ext,
+                    "size": size,
+                    "content_type": sample["type"],
+                    "bytes": os.path.getsize(path),
+                })
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"seed": seed, "documents": manifest}, f, indent=2)
+    return manifest
@@ -0,0 +1,99 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+
+def blueprint_key(digest, organization_id, content_type, linguist_version, analyzer_version):
+    """Memo key: the document's content hash plus everything else the blueprint depends on.
+
+    The organization is part of it so that organizations served by one process
+    never get each other's blueprints, even for identical documents.
+    """
+    raw = json.dumps([digest, organization_id, content_type, linguist_version, analyzer_version])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def linguist_version(profiles):
+    """Fingerprint of a linguist profile snapshot; changes whenever any profile does."""
+    h = hashlib.sha256()
+    for profile in sorted(profiles or [], key=lambda p: str(p.get("id"))):
+        h.update(f"{profile.get('id')}|{profile.get('updated_at')}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+class BlueprintStore:
+    """SQLite memo of finished blueprints.
+
+    A document analyzed again with the same content, content type, linguist
+    snapshot and analyzer version gets its earlier blueprint back instead of
+    being extracted and analyzed again. Entries expire after max_age seconds
+    and the least recently used are evicted beyond max_entries.
+    """
+
+    def __init__(self, path=":memory:", max_entries=10000, max_age=30 * 24 * 3600):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS blueprints (
+                key TEXT PRIMARY KEY,
+                blueprint TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_blueprints_last_used ON blueprints (last_used_at)")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """The stored blueprint for key, or None."""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT blueprint, created_at FROM blueprints WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.max_age:
+                if row is not None:
+                    self.conn.execute("DELETE FROM blueprints WHERE key = ?", (key,))
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE blueprints SET last_used_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, blueprint):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO blueprints (key, blueprint, created_at, last_used_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(blueprint), now, now)
+            )
+            self._evict(now)
+
+    def stats(self):
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM blueprints").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": entries}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def _evict(self, now):
+        expired = self.conn.execute("DELETE FROM blueprints WHERE created_at < ?", (now - self.max_age,)).rowcount
+        over = self.conn.execute("SELECT COUNT(*) FROM blueprints").fetchone()[0] - self.max_entries
+        if over > 0:
+            self.conn.execute(
+                "DELETE FROM blueprints WHERE key IN (SELECT key FROM blueprints ORDER BY last_used_at LIMIT ?)",
+                (over,)
+            )
+        self.evictions += expired + max(0, over)
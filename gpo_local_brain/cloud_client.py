@@ -0,0 +1,153 @@
+import threading
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from outbox import Outbox, STATUS, RESULT, REGISTER
+from metrics import UPLOAD_SECONDS
+
+logger = logging.getLogger("GPO Local Brain Cloud Client")
+
+
+class CloudClient:
+    """Persistent, pooled HTTP session to the Cloud GPO.
+
+    Status updates and analysis results are not posted one by one: they are
+    written to the outbox and sent together to /api/local-analysis-results/batch
+    by a background flusher, which waits batch_window seconds after the first
+    queued item so that updates arriving close together share one request.
+    Failed batches stay in the outbox and are retried with backoff.
+    """
+
+    # Batch responses that will not succeed on retry; anything else is retried
+    PERMANENT_FAILURES = (400, 413, 422)
+
+    def __init__(self, base_url, api_key, pool_size=10, timeout=10, batch_window=0.25, max_batch_size=100,
+                 outbox=None):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["X-API-Key"] = api_key
+        self.lock = threading.Lock()
+        self.send_lock = threading.Lock()  # keeps batches in order when flushed from several threads
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.outbox = outbox or Outbox()
+        self.flusher = None
+        self.batch_supported = True
+        # Deliver anything left over from a previous run
+        if self.outbox.next_due_in() is not None:
+            self._schedule()
+
+    def get(self, path, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(f"{self.base_url}{path}", **kwargs)
+
+    def post(self, path, payload, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.post(f"{self.base_url}{path}", json=payload, **kwargs)
+
+    def queue_status(self, payload):
+        """Queue a status update; a newer update for the same request replaces it."""
+        self.outbox.put(STATUS, payload)
+        self._schedule()
+
+    def queue_result(self, payload):
+        """Queue a finished analysis; it supersedes any pending status update for the request."""
+        self.outbox.put(RESULT, payload)
+        self._schedule()
+
+    def queue_registration(self, payload):
+        """Queue a request the Local Brain created itself (e.g. a hot-folder file); the cloud
+        creates its project before applying anything else sent for it."""
+        self.outbox.put(REGISTER, payload)
+        self._schedule()
+
+    def outbox_depth(self):
+        return self.outbox.depth()
+
+    def flush(self):
+        """Send everything currently due. Returns False if the cloud could not be reached."""
+        with self.send_lock:
+            while True:
+                rows = self.outbox.due(self.max_batch_size)
+                if not rows:
+                    return True
+                try:
+                    with UPLOAD_SECONDS.time():
+                        self._send(rows)
+                except requests.HTTPError as e:
+                    if e.response is not None and e.response.status_code in self.PERMANENT_FAILURES:
+                        logger.error(f"Cloud GPO rejected {len(rows)} updates; keeping them as dead letters: {e}")
+                        self.outbox.mark_dead([row_id for row_id, _, _ in rows], e)
+                        continue
+                    self._retry_later(rows, e)
+                    return False
+                except Exception as e:
+                    self._retry_later(rows, e)
+                    return False
+
+    def close(self):
+        """Flush pending updates, stop the flusher and release pooled connections."""
+        self.stopping.set()
+        self.wakeup.set()
+        if self.flusher:
+            self.flusher.join()
+            self.flusher = None
+        self.flush()
+        self.session.close()
+
+    def _schedule(self):
+        with self.lock:
+            if self.flusher is None:
+                self.flusher = threading.Thread(target=self._run, name="gpo-cloud-flusher", daemon=True)
+                self.flusher.start()
+        self.wakeup.set()
+
+    def _run(self):
+        while not self.stopping.is_set():
+            delay = self.outbox.next_due_in()
+            if delay is None or delay > 0:
+                # Sleep until something new is queued or the next retry is due
+                self.wakeup.wait(timeout=delay)
+                self.wakeup.clear()
+                continue
+            # Give closely spaced updates a moment to join the same batch
+            self.stopping.wait(self.batch_window)
+            self.flush()
+
+    def _retry_later(self, rows, error):
+        self.outbox.retry_later([row_id for row_id, _, _ in rows], error)
+        logger.error(f"Failed to send updates to Cloud GPO, will retry: {error} (outbox depth: {self.outbox.depth()['pending']})")
+
+    def _send(self, rows):
+        """Deliver outbox rows, deleting each once the cloud has accepted it."""
+        if self.batch_supported:
+            registrations = [payload for _, kind, payload in rows if kind == REGISTER]
+            status_updates = [payload for _, kind, payload in rows if kind == STATUS]
+            results = [payload for _, kind, payload in rows if kind == RESULT]
+            batch = {"status_updates": status_updates, "results": results}
+            if registrations:
+                batch["registrations"] = registrations
+            resp = self.post("/api/local-analysis-results/batch", batch)
+            if resp.status_code != 404:
+                resp.raise_for_status()
+                for error in resp.json().get("errors", []):
+                    logger.warning(f"Cloud rejected update for {error.get('local_analysis_request_id')}: {error.get('error')}")
+                self.outbox.delete([row_id for row_id, _, _ in rows])
+                logger.info(f"Sent {len(status_updates)} status updates and {len(results)} results to Cloud GPO.")
+                return
+            # Older Cloud GPO without the batch endpoint
+            logger.info("Batch endpoint not available; sending updates individually.")
+            self.batch_supported = False
+        for row_id, kind, payload in rows:
+            if kind == REGISTER:
+                self.outbox.mark_dead([row_id], "Cloud GPO does not accept registrations")
+                continue
+            self.post("/api/local-analysis-results", payload).raise_for_status()
+            self.outbox.delete([row_id])
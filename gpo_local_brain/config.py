@@ -4,4 +4,87 @@ from dotenv import load_dotenv
 load_dotenv()
 
 GPO_CLOUD_API_URL = os.getenv("GPO_CLOUD_API_URL")
-GPO_ORGANIZATION_API_KEY = os.getenv("GPO_ORGANIZATION_API_KEY") 
\ No newline at end of file
+GPO_ORGANIZATION_API_KEY = os.getenv("GPO_ORGANIZATION_API_KEY")
+
+# Worker pool sizing (defaults to one worker per core)
+LOCAL_BRAIN_MAX_WORKERS = int(os.getenv("LOCAL_BRAIN_MAX_WORKERS", os.cpu_count() or 1))
+LOCAL_BRAIN_MAX_IN_FLIGHT = int(os.getenv("LOCAL_BRAIN_MAX_IN_FLIGHT", LOCAL_BRAIN_MAX_WORKERS * 2))
+
+# Serve several organizations from one process: a JSON file mapping each organization id to its
+# settings, e.g. {"org-a": {"api_key": "...", "keywords_file": "keywords-a.json"}}. They share the
+# worker pool, taking turns; each may have at most LOCAL_BRAIN_ORG_MAX_IN_FLIGHT requests in flight
+# (0: an equal share of LOCAL_BRAIN_MAX_IN_FLIGHT).
+LOCAL_BRAIN_ORGANIZATIONS_FILE = os.getenv("LOCAL_BRAIN_ORGANIZATIONS_FILE")
+LOCAL_BRAIN_ORG_MAX_IN_FLIGHT = int(os.getenv("LOCAL_BRAIN_ORG_MAX_IN_FLIGHT", 0))
+
+# Queued requests run in order of deadline minus estimated processing time. Aging: hours of
+# urgency a request gains per hour it waits. With preemption, an urgent request (due within
+# LOCAL_BRAIN_URGENT_HOURS) arriving at a full queue hands the largest less urgent queued
+# request (of at least LOCAL_BRAIN_PREEMPT_MIN_BYTES) back to the cloud.
+LOCAL_BRAIN_PRIORITY_AGING = float(os.getenv("LOCAL_BRAIN_PRIORITY_AGING", 24))
+LOCAL_BRAIN_PREEMPT = os.getenv("LOCAL_BRAIN_PREEMPT", "false").lower() == "true"
+LOCAL_BRAIN_PREEMPT_MIN_BYTES = int(os.getenv("LOCAL_BRAIN_PREEMPT_MIN_BYTES", 1024 * 1024))
+LOCAL_BRAIN_URGENT_HOURS = float(os.getenv("LOCAL_BRAIN_URGENT_HOURS", 24))
+
+# Long-poll dispatch: hold the request on the cloud until work arrives instead of polling every minute
+LOCAL_BRAIN_LONG_POLL = os.getenv("LOCAL_BRAIN_LONG_POLL", "false").lower() == "true"
+LOCAL_BRAIN_LONG_POLL_WAIT = int(os.getenv("LOCAL_BRAIN_LONG_POLL_WAIT", 20))
+# Run polling, linguist sync and error reports as concurrent asyncio tasks instead of one loop
+LOCAL_BRAIN_ASYNC = os.getenv("LOCAL_BRAIN_ASYNC", "false").lower() == "true"
+
+# Streaming extraction: documents are analyzed in chunks of about this many characters,
+# and no single chunk held in memory exceeds the ceiling
+LOCAL_BRAIN_CHUNK_CHARS = int(os.getenv("LOCAL_BRAIN_CHUNK_CHARS", 256 * 1024))
+LOCAL_BRAIN_MAX_CHUNK_CHARS = int(os.getenv("LOCAL_BRAIN_MAX_CHUNK_CHARS", 1024 * 1024))
+
+# Extracted-text cache (set LOCAL_BRAIN_CACHE_MAX_BYTES=0 to disable)
+LOCAL_BRAIN_CACHE_DIR = os.getenv("LOCAL_BRAIN_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "extracted"))
+LOCAL_BRAIN_CACHE_MAX_BYTES = int(os.getenv("LOCAL_BRAIN_CACHE_MAX_BYTES", 1024 * 1024 * 1024))
+
+# Optional JSON file of organization-specific keywords, e.g. {"legal": ["affidavit"], "pii": ["NHS number"]}
+LOCAL_BRAIN_KEYWORDS_FILE = os.getenv("LOCAL_BRAIN_KEYWORDS_FILE")
+
+# Durable outbox for results and status updates waiting to reach the Cloud GPO
+LOCAL_BRAIN_OUTBOX_PATH = os.getenv("LOCAL_BRAIN_OUTBOX_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "outbox.db"))
+
+# Journal of accepted and finished requests; unfinished ones are resumed after a crash or restart
+LOCAL_BRAIN_JOURNAL_PATH = os.getenv("LOCAL_BRAIN_JOURNAL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "journal.db"))
+# Seconds allowed on SIGTERM to finish queued and running requests; the rest resume on the next start
+LOCAL_BRAIN_DRAIN_TIMEOUT = float(os.getenv("LOCAL_BRAIN_DRAIN_TIMEOUT", 25))
+# Seconds between removals of finished requests from the journal
+LOCAL_BRAIN_JOURNAL_COMPACT_INTERVAL = int(os.getenv("LOCAL_BRAIN_JOURNAL_COMPACT_INTERVAL", 3600))
+
+# Linguist profiles: local snapshot for warm starts, refreshed with cheap delta syncs
+LOCAL_BRAIN_LINGUIST_SNAPSHOT_PATH = os.getenv("LOCAL_BRAIN_LINGUIST_SNAPSHOT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "linguists.json"))
+LOCAL_BRAIN_LINGUIST_SYNC_INTERVAL = int(os.getenv("LOCAL_BRAIN_LINGUIST_SYNC_INTERVAL", 5 * 60))
+
+# Prometheus metrics endpoint (GET /metrics); set LOCAL_BRAIN_METRICS_PORT=0 to disable
+LOCAL_BRAIN_METRICS_HOST = os.getenv("LOCAL_BRAIN_METRICS_HOST", "127.0.0.1")
+LOCAL_BRAIN_METRICS_PORT = int(os.getenv("LOCAL_BRAIN_METRICS_PORT", 9108))
+
+# Document parsing runs in separate processes so a pathological file cannot stall the Local Brain
+# (set LOCAL_BRAIN_EXTRACTION_PROCESSES=0 to parse in-process)
+LOCAL_BRAIN_EXTRACTION_PROCESSES = int(os.getenv("LOCAL_BRAIN_EXTRACTION_PROCESSES", LOCAL_BRAIN_MAX_WORKERS))
+LOCAL_BRAIN_EXTRACTION_TIMEOUT = int(os.getenv("LOCAL_BRAIN_EXTRACTION_TIMEOUT", 120))
+LOCAL_BRAIN_EXTRACTION_MEMORY_LIMIT = int(os.getenv("LOCAL_BRAIN_EXTRACTION_MEMORY_LIMIT", 1024 * 1024 * 1024))
+LOCAL_BRAIN_EXTRACTION_MAX_TASKS = int(os.getenv("LOCAL_BRAIN_EXTRACTION_MAX_TASKS", 100))
+
+# Hot folder: documents dropped here are analyzed right away and registered with the Cloud GPO as projects.
+# A first-level subfolder named after a content type (legal/, medical/, ...) sets the project's content type.
+LOCAL_BRAIN_WATCH_DIR = os.getenv("LOCAL_BRAIN_WATCH_DIR")
+LOCAL_BRAIN_WATCH_INTERVAL = float(os.getenv("LOCAL_BRAIN_WATCH_INTERVAL", 1))
+LOCAL_BRAIN_WATCH_DEBOUNCE = float(os.getenv("LOCAL_BRAIN_WATCH_DEBOUNCE", 2))
+LOCAL_BRAIN_WATCH_STATE_PATH = os.getenv("LOCAL_BRAIN_WATCH_STATE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "watch_state.json"))
+LOCAL_BRAIN_WATCH_CONTENT_TYPE = os.getenv("LOCAL_BRAIN_WATCH_CONTENT_TYPE", "General")
+LOCAL_BRAIN_WATCH_CLIENT_NAME = os.getenv("LOCAL_BRAIN_WATCH_CLIENT_NAME", "Hot folder")
+LOCAL_BRAIN_WATCH_SOURCE_LANG = os.getenv("LOCAL_BRAIN_WATCH_SOURCE_LANG", "en")
+LOCAL_BRAIN_WATCH_TARGET_LANG = os.getenv("LOCAL_BRAIN_WATCH_TARGET_LANG", "TBD")
+LOCAL_BRAIN_WATCH_DEADLINE_DAYS = int(os.getenv("LOCAL_BRAIN_WATCH_DEADLINE_DAYS", 7))
+
+# Blueprints of previously analyzed documents, reused when the same file is analyzed again
+# with the same content type and linguist profiles (set LOCAL_BRAIN_BLUEPRINT_STORE_MAX_ENTRIES=0 to disable)
+LOCAL_BRAIN_BLUEPRINT_STORE_PATH = os.getenv("LOCAL_BRAIN_BLUEPRINT_STORE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "blueprints.db"))
+LOCAL_BRAIN_BLUEPRINT_STORE_MAX_ENTRIES = int(os.getenv("LOCAL_BRAIN_BLUEPRINT_STORE_MAX_ENTRIES", 10000))
+LOCAL_BRAIN_BLUEPRINT_STORE_MAX_AGE_DAYS = int(os.getenv("LOCAL_BRAIN_BLUEPRINT_STORE_MAX_AGE_DAYS", 30))
+# Always analyze from scratch (stored blueprints are still refreshed)
+LOCAL_BRAIN_FORCE_REFRESH = os.getenv("LOCAL_BRAIN_FORCE_REFRESH", "false").lower() == "true"
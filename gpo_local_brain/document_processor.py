@@ -1,20 +1,96 @@
 import os
 from docx import Document
 from PyPDF2 import PdfReader
+from config import LOCAL_BRAIN_MAX_CHUNK_CHARS
 
-def extract_text(file_path):
+SUPPORTED_EXTENSIONS = (".txt", ".docx", ".pdf")
+
+# Bump whenever extraction output changes so cached text from older versions is not reused
+EXTRACTOR_VERSION = 1
+
+# Plain text is read in blocks of this many characters
+TEXT_BLOCK_CHARS = 64 * 1024
+
+
+def extract_text(file_path, cache=None, sandbox=None):
     ext = os.path.splitext(file_path)[1].lower()
+    if ext not in SUPPORTED_EXTENSIONS:
+        return None, f"Unsupported file type: {ext}"
     try:
-        if ext == ".txt":
-            with open(file_path, "r", encoding="utf-8") as f:
-                return f.read(), None
-        elif ext == ".docx":
-            doc = Document(file_path)
-            return "\n".join([para.text for para in doc.paragraphs]), None
-        elif ext == ".pdf":
-            reader = PdfReader(file_path)
-            return "\n".join(page.extract_text() or "" for page in reader.pages), None
-        else:
-            return None, f"Unsupported file type: {ext}"
+        return "".join(iter_text(file_path, cache=cache, sandbox=sandbox)), None
     except Exception as e:
-        return None, f"Error extracting text: {e}" 
\ No newline at end of file
+        return None, f"Error extracting text: {e}"
+
+
+def iter_text(file_path, chunk_size=None, max_chunk_chars=None, cache=None, sandbox=None, digest=None):
+    """Yield a document's text piece by piece instead of as one string.
+
+    Without chunk_size, yields one piece per PDF page, DOCX paragraph or text
+    block; with chunk_size, pieces are regrouped into chunks of about that many
+    characters. No piece is longer than max_chunk_chars. Joining the pieces
+    with "" gives exactly the text extract_text returns.
+
+    With an ExtractionCache, previously seen file contents are read back from
+    the cache instead of being parsed again (digest, the file's file_digest,
+    saves hashing it again if known). With an ExtractionSandbox, parsing
+    runs in a separate process with time and memory limits.
+    """
+    max_chunk_chars = max_chunk_chars or LOCAL_BRAIN_MAX_CHUNK_CHARS
+    extractor = sandbox.iter_pieces if sandbox is not None else _iter_pieces
+    if cache is not None:
+        pieces = cache.iter_pieces(file_path, extractor, EXTRACTOR_VERSION, digest=digest)
+    else:
+        pieces = extractor(file_path)
+    if chunk_size:
+        pieces = _rechunk(pieces, min(chunk_size, max_chunk_chars))
+    for piece in pieces:
+        yield from _split(piece, max_chunk_chars)
+
+
+def _iter_pieces(file_path):
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == ".txt":
+        with open(file_path, "r", encoding="utf-8") as f:
+            while True:
+                block = f.read(TEXT_BLOCK_CHARS)
+                if not block:
+                    break
+                yield block
+    elif ext == ".docx":
+        doc = Document(file_path)
+        for i, para in enumerate(doc.paragraphs):
+            yield para.text if i == 0 else "\n" + para.text
+    elif ext == ".pdf":
+        reader = PdfReader(file_path)
+        for i, page in enumerate(reader.pages):
+            text = page.extract_text() or ""
+            yield text if i == 0 else "\n" + text
+    else:
+        raise ValueError(f"Unsupported file type: {ext}")
+
+
+def _rechunk(pieces, chunk_size):
+    """Regroup pieces into chunks of roughly chunk_size characters."""
+    buffer = []
+    buffered = 0
+    for piece in pieces:
+        buffer.append(piece)
+        buffered += len(piece)
+        if buffered >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _split(text, limit):
+    """Split text into pieces of at most limit characters, preferring whitespace boundaries."""
+    while len(text) > limit:
+        cut = max(text.rfind(" ", 0, limit), text.rfind("\n", 0, limit)) + 1
+        if cut <= 0:
+            cut = limit
+        yield text[:cut]
+        text = text[cut:]
+    if text:
+        yield text
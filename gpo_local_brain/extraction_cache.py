@@ -0,0 +1,140 @@
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger("GPO Local Brain Extraction Cache")
+
+HASH_BLOCK_BYTES = 1024 * 1024
+READ_BLOCK_CHARS = 64 * 1024
+
+
+def file_digest(file_path):
+    """SHA-256 of a file's content, read in blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """On-disk cache of extracted text keyed by file content hash and extractor version.
+
+    Entries are plain UTF-8 files sharded by hash prefix. The least recently used
+    entries are evicted once the cache grows beyond max_bytes; recency is kept in
+    file mtimes so it survives restarts.
+    """
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> size in bytes, least recently used first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def iter_pieces(self, file_path, extractor, version, digest=None):
+        """Yield the file's text from the cache, or from extractor(file_path) while caching it.
+
+        Pass the file's digest if the caller has already computed it, to save reading the file twice.
+        """
+        key = f"{digest or file_digest(file_path)}-{version}"
+        path = self._path(key)
+        with self.lock:
+            hit = key in self.entries
+            if hit:
+                self.hits += 1
+                self.entries.move_to_end(key)
+            else:
+                self.misses += 1
+        if hit:
+            try:
+                os.utime(path)
+                with open(path, "r", encoding="utf-8", newline="") as f:
+                    for block in iter(lambda: f.read(READ_BLOCK_CHARS), ""):
+                        yield block
+                return
+            except FileNotFoundError:
+                # Removed behind our back; fall through and extract again
+                with self.lock:
+                    self._forget(key)
+        yield from self._extract_and_store(file_path, extractor, key, path)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+            }
+
+    def _extract_and_store(self, file_path, extractor, key, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        stored = False
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as out:
+                for piece in extractor(file_path):
+                    out.write(piece)
+                    yield piece
+            size = os.path.getsize(tmp_path)
+            if size <= self.max_bytes:
+                os.replace(tmp_path, path)
+                stored = True
+                with self.lock:
+                    self._forget(key)
+                    self.entries[key] = size
+                    self.total_bytes += size
+                    self._evict()
+        finally:
+            # Extraction failed, was abandoned part way, or the entry is over budget
+            if not stored and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".txt")
+
+    def _forget(self, key):
+        size = self.entries.pop(key, None)
+        if size is not None:
+            self.total_bytes -= size
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self.entries:
+            key, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def _load_index(self):
+        found = []
+        for shard in os.listdir(self.cache_dir):
+            shard_dir = os.path.join(self.cache_dir, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                path = os.path.join(shard_dir, name)
+                if name.endswith(".tmp"):
+                    # Left behind by a crash mid-extraction
+                    os.remove(path)
+                elif name.endswith(".txt"):
+                    stat = os.stat(path)
+                    found.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(found):
+            self.entries[key] = size
+            self.total_bytes += size
+        with self.lock:
+            self._evict()
+        logger.info(f"Extraction cache: {len(self.entries)} entries, {self.total_bytes} bytes.")
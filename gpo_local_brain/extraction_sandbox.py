@@ -0,0 +1,157 @@
+import os
+import sys
+import json
+import queue
+import logging
+import tempfile
+import threading
+import subprocess
+from document_processor import TEXT_BLOCK_CHARS
+from metrics import EXTRACTION_RECYCLED
+
+logger = logging.getLogger("GPO Local Brain Extraction Sandbox")
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "extraction_worker.py")
+
+
+class ExtractionTimeout(Exception):
+    pass
+
+
+class ExtractionFailed(Exception):
+    pass
+
+
+class _WorkerProcess:
+    """One long-lived extraction process and the thread reading its replies."""
+
+    def __init__(self, memory_limit):
+        self.proc = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT, str(memory_limit)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, encoding="utf-8",
+            cwd=os.path.dirname(WORKER_SCRIPT)
+        )
+        self.replies = queue.Queue()
+        self.tasks = 0
+        threading.Thread(target=self._read_replies, name="gpo-extraction-reader", daemon=True).start()
+
+    def _read_replies(self):
+        for line in self.proc.stdout:
+            self.replies.put(json.loads(line))
+        self.replies.put(None)  # process exited
+
+    def run(self, file_path, out_path, timeout):
+        self.tasks += 1
+        try:
+            self.proc.stdin.write(json.dumps({"file_path": file_path, "out_path": out_path}) + "\n")
+            self.proc.stdin.flush()
+            reply = self.replies.get(timeout=timeout)
+        except queue.Empty:
+            raise ExtractionTimeout(f"Extraction timed out after {timeout}s")
+        except OSError:
+            reply = None
+        if reply is None:
+            try:
+                code = self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                code = None
+            raise ExtractionFailed(f"Extraction process exited unexpectedly (exit code {code})")
+        return reply
+
+    def kill(self):
+        self.proc.kill()
+        self.proc.wait()
+        for stream in (self.proc.stdin, self.proc.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+class ExtractionSandbox:
+    """Runs document parsing in separate, reusable processes.
+
+    A malformed PDF or DOCX can hang the parser or eat all memory; here it only
+    takes down its own worker process. Each task has a wall-clock timeout and
+    each process an address-space cap (where the platform supports rlimits).
+    Workers that time out, crash or run out of memory are killed and replaced,
+    and healthy ones are recycled after max_tasks_per_child documents.
+
+    Extracted text is spooled to a temporary file, so the caller can still
+    stream it without holding the whole document in memory.
+    """
+
+    def __init__(self, max_workers, timeout=120, memory_limit=1024 * 1024 * 1024, max_tasks_per_child=100):
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.max_tasks_per_child = max_tasks_per_child
+        self.slots = threading.Semaphore(max_workers)
+        self.lock = threading.Lock()
+        self.idle = []
+        self.closed = False
+
+    def iter_pieces(self, file_path):
+        """Yield the document's text in blocks; same text as document_processor._iter_pieces."""
+        out_path = self.extract_to_file(file_path)
+        try:
+            with open(out_path, "r", encoding="utf-8") as f:
+                while True:
+                    block = f.read(TEXT_BLOCK_CHARS)
+                    if not block:
+                        break
+                    yield block
+        finally:
+            os.remove(out_path)
+
+    def extract_to_file(self, file_path):
+        """Extract a document into a temporary file and return its path. The caller removes it."""
+        fd, out_path = tempfile.mkstemp(prefix="gpo-extract-", suffix=".txt")
+        os.close(fd)
+        with self.slots:
+            worker = self._acquire()
+            try:
+                reply = worker.run(os.path.abspath(file_path), out_path, self.timeout)
+            except ExtractionTimeout:
+                self._discard(worker, "timeout", file_path)
+                os.remove(out_path)
+                raise
+            except BaseException:
+                self._discard(worker, "crash", file_path)
+                os.remove(out_path)
+                raise
+            if reply.get("fatal"):
+                self._discard(worker, "memory", file_path)
+            elif worker.tasks >= self.max_tasks_per_child:
+                self._discard(worker, "task_limit", file_path)
+            else:
+                self._release(worker)
+        if "error" in reply:
+            os.remove(out_path)
+            raise ExtractionFailed(reply["error"])
+        return out_path
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for worker in idle:
+            worker.kill()
+
+    def _acquire(self):
+        with self.lock:
+            if self.idle:
+                return self.idle.pop()
+        return _WorkerProcess(self.memory_limit)
+
+    def _release(self, worker):
+        with self.lock:
+            if not self.closed:
+                self.idle.append(worker)
+                return
+        worker.kill()
+
+    def _discard(self, worker, reason, file_path):
+        if reason != "task_limit":
+            logger.warning(f"Replacing extraction process after {reason} on {file_path}")
+        EXTRACTION_RECYCLED.inc(reason=reason)
+        worker.kill()
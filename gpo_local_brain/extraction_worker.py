@@ -0,0 +1,51 @@
+"""Extraction worker process used by ExtractionSandbox.
+
+Reads one JSON task per line from stdin ({"file_path": ..., "out_path": ...}),
+writes the document's text to out_path and answers with one JSON line on
+stdout. Exits when stdin is closed.
+
+Usage: python extraction_worker.py <memory_limit_bytes>
+"""
+import sys
+import json
+
+
+def limit_memory(limit):
+    try:
+        import resource
+    except ImportError:
+        sys.stderr.write("Memory limit not supported on this platform; extraction runs uncapped.\n")
+        return
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError) as e:
+        sys.stderr.write(f"Could not set extraction memory limit: {e}\n")
+
+
+def main():
+    memory_limit = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    if memory_limit > 0:
+        limit_memory(memory_limit)
+    # Keep stray library output off the reply channel
+    replies = sys.stdout
+    sys.stdout = sys.stderr
+    from document_processor import _iter_pieces
+
+    for line in sys.stdin:
+        task = json.loads(line)
+        reply = {"ok": True}
+        try:
+            with open(task["out_path"], "w", encoding="utf-8") as out:
+                for piece in _iter_pieces(task["file_path"]):
+                    out.write(piece)
+        except MemoryError:
+            # The heap may be in a bad state; ask to be replaced
+            reply = {"error": "Extraction exceeded its memory limit", "fatal": True}
+        except Exception as e:
+            reply = {"error": str(e)}
+        replies.write(json.dumps(reply) + "\n")
+        replies.flush()
+
+
+if __name__ == "__main__":
+    main()
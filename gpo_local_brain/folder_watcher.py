@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from document_processor import SUPPORTED_EXTENSIONS
+
+logger = logging.getLogger("GPO Local Brain Folder Watcher")
+
+# Content types known to the Cloud GPO; a first-level subfolder with one of these names sets it
+CONTENT_TYPES = ("Legal", "Medical", "Marketing", "General", "Technical", "Financial", "IT")
+
+
+class FolderWatcher:
+    """Finds new or changed documents in a hot folder by scanning file stats.
+
+    A file is only reported once its size and modification time have stayed
+    the same for debounce seconds, so documents still being copied in are not
+    analyzed half-written. Processed files are remembered (with the request id
+    they were registered under) in a small JSON state file, so restarts do not
+    register them again and a changed file updates its existing project.
+    """
+
+    def __init__(self, root, debounce=2.0, state_path=None, default_content_type="General"):
+        self.root = os.path.abspath(root)
+        self.debounce = debounce
+        self.state_path = state_path
+        self.default_content_type = default_content_type
+        self.lock = threading.Lock()
+        self.processed = {}  # path -> {"size", "mtime_ns", "request_id"}
+        self.candidates = {}  # path -> (signature, first seen with that signature, request_id)
+        self.load()
+
+    def load(self):
+        if not self.state_path:
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self.processed = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.error(f"Ignoring unreadable watch state {self.state_path}: {e}")
+
+    def save(self):
+        if not self.state_path:
+            return
+        with self.lock:
+            data = dict(self.processed)
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.state_path)
+
+    def scan(self, now=None):
+        """Return [(path, request_id, signature)] for files that are new or changed and have settled."""
+        now = time.monotonic() if now is None else now
+        ready = []
+        present = set()
+        for path, signature in self._walk():
+            present.add(path)
+            with self.lock:
+                done = self.processed.get(path)
+                if done and (done["size"], done["mtime_ns"]) == signature:
+                    self.candidates.pop(path, None)
+                    continue
+                candidate = self.candidates.get(path)
+                if candidate is None or candidate[0] != signature:
+                    # New, or still changing: start the debounce over
+                    request_id = done["request_id"] if done else (candidate[2] if candidate else str(uuid.uuid4()))
+                    self.candidates[path] = (signature, now, request_id)
+                    continue
+                if now - candidate[1] < self.debounce:
+                    continue
+            ready.append((path, candidate[2], signature))
+        with self.lock:
+            for path in list(self.candidates):
+                if path not in present:
+                    del self.candidates[path]
+        return ready
+
+    def mark_done(self, path, request_id, signature):
+        """Remember that this version of the file has been processed."""
+        with self.lock:
+            self.processed[path] = {"size": signature[0], "mtime_ns": signature[1], "request_id": request_id}
+            self.candidates.pop(path, None)
+        self.save()
+
+    def content_type(self, path):
+        """Content type from the first subfolder under the hot folder (e.g. legal/contract.pdf)."""
+        parts = os.path.relpath(path, self.root).split(os.sep)
+        if len(parts) > 1:
+            for content_type in CONTENT_TYPES:
+                if parts[0].lower() == content_type.lower():
+                    return content_type
+        return self.default_content_type
+
+    def _walk(self):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for name in filenames:
+                # Hidden files and Office lock files (~$report.docx)
+                if name.startswith((".", "~$")):
+                    continue
+                if os.path.splitext(name)[1].lower() not in SUPPORTED_EXTENSIONS:
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue  # removed since listing
+                yield path, (st.st_size, st.st_mtime_ns)
@@ -0,0 +1,116 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+ACCEPTED = "accepted"
+COMPLETED = "completed"
+FAILED = "failed"
+RELEASED = "released"
+
+# Once a request reaches one of these its outcome is in the outbox (or it is back with the cloud)
+TERMINAL = (COMPLETED, FAILED, RELEASED)
+
+
+class RequestJournal:
+    """SQLite log of request state transitions, written before acting on them.
+
+    A request is journaled as accepted (with everything needed to process it
+    again) before it is handed to the worker pool, and as completed, failed or
+    released once its outcome is safely in the outbox. After a crash, replay()
+    returns the requests that were accepted but never finished, so they can be
+    resumed without asking the cloud for them again; finished ones are never
+    re-analyzed.
+    """
+
+    def __init__(self, path=":memory:"):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.last_compaction = None
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            # Every transition must survive a power loss, not only a process crash
+            self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS transitions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                request_id TEXT NOT NULL,
+                state TEXT NOT NULL,
+                data TEXT,
+                at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_transitions_request ON transitions (request_id, id)")
+
+    def record(self, request_id, state, data=None):
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO transitions (request_id, state, data, at) VALUES (?, ?, ?, ?)",
+                (request_id, state, json.dumps(data) if data is not None else None, time.time())
+            )
+
+    def accepted(self, request_id, data):
+        """data: the request as it will be resumed (file path, content type, ...)."""
+        self.record(request_id, ACCEPTED, data)
+
+    def completed(self, request_id):
+        self.record(request_id, COMPLETED)
+
+    def failed(self, request_id, error):
+        self.record(request_id, FAILED, {"error": error})
+
+    def released(self, request_id):
+        self.record(request_id, RELEASED)
+
+    def replay(self):
+        """[(request_id, data)] for requests whose last transition is not terminal, oldest first."""
+        with self.lock:
+            rows = self.conn.execute("""
+                SELECT request_id, state, data FROM transitions
+                WHERE id IN (SELECT MAX(id) FROM transitions GROUP BY request_id)
+                ORDER BY id
+            """).fetchall()
+        return [(request_id, json.loads(data) if data else {})
+                for request_id, state, data in rows if state not in TERMINAL]
+
+    def state(self, request_id):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT state FROM transitions WHERE request_id = ? ORDER BY id DESC LIMIT 1", (request_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def request_data(self, request_id):
+        """The data a request was last accepted with, or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT data FROM transitions WHERE request_id = ? AND state = ? ORDER BY id DESC LIMIT 1",
+                (request_id, ACCEPTED)
+            ).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def compact_if_due(self, interval):
+        """compact() if it has not run in the last interval seconds. Returns the number of rows removed."""
+        with self.lock:
+            if self.last_compaction is not None and time.monotonic() - self.last_compaction < interval:
+                return 0
+        return self.compact()
+
+    def compact(self):
+        """Drop the history of finished requests. Returns the number of rows removed."""
+        with self.lock:
+            self.last_compaction = time.monotonic()
+            return self.conn.execute(f"""
+                DELETE FROM transitions WHERE request_id IN (
+                    SELECT request_id FROM transitions
+                    WHERE id IN (SELECT MAX(id) FROM transitions GROUP BY request_id)
+                    AND state IN ({", ".join("?" for _ in TERMINAL)})
+                )
+            """, TERMINAL).rowcount
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,51 @@
+import re
+
+
+class KeywordScanner:
+    """Counts every occurrence of a set of keywords in a single pass over the text.
+
+    All keywords are folded into one precompiled regex. The pattern is a
+    lookahead, so overlapping occurrences are found too, and keywords that are
+    prefixes of a longer match at the same position are credited alongside it.
+    Results match a separate substring count per keyword, without rescanning
+    the text once per keyword.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = sorted(set(kw for kw in keywords if kw), key=lambda kw: (-len(kw), kw))
+        self.max_length = len(self.keywords[0]) if self.keywords else 0
+        self.pattern = None
+        if self.keywords:
+            self.pattern = re.compile("(?=(" + "|".join(re.escape(kw) for kw in self.keywords) + "))")
+        # Shorter keywords that also match wherever a longer one does
+        self.prefixes = {
+            kw: [other for other in self.keywords if other != kw and kw.startswith(other)]
+            for kw in self.keywords
+        }
+
+    def scan(self, text, hits=None, offset=0, skip_before=0, starts_before=None):
+        """Add keyword hits in text to hits ({keyword: [count, first_offset]}) and return it.
+
+        offset is added to reported positions, for text that is one chunk of a
+        larger document. Matches ending at or before skip_before are ignored, so
+        an overlap carried over from the previous chunk is not counted twice.
+        With starts_before, only matches starting before that position count.
+        """
+        if hits is None:
+            hits = {}
+        if self.pattern is None:
+            return hits
+        for match in self.pattern.finditer(text):
+            start = match.start()
+            if starts_before is not None and start >= starts_before:
+                break
+            longest = match.group(1)
+            for kw in [longest] + self.prefixes[longest]:
+                if start + len(kw) <= skip_before:
+                    continue
+                entry = hits.get(kw)
+                if entry is None:
+                    hits[kw] = [1, offset + start]
+                else:
+                    entry[0] += 1
+        return hits
@@ -0,0 +1,71 @@
+import os
+import json
+import logging
+import threading
+
+logger = logging.getLogger("GPO Local Brain Linguist Snapshot")
+
+
+class LinguistSnapshot:
+    """Local copy of the organization's linguist profiles, kept in sync by deltas.
+
+    The snapshot is saved to disk so a restarted Local Brain starts with the
+    last known profiles and only asks the cloud for what changed since.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.linguists = {}
+        self.sync_token = None
+        self.etag = None
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.error(f"Ignoring unreadable linguist snapshot {self.path}: {e}")
+            return
+        with self.lock:
+            self.linguists = {l["id"]: l for l in data.get("linguists", [])}
+            self.sync_token = data.get("sync_token")
+            self.etag = data.get("etag")
+        logger.info(f"Loaded {len(self.linguists)} linguist profiles from snapshot.")
+
+    def save(self):
+        with self.lock:
+            data = {"sync_token": self.sync_token, "etag": self.etag, "linguists": list(self.linguists.values())}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def reset(self):
+        """Forget the sync position so the next sync downloads the full list."""
+        with self.lock:
+            self.sync_token = None
+            self.etag = None
+
+    def apply(self, data, etag=None):
+        """Merge a sync response. Returns False if the snapshot is incomplete and needs a full sync."""
+        # Responses without a sync token come from clouds that only serve the full list
+        full = data.get("full", True) or "sync_token" not in data
+        with self.lock:
+            if full:
+                self.linguists = {}
+            for linguist in data.get("linguists", []):
+                self.linguists[linguist["id"]] = linguist
+            self.sync_token = data.get("sync_token")
+            self.etag = etag
+            total = data.get("total")
+            # Deletions do not show up in a delta; a count mismatch means some happened
+            return total is None or total == len(self.linguists)
+
+    def profiles(self):
+        with self.lock:
+            return list(self.linguists.values())
@@ -1,10 +1,33 @@
+import os
 import sys
+import time
+import signal
 import logging
 import threading
-from config import GPO_CLOUD_API_URL, GPO_ORGANIZATION_API_KEY
-from document_processor import extract_text
+import itertools
+import json
+from datetime import datetime, date, timedelta
+from config import GPO_CLOUD_API_URL, GPO_ORGANIZATION_API_KEY, LOCAL_BRAIN_CHUNK_CHARS, \
+    LOCAL_BRAIN_CACHE_DIR, LOCAL_BRAIN_CACHE_MAX_BYTES, LOCAL_BRAIN_KEYWORDS_FILE, LOCAL_BRAIN_MAX_WORKERS, \
+    LOCAL_BRAIN_OUTBOX_PATH, LOCAL_BRAIN_METRICS_HOST, LOCAL_BRAIN_METRICS_PORT, LOCAL_BRAIN_EXTRACTION_PROCESSES, \
+    LOCAL_BRAIN_EXTRACTION_TIMEOUT, LOCAL_BRAIN_EXTRACTION_MEMORY_LIMIT, LOCAL_BRAIN_EXTRACTION_MAX_TASKS, \
+    LOCAL_BRAIN_WATCH_DIR, LOCAL_BRAIN_WATCH_INTERVAL, LOCAL_BRAIN_WATCH_DEBOUNCE, LOCAL_BRAIN_WATCH_STATE_PATH, \
+    LOCAL_BRAIN_WATCH_CONTENT_TYPE, LOCAL_BRAIN_WATCH_CLIENT_NAME, LOCAL_BRAIN_WATCH_SOURCE_LANG, \
+    LOCAL_BRAIN_WATCH_TARGET_LANG, LOCAL_BRAIN_WATCH_DEADLINE_DAYS, LOCAL_BRAIN_BLUEPRINT_STORE_PATH, \
+    LOCAL_BRAIN_BLUEPRINT_STORE_MAX_ENTRIES, LOCAL_BRAIN_BLUEPRINT_STORE_MAX_AGE_DAYS, LOCAL_BRAIN_FORCE_REFRESH, \
+    LOCAL_BRAIN_ASYNC, LOCAL_BRAIN_ORGANIZATIONS_FILE
+from document_processor import iter_text, SUPPORTED_EXTENSIONS
+from extraction_cache import ExtractionCache, file_digest
+from blueprint_store import BlueprintStore, blueprint_key, linguist_version
+from extraction_sandbox import ExtractionSandbox
+from folder_watcher import FolderWatcher
+from cloud_client import CloudClient
+from outbox import Outbox
 import ai_analyzer
 from scheduler import LocalBrainScheduler
+from async_scheduler import AsyncLocalBrainScheduler
+from multi_scheduler import MultiOrganizationScheduler, organization_path
+import metrics
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("GPO Local Brain")
@@ -12,66 +35,289 @@ logger = logging.getLogger("GPO Local Brain")
 # Global cache for linguist profiles
 global_linguist_profiles = []
 
+# Pooled connection to the Cloud GPO shared by the scheduler and all workers;
+# everything it sends goes through the on-disk outbox first. Created by main_service:
+# a process serving several organizations has one client per organization instead
+cloud_client = None
+
+# Extracted text of previously seen files, shared by all workers
+extraction_cache = ExtractionCache(LOCAL_BRAIN_CACHE_DIR, LOCAL_BRAIN_CACHE_MAX_BYTES) if LOCAL_BRAIN_CACHE_MAX_BYTES > 0 else None
+
+# Separate processes that do the actual parsing, with per-document time and memory limits
+extraction_sandbox = ExtractionSandbox(
+    LOCAL_BRAIN_EXTRACTION_PROCESSES,
+    timeout=LOCAL_BRAIN_EXTRACTION_TIMEOUT,
+    memory_limit=LOCAL_BRAIN_EXTRACTION_MEMORY_LIMIT,
+    max_tasks_per_child=LOCAL_BRAIN_EXTRACTION_MAX_TASKS
+) if LOCAL_BRAIN_EXTRACTION_PROCESSES > 0 else None
+
+def load_keyword_sets(path):
+    """Default analyzer keywords plus the organization's own from a JSON file, if configured."""
+    if not path:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return ai_analyzer.build_keyword_sets(json.load(f))
+
+# Keyword lists used by the analyzer
+keyword_sets = load_keyword_sets(LOCAL_BRAIN_KEYWORDS_FILE)
+analyzer_version = ai_analyzer.analyzer_fingerprint(keyword_sets)
+
+# Finished blueprints, reused when an identical document is analyzed again
+blueprint_store = BlueprintStore(
+    LOCAL_BRAIN_BLUEPRINT_STORE_PATH,
+    max_entries=LOCAL_BRAIN_BLUEPRINT_STORE_MAX_ENTRIES,
+    max_age=LOCAL_BRAIN_BLUEPRINT_STORE_MAX_AGE_DAYS * 24 * 3600
+) if LOCAL_BRAIN_BLUEPRINT_STORE_MAX_ENTRIES > 0 else None
+
+# Cloud client and analyzer keywords of each organization when serving several; the
+# module-level ones above serve the single organization of a one-organization process
+organization_contexts = {}
+
+def organization_context(organization_id):
+    context = organization_contexts.get(organization_id)
+    if context is None:
+        context = {"cloud": cloud_client, "keyword_sets": keyword_sets, "analyzer_version": analyzer_version}
+    return context
+
+def load_organizations(path):
+    """{organization_id: {"api_key": ..., "keywords_file": ...}} from a JSON file."""
+    with open(path, "r", encoding="utf-8") as f:
+        organizations = json.load(f)
+    if not isinstance(organizations, dict) or not organizations:
+        raise ValueError(f"{path} must map organization ids to their settings")
+    for organization_id, settings in organizations.items():
+        if not settings.get("api_key"):
+            raise ValueError(f"No api_key for organization {organization_id}")
+    return organizations
+
+def register_organization(organization_id, settings):
+    """Give an organization its own cloud client (API key and outbox) and analyzer keywords."""
+    org_keyword_sets = load_keyword_sets(settings.get("keywords_file"))
+    organization_contexts[organization_id] = {
+        "cloud": CloudClient(GPO_CLOUD_API_URL, settings["api_key"], pool_size=LOCAL_BRAIN_MAX_WORKERS + 2,
+                             outbox=Outbox(organization_path(LOCAL_BRAIN_OUTBOX_PATH, organization_id))),
+        "keyword_sets": org_keyword_sets,
+        "analyzer_version": ai_analyzer.analyzer_fingerprint(org_keyword_sets),
+    }
+    return organization_contexts[organization_id]
+
 def update_linguists(profiles):
     global global_linguist_profiles
     global_linguist_profiles = profiles
 
-def process_document_locally(file_path, local_analysis_request_id, organization_id, content_type, linguist_profiles=None):
+def process_document_locally(file_path, local_analysis_request_id, organization_id, content_type, linguist_profiles=None,
+                             force_refresh=False):
     logger.info(f"Processing document: {file_path}")
-    text, error = extract_text(file_path)
-    if not text:
+    # Use latest linguist profiles
+    linguist_profiles = linguist_profiles or global_linguist_profiles
+    context = organization_context(organization_id)
+    # Read the file once for both the blueprint store and the extraction cache
+    digest = content_digest(file_path)
+    memo_key = blueprint_memo_key(digest, organization_id, content_type, linguist_profiles, context["analyzer_version"])
+    blueprint = None
+    if memo_key and not (force_refresh or LOCAL_BRAIN_FORCE_REFRESH):
+        blueprint = blueprint_store.get(memo_key)
+    if blueprint:
+        logger.info(f"Reusing blueprint of an identical earlier document.")
+        metrics.BLUEPRINTS_REUSED.inc()
+        send_blueprint_to_cloud(local_analysis_request_id, blueprint, reused=True, cloud=context["cloud"])
+        return blueprint, None
+    blueprint, error = analyze_file(file_path, linguist_profiles, content_type, context["keyword_sets"], digest=digest)
+    if blueprint and memo_key:
+        blueprint_store.put(memo_key, blueprint)
+    if not blueprint:
         status = "Error in Local Analysis (Text Extraction Failed)"
         payload = {
             "local_analysis_request_id": local_analysis_request_id,
             "local_analysis_status": status,
-            "ai_analysis_timestamp": None
+            "ai_analysis_timestamp": datetime.utcnow().isoformat() + "Z"
         }
-        headers = {"X-API-Key": GPO_ORGANIZATION_API_KEY}
-        try:
-            import requests
-            from datetime import datetime
-            payload["ai_analysis_timestamp"] = datetime.utcnow().isoformat() + "Z"
-            requests.post(f"{GPO_CLOUD_API_URL}/api/local-analysis-results", json=payload, headers=headers, timeout=10)
-            logger.info(f"Status update sent to Cloud GPO.")
-        except Exception as e:
-            logger.error(f"Failed to send status update: {e}")
+        context["cloud"].queue_result(payload)
+        logger.info(f"Status update queued for Cloud GPO.")
         return None, error
-    # Use latest linguist profiles
-    blueprint = ai_analyzer.analyze_document(text, linguist_profiles or global_linguist_profiles, content_type)
-    send_blueprint_to_cloud(local_analysis_request_id, blueprint)
-    return text, None
+    send_blueprint_to_cloud(local_analysis_request_id, blueprint, cloud=context["cloud"])
+    return blueprint, None
+
+def content_digest(file_path):
+    """The file's content hash if the blueprint store or extraction cache needs it, else None."""
+    if blueprint_store is None and extraction_cache is None:
+        return None
+    try:
+        return file_digest(file_path)
+    except OSError:
+        return None  # analyze_file reports the error
+
+def blueprint_memo_key(digest, organization_id, content_type, linguist_profiles, analyzer_version=analyzer_version):
+    """Key of the file's blueprint in the store, or None if the store is off or the file unreadable."""
+    if blueprint_store is None or digest is None:
+        return None
+    return blueprint_key(digest, organization_id, content_type, linguist_version(linguist_profiles), analyzer_version)
+
+def analyze_file(file_path, linguist_profiles, content_type, keyword_sets=keyword_sets, digest=None):
+    """Stream a document through the analyzer chunk by chunk, without building its full text."""
+    file_type = os.path.splitext(file_path)[1].lower()
+    if file_type not in SUPPORTED_EXTENSIONS:
+        file_type = "other"  # keeps metric labels bounded
+    extraction_time = [0.0]
+    started = time.perf_counter()
+    chunks = timed_chunks(iter_text(file_path, chunk_size=LOCAL_BRAIN_CHUNK_CHARS, cache=extraction_cache,
+                                   sandbox=extraction_sandbox, digest=digest), extraction_time)
+    outcome = "failed"
+    try:
+        # Leading blank pages carry nothing to analyze; a document with no text at all is an extraction failure
+        first = next((chunk for chunk in chunks if chunk.strip()), None)
+        if first is None:
+            return None, "No text could be extracted"
+        blueprint = ai_analyzer.analyze_document_stream(itertools.chain([first], chunks), linguist_profiles, content_type, keyword_sets)
+        outcome = "analyzed"
+        metrics.ANALYSIS_SECONDS.observe(time.perf_counter() - started - extraction_time[0])
+        return blueprint, None
+    except Exception as e:
+        return None, f"Error extracting text: {e}"
+    finally:
+        metrics.EXTRACTION_SECONDS.observe(extraction_time[0], file_type=file_type)
+        metrics.DOCUMENTS_PROCESSED.inc(file_type=file_type, outcome=outcome)
+        if os.path.exists(file_path):
+            metrics.BYTES_PROCESSED.inc(os.path.getsize(file_path), file_type=file_type)
+
+def timed_chunks(chunks, elapsed):
+    """Yield from chunks, adding the time spent producing them to elapsed[0].
+
+    Extraction and analysis interleave when streaming, so this is how the two are timed apart.
+    """
+    while True:
+        start = time.perf_counter()
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            return
+        finally:
+            elapsed[0] += time.perf_counter() - start
+        yield chunk
 
-def send_blueprint_to_cloud(local_analysis_request_id, blueprint):
-    from datetime import datetime
-    import requests
+def send_blueprint_to_cloud(local_analysis_request_id, blueprint, reused=False, cloud=None):
     payload = {"local_analysis_request_id": local_analysis_request_id, "local_analysis_status": "Analysis Complete"}
     payload.update(blueprint)
+    # True when the blueprint was taken from an identical earlier document
+    payload["ai_blueprint_reused"] = reused
     payload["ai_analysis_timestamp"] = datetime.utcnow().isoformat() + "Z"
-    headers = {"X-API-Key": GPO_ORGANIZATION_API_KEY}
+    # Sent with the next batch by the cloud client's flusher
+    (cloud or cloud_client).queue_result(payload)
+    logger.info(f"Blueprint queued for Cloud GPO.")
+
+def register_watched_file(local_analysis_request_id, file_path, content_type):
+    """Ask the cloud to create a project for a hot-folder document (a changed file keeps its project)."""
+    payload = {
+        "local_analysis_request_id": local_analysis_request_id,
+        "project_name": os.path.basename(file_path),
+        "client_name": LOCAL_BRAIN_WATCH_CLIENT_NAME,
+        "source_lang": LOCAL_BRAIN_WATCH_SOURCE_LANG,
+        "target_lang": LOCAL_BRAIN_WATCH_TARGET_LANG,
+        "content_type": content_type,
+        "desired_deadline": (date.today() + timedelta(days=LOCAL_BRAIN_WATCH_DEADLINE_DAYS)).isoformat(),
+        "file_path": file_path,
+        "local_analysis_status": "Processing Local Analysis"
+    }
+    cloud_client.queue_registration(payload)
+
+def process_watched_file(watcher, file_path, local_analysis_request_id, signature, organization_id):
+    content_type = watcher.content_type(file_path)
+    register_watched_file(local_analysis_request_id, file_path, content_type)
     try:
-        resp = requests.post(f"{GPO_CLOUD_API_URL}/api/local-analysis-results", json=payload, headers=headers, timeout=10)
-        resp.raise_for_status()
-        logger.info(f"Blueprint sent to Cloud GPO: {resp.status_code}")
-    except Exception as e:
-        logger.error(f"Failed to send blueprint: {e}")
+        blueprint, error = process_document_locally(file_path, local_analysis_request_id, organization_id, content_type)
+    finally:
+        # A failed analysis was reported to the cloud too; only a new version of the file is retried
+        watcher.mark_done(file_path, local_analysis_request_id, signature)
+    if error:
+        raise RuntimeError(error)
+
+def watch_folder(watcher, worker_pool, organization_id, shutdown_event):
+    """Feed new and changed hot-folder documents to the worker pool until shutdown."""
+    logger.info(f"Watching {watcher.root} for documents.")
+    while not shutdown_event.is_set():
+        try:
+            for file_path, request_id, signature in watcher.scan():
+                if worker_pool.is_tracked(request_id):
+                    continue
+                deadline = time.time() + LOCAL_BRAIN_WATCH_DEADLINE_DAYS * 24 * 3600
+                if not worker_pool.submit(request_id, process_watched_file, watcher, file_path, request_id, signature,
+                                          organization_id, deadline=deadline, size=signature[0],
+                                          tenant=organization_id, preemptible=False):
+                    break  # pool is full; the file is offered again on the next scan
+                logger.info(f"Hot folder document queued: {file_path}")
+        except Exception as e:
+            logger.error(f"Hot folder scan error: {e}")
+        shutdown_event.wait(LOCAL_BRAIN_WATCH_INTERVAL)
 
-def main_service(organization_id):
+def main_service(organization_id, watch_dir=None):
+    global cloud_client
+    cloud_client = CloudClient(GPO_CLOUD_API_URL, GPO_ORGANIZATION_API_KEY, pool_size=LOCAL_BRAIN_MAX_WORKERS + 2,
+                               outbox=Outbox(LOCAL_BRAIN_OUTBOX_PATH))
     shutdown_event = threading.Event()
-    scheduler = LocalBrainScheduler(
+    scheduler_class = AsyncLocalBrainScheduler if LOCAL_BRAIN_ASYNC else LocalBrainScheduler
+    scheduler = scheduler_class(
         process_document_callback=process_document_locally,
         update_linguists_callback=update_linguists,
         organization_id=organization_id,
-        shutdown_event=shutdown_event
+        shutdown_event=shutdown_event,
+        cloud_client=cloud_client
     )
+    if LOCAL_BRAIN_METRICS_PORT:
+        metrics.watch_service(scheduler.worker_pool, cloud_client, extraction_cache)
+        metrics.start_metrics_server(LOCAL_BRAIN_METRICS_HOST, LOCAL_BRAIN_METRICS_PORT)
+    if watch_dir:
+        watcher = FolderWatcher(watch_dir, LOCAL_BRAIN_WATCH_DEBOUNCE, LOCAL_BRAIN_WATCH_STATE_PATH, LOCAL_BRAIN_WATCH_CONTENT_TYPE)
+        threading.Thread(target=watch_folder, args=(watcher, scheduler.worker_pool, organization_id, shutdown_event),
+                         name="gpo-folder-watcher", daemon=True).start()
+    # docker stop / systemd: finish in-flight work, then exit; anything unfinished resumes on the next start
+    signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.drain())
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        logger.info("Received shutdown signal. Exiting...")
+        shutdown_event.set()
+        scheduler.drained = scheduler.worker_pool.shutdown(wait=True, timeout=scheduler.drain_timeout)
+        cloud_client.close()
+    finally:
+        # Jobs abandoned at the drain deadline must not be failed by killing their extraction
+        # process; they were never marked finished and are resumed from the journal instead
+        if extraction_sandbox is not None and scheduler.drained:
+            extraction_sandbox.close()
+
+def main_multi_service(organizations_file):
+    """Serve every organization listed in organizations_file from this process."""
+    shutdown_event = threading.Event()
+    clients = {organization_id: register_organization(organization_id, settings)["cloud"]
+               for organization_id, settings in load_organizations(organizations_file).items()}
+    scheduler = MultiOrganizationScheduler(process_document_locally, clients, shutdown_event)
+    if LOCAL_BRAIN_METRICS_PORT:
+        metrics.watch_service(scheduler.worker_pool, list(clients.values()), extraction_cache)
+        metrics.start_metrics_server(LOCAL_BRAIN_METRICS_HOST, LOCAL_BRAIN_METRICS_PORT)
+    if LOCAL_BRAIN_WATCH_DIR:
+        logger.warning("The hot folder belongs to a single organization; it is not watched when serving several.")
+    signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.drain())
     try:
         scheduler.run()
     except KeyboardInterrupt:
         logger.info("Received shutdown signal. Exiting...")
         shutdown_event.set()
+        scheduler.drained = scheduler.worker_pool.shutdown(wait=True, timeout=scheduler.drain_timeout)
+        for client in clients.values():
+            client.close()
+    finally:
+        if extraction_sandbox is not None and scheduler.drained:
+            extraction_sandbox.close()
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python main.py <organization_id>")
+    if len(sys.argv) == 3 and sys.argv[1] == "--organizations":
+        main_multi_service(sys.argv[2])
+    elif len(sys.argv) == 1 and LOCAL_BRAIN_ORGANIZATIONS_FILE:
+        main_multi_service(LOCAL_BRAIN_ORGANIZATIONS_FILE)
+    elif len(sys.argv) not in (2, 4) or (len(sys.argv) == 4 and sys.argv[2] != "--watch"):
+        print("Usage: python main.py <organization_id> [--watch <folder>]")
+        print("       python main.py --organizations <organizations.json>")
         sys.exit(1)
-    organization_id = sys.argv[1]
-    main_service(organization_id) 
\ No newline at end of file
+    else:
+        organization_id = sys.argv[1]
+        watch_dir = sys.argv[3] if len(sys.argv) == 4 else LOCAL_BRAIN_WATCH_DIR
+        main_service(organization_id, watch_dir)
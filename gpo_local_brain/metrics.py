@@ -0,0 +1,214 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from worker_pool import QUEUED
+
+logger = logging.getLogger("GPO Local Brain Metrics")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _label_text(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{str(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=(), callback=None):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.callback = callback  # reads the value at scrape time instead of it being recorded
+        self.lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        if self.callback is None:
+            lines.extend(self._samples())
+            return lines
+        try:
+            lines.append(f"{self.name} {self.callback()}")
+        except Exception as e:
+            logger.error(f"Could not read metric {self.name}: {e}")
+        return lines
+
+    def _samples(self):
+        with self.lock:
+            return [f"{self.name}{_label_text(self.labels, key)} {value}" for key, value in sorted(self.values.items())]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=(), callback=None):
+        super().__init__(name, help_text, labels, callback)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labels=(), callback=None):
+        super().__init__(name, help_text, labels, callback)
+        self.values = {}
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self):
+        lines = []
+        with self.lock:
+            for key, series in sorted(self.series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_label_text(self.labels + ('le',), key + (bound,))} {count}")
+                lines.append(f"{self.name}_bucket{_label_text(self.labels + ('le',), key + ('+Inf',))} {series[-1]}")
+                lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_label_text(self.labels, key)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _register(self, metric):
+        with self.lock:
+            self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labels=(), callback=None):
+        return self._register(Counter(name, help_text, labels, callback))
+
+    def gauge(self, name, help_text, labels=(), callback=None):
+        return self._register(Gauge(name, help_text, labels, callback))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Hot-path timers shared across the Local Brain
+EXTRACTION_SECONDS = REGISTRY.histogram(
+    "gpo_local_brain_extraction_seconds", "Time spent extracting text from a document.", ["file_type"])
+ANALYSIS_SECONDS = REGISTRY.histogram(
+    "gpo_local_brain_analysis_seconds", "Time spent analyzing extracted text, excluding extraction.")
+UPLOAD_SECONDS = REGISTRY.histogram(
+    "gpo_local_brain_upload_seconds", "Time taken to deliver a batch of updates to the Cloud GPO.")
+POLL_SECONDS = REGISTRY.histogram(
+    "gpo_local_brain_poll_seconds", "Round trip of a request poll to the Cloud GPO, including long-poll holds.", ["mode"])
+BYTES_PROCESSED = REGISTRY.counter(
+    "gpo_local_brain_bytes_processed_total", "Size of the source documents processed.", ["file_type"])
+DOCUMENTS_PROCESSED = REGISTRY.counter(
+    "gpo_local_brain_documents_processed_total", "Documents processed, by outcome.", ["file_type", "outcome"])
+
+BLUEPRINTS_REUSED = REGISTRY.counter(
+    "gpo_local_brain_blueprints_reused_total", "Documents answered with the stored blueprint of an identical document.")
+EXTRACTION_RECYCLED = REGISTRY.counter(
+    "gpo_local_brain_extraction_recycled_total", "Extraction processes replaced, by reason.", ["reason"])
+
+
+def watch_service(worker_pool, cloud_client, extraction_cache=None, registry=REGISTRY):
+    """Expose the live state of a running Local Brain, read at scrape time.
+
+    cloud_client may be a list (one per organization served); outbox depths are summed.
+    """
+    cloud_clients = cloud_client if isinstance(cloud_client, (list, tuple)) else [cloud_client]
+    registry.gauge("gpo_local_brain_queue_depth", "Requests waiting for a worker.",
+                   callback=lambda: worker_pool.snapshot()[QUEUED])
+    registry.gauge("gpo_local_brain_in_flight", "Requests queued or running.",
+                   callback=lambda: worker_pool.snapshot()["in_flight"])
+    registry.gauge("gpo_local_brain_outbox_pending", "Updates waiting to be delivered to the Cloud GPO.",
+                   callback=lambda: sum(client.outbox_depth()["pending"] for client in cloud_clients))
+    registry.gauge("gpo_local_brain_outbox_dead", "Updates the Cloud GPO rejected.",
+                   callback=lambda: sum(client.outbox_depth()["dead"] for client in cloud_clients))
+    if extraction_cache is not None:
+        registry.counter("gpo_local_brain_extraction_cache_hits_total", "Extractions served from the cache.",
+                         callback=lambda: extraction_cache.stats()["hits"])
+        registry.counter("gpo_local_brain_extraction_cache_misses_total", "Extractions that had to parse the file.",
+                         callback=lambda: extraction_cache.stats()["misses"])
+        registry.gauge("gpo_local_brain_extraction_cache_bytes", "Size of the extracted-text cache.",
+                       callback=lambda: extraction_cache.stats()["bytes"])
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(host, port, registry=REGISTRY):
+    """Serve GET /metrics on a background thread. Returns the server (call shutdown() to stop)."""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="gpo-metrics", daemon=True).start()
+    logger.info(f"Metrics available at http://{host}:{server.server_port}/metrics")
+    return server
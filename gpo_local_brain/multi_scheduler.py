@@ -0,0 +1,179 @@
+import os
+import time
+import logging
+from config import LOCAL_BRAIN_MAX_WORKERS, LOCAL_BRAIN_MAX_IN_FLIGHT, LOCAL_BRAIN_ORG_MAX_IN_FLIGHT, \
+    LOCAL_BRAIN_LONG_POLL, LOCAL_BRAIN_LONG_POLL_WAIT, LOCAL_BRAIN_LINGUIST_SNAPSHOT_PATH, LOCAL_BRAIN_PRIORITY_AGING, \
+    LOCAL_BRAIN_PREEMPT, LOCAL_BRAIN_PREEMPT_MIN_BYTES, LOCAL_BRAIN_URGENT_HOURS, LOCAL_BRAIN_JOURNAL_PATH, \
+    LOCAL_BRAIN_DRAIN_TIMEOUT, LOCAL_BRAIN_JOURNAL_COMPACT_INTERVAL
+from worker_pool import DocumentWorkerPool
+from linguist_snapshot import LinguistSnapshot
+from journal import RequestJournal
+from scheduler import LocalBrainScheduler
+from metrics import POLL_SECONDS
+
+logger = logging.getLogger("GPO Local Brain Multi-Organization Scheduler")
+
+
+def organization_path(path, organization_id):
+    """Per-organization variant of a state file path: data/outbox.db -> data/outbox-<organization_id>.db."""
+    root, ext = os.path.splitext(path)
+    return f"{root}-{organization_id}{ext}"
+
+
+class MultiOrganizationScheduler:
+    """Serves several organizations from one Local Brain process.
+
+    Each organization keeps its own LocalBrainScheduler, with its own API key
+    and outbox (through its cloud client), linguist snapshot, status updates
+    and error reports. They share one worker pool, in which the organizations
+    take turns, and one journal. New work for all of them is fetched with a
+    single (long-)poll of the batch endpoint instead of one poll each.
+    """
+
+    def __init__(self, process_document_callback, cloud_clients, shutdown_event, max_workers=None, max_in_flight=None,
+                 organization_max_in_flight=None, long_poll=None, journal=None, linguist_snapshots=None):
+        """cloud_clients: {organization_id: CloudClient authenticated with that organization's API key}."""
+        if not cloud_clients:
+            raise ValueError("At least one organization is required")
+        self.shutdown_event = shutdown_event
+        self.poll_interval = 60  # seconds
+        self.long_poll = LOCAL_BRAIN_LONG_POLL if long_poll is None else long_poll
+        self.long_poll_wait = LOCAL_BRAIN_LONG_POLL_WAIT
+        self.long_poll_retry_interval = 5
+        self.drain_timeout = LOCAL_BRAIN_DRAIN_TIMEOUT
+        self.journal_compact_interval = LOCAL_BRAIN_JOURNAL_COMPACT_INTERVAL
+        self.drained = True
+        self.batch_poll = True  # cleared if the cloud predates the batch endpoint
+        self.journal = journal or RequestJournal(LOCAL_BRAIN_JOURNAL_PATH)
+        max_in_flight = max_in_flight or LOCAL_BRAIN_MAX_IN_FLIGHT
+        # By default each organization may fill an equal share of the in-flight slots
+        share = organization_max_in_flight or LOCAL_BRAIN_ORG_MAX_IN_FLIGHT or -(-max_in_flight // len(cloud_clients))
+        self.worker_pool = DocumentWorkerPool(
+            max_workers or LOCAL_BRAIN_MAX_WORKERS,
+            max_in_flight,
+            aging=LOCAL_BRAIN_PRIORITY_AGING,
+            preempt=LOCAL_BRAIN_PREEMPT,
+            preempt_min_size=LOCAL_BRAIN_PREEMPT_MIN_BYTES,
+            urgent_seconds=LOCAL_BRAIN_URGENT_HOURS * 3600,
+            on_preempt=self.release_request,
+            tenant_limit=share
+        )
+        linguist_snapshots = linguist_snapshots or {}
+        self.organizations = {}
+        for organization_id, cloud_client in cloud_clients.items():
+            snapshot = linguist_snapshots.get(organization_id) or \
+                LinguistSnapshot(organization_path(LOCAL_BRAIN_LINGUIST_SNAPSHOT_PATH, organization_id))
+            # Profiles are passed with each request, so there is no process-wide copy to update
+            self.organizations[organization_id] = LocalBrainScheduler(
+                process_document_callback, lambda profiles: None, organization_id, shutdown_event,
+                long_poll=self.long_poll, cloud_client=cloud_client, linguist_snapshot=snapshot,
+                journal=self.journal, worker_pool=self.worker_pool
+            )
+
+    def open_organizations(self):
+        """Organizations with room for more work in the pool."""
+        return [organization_id for organization_id in self.organizations
+                if self.worker_pool.available_slots(organization_id) > 0]
+
+    def poll_cloud_gpo(self, wait=0):
+        """Fetch and queue new requests for every organization with room.
+
+        Returns the number of requests submitted, or None if the poll failed.
+        """
+        organization_ids = self.open_organizations()
+        if self.worker_pool.preempt:
+            # Urgent requests may still get in by preempting the organization's own queued work
+            organization_ids = list(self.organizations)
+        if not organization_ids:
+            return 0
+        if not self.batch_poll:
+            return self._poll_each(organization_ids)
+        first = self.organizations[organization_ids[0]]
+        try:
+            for organization_id in organization_ids:
+                self.organizations[organization_id].cloud.flush()
+            payload = {"organizations": {organization_id: self.organizations[organization_id].cloud.api_key
+                                         for organization_id in organization_ids}, "wait": wait}
+            with POLL_SECONDS.time(mode="long" if wait else "short"):
+                resp = first.cloud.post("/api/local-brain-requests/batch", payload, timeout=10 + wait)
+            if resp.status_code == 404:
+                logger.warning("Cloud GPO has no batch poll endpoint; polling each organization separately.")
+                self.batch_poll = False
+                return self._poll_each(organization_ids)
+            resp.raise_for_status()
+            data = resp.json()
+        except Exception as e:
+            logger.error(f"Polling error: {e}")
+            for organization_id in organization_ids:
+                self.organizations[organization_id].report_error(None, organization_id, "Polling Error", str(e))
+            return None
+        for organization_id, error in (data.get("errors") or {}).items():
+            logger.error(f"Polling error for organization {organization_id}: {error}")
+            if organization_id in self.organizations:
+                self.organizations[organization_id].report_error(None, organization_id, "Polling Error", error)
+        submitted = 0
+        for organization_id, requests_list in (data.get("requests") or {}).items():
+            if organization_id not in self.organizations:
+                continue
+            try:
+                submitted += self.organizations[organization_id].dispatch(requests_list)
+            except Exception as e:
+                logger.error(f"Dispatch error for organization {organization_id}: {e}")
+                self.organizations[organization_id].report_error(None, organization_id, "Polling Error", str(e))
+        return submitted
+
+    def _poll_each(self, organization_ids):
+        """One short poll per organization (clouds without the batch endpoint)."""
+        results = [self.organizations[organization_id].poll_cloud_gpo() for organization_id in organization_ids]
+        if all(result is None for result in results):
+            return None
+        return sum(result or 0 for result in results)
+
+    def resume(self):
+        """Queue every organization's unfinished requests from the shared journal."""
+        return sum(organization.resume() for organization in self.organizations.values())
+
+    def release_request(self, req_id):
+        """Hand a preempted request back to the cloud through the organization it came from."""
+        data = self.journal.request_data(req_id) or {}
+        organization = self.organizations.get(data.get("organization_id"))
+        if organization is None:
+            logger.error(f"Cannot release request {req_id}: unknown organization.")
+            return
+        organization.release_request(req_id)
+
+    def drain(self):
+        """Start a graceful shutdown: finish queued and running work within drain_timeout seconds."""
+        logger.info(f"Draining: finishing in-flight requests within {self.drain_timeout:g}s.")
+        self.worker_pool.shutdown(wait=False, timeout=self.drain_timeout)
+        self.shutdown_event.set()
+
+    def run(self):
+        logger.info(f"Starting Local Brain Scheduler for {len(self.organizations)} organizations.")
+        self.worker_pool.start()
+        self.resume()
+        while not self.shutdown_event.is_set():
+            now = time.time()
+            for organization in self.organizations.values():
+                if now - organization.last_linguist_sync > organization.linguist_sync_interval:
+                    organization.sync_linguist_profiles()
+                    organization.last_linguist_sync = now
+                organization.log_outbox_depth()
+            self.journal.compact_if_due(self.journal_compact_interval)
+            if not self.long_poll:
+                self.poll_cloud_gpo()
+                self.shutdown_event.wait(self.poll_interval)
+                continue
+            if not self.open_organizations():
+                # Wake as soon as any organization has room again
+                if not self.worker_pool.wait_for_slot(1, list(self.organizations)) and not self.worker_pool.preempt:
+                    continue
+            submitted = self.poll_cloud_gpo(wait=self.long_poll_wait if self.batch_poll else 0)
+            if submitted is None:
+                self.shutdown_event.wait(self.long_poll_retry_interval)
+            elif submitted == 0 and time.time() - now < 1:
+                self.shutdown_event.wait(1)
+        self.drained = self.worker_pool.shutdown(wait=True, timeout=self.drain_timeout)
+        for organization in self.organizations.values():
+            organization.cloud.close()
+        logger.info("Scheduler shutting down gracefully.")
@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import random
+import sqlite3
+import threading
+
+STATUS = "status"
+RESULT = "result"
+REGISTER = "register"
+
+
+class Outbox:
+    """SQLite-backed queue of payloads waiting to be delivered to the Cloud GPO.
+
+    Every payload is written here before any attempt to send it, so finished
+    analyses survive cloud outages and restarts. Failed deliveries are retried
+    with exponential backoff and jitter; payloads the cloud rejects outright
+    are kept as dead letters instead of being retried forever.
+    """
+
+    def __init__(self, path=":memory:", base_delay=1.0, max_delay=300.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                request_id TEXT,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                dead INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (dead, next_attempt_at)")
+
+    def put(self, kind, payload):
+        """Persist a payload. A new status update replaces any pending one for the same
+        request, and a result replaces pending status updates (it supersedes them)."""
+        request_id = payload.get("local_analysis_request_id")
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                if request_id is not None:
+                    self.conn.execute(
+                        "DELETE FROM outbox WHERE request_id = ? AND kind = ? AND dead = 0",
+                        (request_id, STATUS)
+                    )
+                self.conn.execute(
+                    "INSERT INTO outbox (kind, request_id, payload, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (kind, request_id, json.dumps(payload), now, now)
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def due(self, limit):
+        """Oldest deliverable entries: [(id, kind, payload), ...].
+
+        Nothing for a request is handed out while an earlier registration of
+        that request is still waiting to be retried, so the cloud always sees
+        the registration first.
+        """
+        now = time.time()
+        with self.lock:
+            rows = self.conn.execute(
+                """
+                SELECT id, kind, payload FROM outbox o
+                WHERE dead = 0 AND next_attempt_at <= ?
+                  AND NOT EXISTS (
+                      SELECT 1 FROM outbox r
+                      WHERE r.request_id = o.request_id AND r.kind = ? AND r.dead = 0
+                        AND r.id < o.id AND r.next_attempt_at > ?
+                  )
+                ORDER BY id LIMIT ?
+                """,
+                (now, REGISTER, now, limit)
+            ).fetchall()
+        return [(row_id, kind, json.loads(payload)) for row_id, kind, payload in rows]
+
+    def delete(self, ids):
+        with self.lock:
+            self.conn.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+
+    def retry_later(self, ids, error):
+        """Push entries back with exponential backoff and jitter."""
+        now = time.time()
+        with self.lock:
+            for row_id in ids:
+                row = self.conn.execute("SELECT attempts FROM outbox WHERE id = ?", (row_id,)).fetchone()
+                if row is None:
+                    continue
+                attempts = row[0] + 1
+                delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1)) * random.uniform(0.5, 1.5)
+                self.conn.execute(
+                    "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                    (attempts, now + delay, str(error), row_id)
+                )
+
+    def mark_dead(self, ids, error):
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE outbox SET dead = 1, last_error = ? WHERE id = ?",
+                [(str(error), i) for i in ids]
+            )
+
+    def next_due_in(self):
+        """Seconds until the next entry is due (0 if one is due now), or None if empty."""
+        with self.lock:
+            row = self.conn.execute("SELECT MIN(next_attempt_at) FROM outbox WHERE dead = 0").fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def depth(self):
+        with self.lock:
+            pending, dead = self.conn.execute(
+                "SELECT COALESCE(SUM(dead = 0), 0), COALESCE(SUM(dead = 1), 0) FROM outbox"
+            ).fetchone()
+        return {"pending": pending, "dead": dead}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,252 @@
+"""Detection of personal data values (emails, phone numbers, national IDs, ...).
+
+All patterns are folded into one precompiled regex that is run once over the
+text. The regex is a lookahead, so a candidate is found at every position
+where one of the patterns matches, and a candidate that lies inside a longer
+one starting earlier (the local part of a phone number, say) is dropped.
+
+Every pattern has bounded repetition and, apart from a character or two of
+context on either side, matches at most MAX_SPAN characters. Candidates can
+only start where the previous character cannot continue the value, so runs
+of letters or digits are tried once, not at every position, and only the
+text around digits and "@" (which every value contains) is searched at all.
+The scan is therefore linear in the length of the text, however unfriendly
+the input.
+
+Because whether a value is reported depends only on the text within
+SETTLE_CHARS of its start, detection also works chunk by chunk: chunk()
+settles the values well inside a chunk and keeps its edges, merge() settles
+the values around the junction of two chunks and finish() those at the
+very start and end of the document.
+"""
+import re
+
+# Month names (abbreviated or in full) for dates written out in words
+_MONTH = r"(?i:jan|feb|mar|apr|may|jun|jul|aug|sept?|oct|nov|dec)[a-zA-Z]{0,6}\.?"
+_DATE = (
+    r"(?:\d{1,2}[./-]\d{1,2}[./-](?:\d{4}|\d{2})"
+    r"|\d{4}-\d{2}-\d{2}"
+    rf"|\d{{1,2}}(?i:st|nd|rd|th)? {_MONTH},? \d{{4}}"
+    rf"|{_MONTH} \d{{1,2}}(?i:st|nd|rd|th)?,? \d{{4}})"
+)
+
+# (type, pattern) in order of precedence: where several match at the same position the first wins.
+# Patterns must not contain capturing groups, and may only match after a non-word character and
+# starting with a word character, "+" or "(".
+PATTERNS = [
+    ("date_of_birth", r"(?<!\w)(?i:dob|d\.o\.b\.?|date of birth|birth ?date|born(?: on)?)"
+                      rf"[ \t]{{0,3}}[:-]?[ \t]{{0,3}}{_DATE}(?!\w)"),
+    ("email", r"(?<![\w.%+-])[A-Za-z0-9][A-Za-z0-9._%+-]{0,63}@(?:[A-Za-z0-9-]{1,63}\.){1,4}[A-Za-z]{2,24}(?![\w-])"),
+    ("iban", r"(?<!\w)[A-Z]{2}\d{2}(?: ?[A-Z0-9]{4}){2,7}(?: ?[A-Z0-9]{1,3})?(?![A-Za-z0-9])"),
+    ("payment_card", r"(?<![\w+-])(?:\d[ -]?){12,18}\d(?!\w|[ -]\d)"),
+    # US social security numbers and UK national insurance numbers
+    ("national_id", r"(?<![\w-])(?!000|666|9\d\d)\d{3}-(?!00)\d{2}-(?!0000)\d{4}(?![\w-])"
+                    r"|(?<!\w)(?!BG|GB|KN|NK|NT|TN|ZZ)[A-CEGHJ-PR-TW-Z][A-CEGHJ-NPR-TW-Z]"
+                    r" ?\d{2} ?\d{2} ?\d{2} ?[A-D](?![A-Za-z0-9])"),
+    ("passport", r"(?<!\w)(?i:passport)(?:[ \t]{1,3}(?i:no\.?|number|#))?[ \t]{0,3}[:#]?[ \t]{0,3}"
+                 r"(?=[A-Z0-9]{0,8}\d)[A-Z0-9]{6,9}(?![A-Za-z0-9])"),
+    ("medical_record", r"(?<!\w)(?i:mrn|medical record(?:[ \t]{1,3}(?:no\.?|number|#))?)[ \t]{0,3}[:#]?[ \t]{0,3}"
+                       r"(?=[A-Z0-9-]{0,11}\d)[A-Z0-9][A-Z0-9-]{3,11}(?![A-Za-z0-9-])"),
+    ("phone", r"(?<![\w+])(?:"
+              r"\+\d{1,3}[ .-]?(?:\(\d{1,4}\)[ .-]?)?\d{1,4}(?:[ .-]?\d{2,4}){1,4}"
+              r"|\(\d{2,4}\)[ .-]?\d{3,4}[ .-]?\d{3,4}"
+              r"|\d{3}[.-]\d{3}[.-]\d{4}"
+              r"|0\d{2,4}[ -]\d{3,4}[ -]?\d{3,4}"
+              r")(?!\w|[.-]\d)"),
+]
+PII_TYPES = [kind for kind, _ in PATTERNS]
+
+# Singular and plural names for summaries
+LABELS = {
+    "date_of_birth": ("date of birth", "dates of birth"),
+    "email": ("email address", "email addresses"),
+    "iban": ("IBAN", "IBANs"),
+    "payment_card": ("payment card number", "payment card numbers"),
+    "national_id": ("national ID number", "national ID numbers"),
+    "passport": ("passport number", "passport numbers"),
+    "medical_record": ("medical record number", "medical record numbers"),
+    "phone": ("phone number", "phone numbers"),
+}
+
+MAX_SPAN = 345  # longest possible match of any pattern (an email address)
+LOOKAROUND = 2  # characters of context a pattern may look at before or after its match
+# Whether a value starting at some position is reported depends on no text further away than this
+SETTLE_CHARS = MAX_SPAN + LOOKAROUND
+
+# Every value has a digit or "@" at most LEAD_CHARS after its start (the "@" of an email address)
+LEAD_CHARS = 64
+# Runs of digits and "@" close enough together to be searched as one stretch of text
+_ANCHORS = re.compile(rf"[\d@](?:[^\d@]{{0,{SETTLE_CHARS + LEAD_CHARS}}}[\d@])*")
+
+_PATTERN = re.compile(r"(?<!\w)(?=[\w+(])(?=" + "|".join(f"(?P<{kind}>{pattern})" for kind, pattern in PATTERNS) + ")")
+_SINGLE = {kind: re.compile(pattern) for kind, pattern in PATTERNS}
+
+
+def _iban_valid(value):
+    iban = value.replace(" ", "")
+    if not 15 <= len(iban) <= 34:
+        return False
+    digits = "".join(str(int(ch, 36)) for ch in iban[4:] + iban[:4])
+    return int(digits) % 97 == 1
+
+
+def _luhn_valid(value):
+    digits = [int(ch) for ch in value if ch.isdigit()]
+    if not 13 <= len(digits) <= 19:
+        return False
+    total = 0
+    for i, digit in enumerate(reversed(digits)):
+        if i % 2:
+            digit = digit * 2 - 9 if digit > 4 else digit * 2
+        total += digit
+    return total % 10 == 0
+
+
+def _phone_valid(value):
+    return 7 <= sum(ch.isdigit() for ch in value) <= 15
+
+
+_VALIDATORS = {"iban": _iban_valid, "payment_card": _luhn_valid, "phone": _phone_valid}
+
+
+def _candidates(text, lo, hi):
+    """(type, start, end) of every valid match starting in [lo, hi), in order of start.
+
+    A match whose checksum fails is reported with type None: it is not a value
+    itself, but no value is reported inside it either.
+    """
+    for cluster in _ANCHORS.finditer(text, lo):
+        start = max(lo, cluster.start() - LEAD_CHARS)
+        if start >= hi:
+            break
+        end = min(hi, cluster.end())
+        # No match looks further than SETTLE_CHARS past its start, so the text can be cut off there
+        for match in _PATTERN.finditer(text, start, min(len(text), end + SETTLE_CHARS)):
+            start = match.start()
+            if start >= end:
+                break
+            kind = match.lastgroup
+            validator = _VALIDATORS.get(kind)
+            if validator is not None and not validator(match.group(kind)):
+                # Checksum failed: a pattern further down the list may still match here
+                fallback, stop = _fallback(text, start, kind)
+                if fallback is not None:
+                    yield fallback, start, stop
+                yield None, start, match.end(kind)
+            else:
+                yield kind, start, match.end(kind)
+
+
+def _fallback(text, start, failed):
+    for kind in PII_TYPES[PII_TYPES.index(failed) + 1:]:
+        match = _SINGLE[kind].match(text, start)
+        if match is not None:
+            validator = _VALIDATORS.get(kind)
+            if validator is None or validator(match.group()):
+                return kind, match.end()
+    return None, None
+
+
+def _spans(text, lo, hi):
+    """Reported values of text starting in [lo, hi): candidates not inside one that starts earlier."""
+    reach = 0
+    for kind, start, end in _candidates(text, max(0, lo - MAX_SPAN), hi):
+        if kind is not None and start >= lo and end > reach:
+            yield kind, start, end
+        reach = max(reach, end)
+
+
+def find_spans(text):
+    """[(type, start, end)] of every personal data value in text, in order."""
+    return list(_spans(text, 0, len(text)))
+
+
+def _add(counts, kind, first, count=1):
+    entry = counts.get(kind)
+    if entry is None:
+        counts[kind] = [count, first]
+    else:
+        entry[0] += count
+        entry[1] = min(entry[1], first)
+
+
+def _count(counts, text, lo, hi, offset=0):
+    for kind, start, _ in _spans(text, lo, hi):
+        _add(counts, kind, offset + start)
+    return counts
+
+
+def scan(text):
+    """{type: [count, first_offset]} of the values in text."""
+    return _count({}, text, 0, len(text))
+
+
+# Partial result for an empty piece of text; merging with it changes nothing
+EMPTY_PARTIAL = {"length": 0, "counts": {}, "head": "", "tail": ""}
+
+
+def chunk(text):
+    """Partial result for one chunk of a document.
+
+    Values starting at least SETTLE_CHARS from both ends of the chunk are
+    counted; the rest depend on the neighbouring chunks, so the chunk's first
+    and last 2 * SETTLE_CHARS characters are kept for merge() and finish().
+    """
+    if not text:
+        return EMPTY_PARTIAL
+    edge = 2 * SETTLE_CHARS
+    return {
+        "length": len(text),
+        "counts": _count({}, text, SETTLE_CHARS, len(text) - SETTLE_CHARS + 1),
+        "head": text[:edge],
+        "tail": text[-edge:],
+    }
+
+
+def merge(a, b):
+    """Combine the partials of two adjacent pieces of text (a before b). Associative."""
+    if not a["length"]:
+        return b
+    if not b["length"]:
+        return a
+    length = a["length"] + b["length"]
+    counts = {kind: list(entry) for kind, entry in a["counts"].items()}
+    for kind, (count, first) in b["counts"].items():
+        _add(counts, kind, a["length"] + first, count)
+    # Values starting near the junction, now that both sides of it are known
+    window = a["tail"] + b["head"]
+    offset = a["length"] - len(a["tail"])
+    lo = max(SETTLE_CHARS, a["length"] - SETTLE_CHARS + 1)
+    hi = min(a["length"] + SETTLE_CHARS, length - SETTLE_CHARS + 1)
+    if lo < hi:
+        _count(counts, window, lo - offset, hi - offset, offset)
+    edge = 2 * SETTLE_CHARS
+    return {
+        "length": length,
+        "counts": counts,
+        "head": (a["head"] + b["head"])[:edge],
+        "tail": (a["tail"] + b["tail"])[-edge:],
+    }
+
+
+def finish(partial):
+    """{type: [count, first_offset]} for a whole document from its merged partial."""
+    length = partial["length"]
+    counts = {kind: list(entry) for kind, entry in partial["counts"].items()}
+    # Values at the very start and end of the document, which chunk() could not settle
+    _count(counts, partial["head"], 0, min(SETTLE_CHARS, length))
+    offset = length - len(partial["tail"])
+    lo = max(SETTLE_CHARS, length - SETTLE_CHARS + 1)
+    if lo < length:
+        _count(counts, partial["tail"], lo - offset, length - offset, offset)
+    return counts
+
+
+def describe(counts):
+    """'2 email addresses, 1 IBAN' for counts as returned by scan() or finish()."""
+    parts = []
+    for kind in PII_TYPES:
+        if kind in counts:
+            count = counts[kind][0]
+            parts.append(f"{count} {LABELS[kind][0 if count == 1 else 1]}")
+    return ", ".join(parts)
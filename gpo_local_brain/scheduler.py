@@ -1,53 +1,203 @@
+import os
 import threading
 import time
-import requests
 import logging
-from datetime import datetime
-from config import GPO_CLOUD_API_URL, GPO_ORGANIZATION_API_KEY
+from datetime import datetime, date, timedelta
+from config import GPO_CLOUD_API_URL, GPO_ORGANIZATION_API_KEY, LOCAL_BRAIN_MAX_WORKERS, LOCAL_BRAIN_MAX_IN_FLIGHT, \
+    LOCAL_BRAIN_LONG_POLL, LOCAL_BRAIN_LONG_POLL_WAIT, LOCAL_BRAIN_OUTBOX_PATH, \
+    LOCAL_BRAIN_LINGUIST_SNAPSHOT_PATH, LOCAL_BRAIN_LINGUIST_SYNC_INTERVAL, LOCAL_BRAIN_PRIORITY_AGING, \
+    LOCAL_BRAIN_PREEMPT, LOCAL_BRAIN_PREEMPT_MIN_BYTES, LOCAL_BRAIN_URGENT_HOURS, LOCAL_BRAIN_JOURNAL_PATH, \
+    LOCAL_BRAIN_DRAIN_TIMEOUT, LOCAL_BRAIN_JOURNAL_COMPACT_INTERVAL
+from worker_pool import DocumentWorkerPool, BYTES_PER_SECOND_ESTIMATE
+from cloud_client import CloudClient
+from outbox import Outbox
+from linguist_snapshot import LinguistSnapshot
+from journal import RequestJournal
+from metrics import POLL_SECONDS
 
 logger = logging.getLogger("GPO Local Brain Scheduler")
 
+
+def deadline_timestamp(value):
+    """Epoch seconds for a desired_deadline from the cloud (a date means the end of that day), or None."""
+    if not value:
+        return None
+    try:
+        if len(value) == 10:
+            return datetime.combine(date.fromisoformat(value) + timedelta(days=1), datetime.min.time()).timestamp()
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        logger.warning(f"Ignoring unparseable deadline {value!r}.")
+        return None
+
+
+def file_size(file_path):
+    """Size estimate for scheduling; 0 if the file cannot be read yet."""
+    try:
+        return os.path.getsize(file_path)
+    except (OSError, TypeError):
+        return 0
+
+
 class LocalBrainScheduler:
-    def __init__(self, process_document_callback, update_linguists_callback, organization_id, shutdown_event):
+    def __init__(self, process_document_callback, update_linguists_callback, organization_id, shutdown_event,
+                 max_workers=None, max_in_flight=None, long_poll=None, cloud_client=None, linguist_snapshot=None,
+                 journal=None, worker_pool=None):
         self.process_document_callback = process_document_callback
         self.update_linguists_callback = update_linguists_callback
         self.organization_id = organization_id
         self.shutdown_event = shutdown_event
         self.poll_interval = 60  # seconds
-        self.linguist_sync_interval = 60 * 60 * 12  # 12 hours
-        self.linguist_profiles = []
+        self.long_poll = LOCAL_BRAIN_LONG_POLL if long_poll is None else long_poll
+        self.long_poll_wait = LOCAL_BRAIN_LONG_POLL_WAIT  # seconds the cloud may hold a poll
+        self.long_poll_retry_interval = 5  # seconds to back off after a failed long poll
+        self.linguist_sync_interval = LOCAL_BRAIN_LINGUIST_SYNC_INTERVAL  # seconds; syncs are deltas
         self.last_linguist_sync = 0
+        self.drain_timeout = LOCAL_BRAIN_DRAIN_TIMEOUT  # seconds to finish work once shutdown starts
+        self.drained = True
+        self.journal_compact_interval = LOCAL_BRAIN_JOURNAL_COMPACT_INTERVAL  # seconds
+        self.journal = journal or RequestJournal(LOCAL_BRAIN_JOURNAL_PATH)
+        # Warm start from the last saved profiles; the first sync only fetches changes
+        self.linguist_snapshot = linguist_snapshot or LinguistSnapshot(LOCAL_BRAIN_LINGUIST_SNAPSHOT_PATH)
+        self.linguist_profiles = self.linguist_snapshot.profiles()
+        if self.linguist_profiles:
+            self.update_linguists_callback(self.linguist_profiles)
+        # A worker pool passed in is shared with other organizations served by this process
+        self.worker_pool = worker_pool or DocumentWorkerPool(
+            max_workers or LOCAL_BRAIN_MAX_WORKERS,
+            max_in_flight or LOCAL_BRAIN_MAX_IN_FLIGHT,
+            aging=LOCAL_BRAIN_PRIORITY_AGING,
+            preempt=LOCAL_BRAIN_PREEMPT,
+            preempt_min_size=LOCAL_BRAIN_PREEMPT_MIN_BYTES,
+            urgent_seconds=LOCAL_BRAIN_URGENT_HOURS * 3600,
+            on_preempt=self.release_request
+        )
+        self.cloud = cloud_client or CloudClient(GPO_CLOUD_API_URL, GPO_ORGANIZATION_API_KEY,
+                                                 pool_size=self.worker_pool.max_workers + 2,
+                                                 outbox=Outbox(LOCAL_BRAIN_OUTBOX_PATH))
 
-    def poll_cloud_gpo(self):
-        """Poll the Cloud GPO for new analysis requests."""
+    def poll_cloud_gpo(self, wait=0):
+        """Poll the Cloud GPO for new analysis requests.
+
+        With wait > 0 the cloud holds the request until work is available or
+        the wait expires. Returns the number of requests submitted, or None on error.
+        """
         try:
-            headers = {"X-API-Key": GPO_ORGANIZATION_API_KEY}
-            # MOCKED: Replace with real endpoint in production
-            resp = requests.get(f"{GPO_CLOUD_API_URL}/api/local-brain-requests/{self.organization_id}", headers=headers, timeout=10)
+            # Deliver queued status updates first so the cloud does not hand back work we already finished
+            self.cloud.flush()
+            params = {"wait": wait} if wait else None
+            with POLL_SECONDS.time(mode="long" if wait else "short"):
+                resp = self.cloud.get(f"/api/local-brain-requests/{self.organization_id}", params=params, timeout=10 + wait)
             resp.raise_for_status()
-            requests_list = resp.json().get("requests", [])
-            for req in requests_list:
-                req_id = req["local_analysis_request_id"]
-                file_path = req["file_path"]
-                content_type = req["content_type"]
-                # Immediately update status to 'Processing Local Analysis'
-                self.update_status(req_id, "Processing Local Analysis")
-                self.process_document_callback(file_path, req_id, self.organization_id, content_type, self.linguist_profiles)
+            return self.dispatch(resp.json().get("requests", []))
         except Exception as e:
             logger.error(f"Polling error: {e}")
             self.report_error(None, self.organization_id, "Polling Error", str(e))
+            return None
 
-    def update_status(self, local_analysis_request_id, status):
+    def dispatch(self, requests_list):
+        """Accept polled requests while the pool has room. Returns the number submitted.
+
+        Once shutdown has started (e.g. a long poll returning during the drain)
+        nothing more is accepted; the requests stay pending with the cloud.
+        """
+        submitted = 0
+        # Most urgent first, so the ones deferred when the pool fills up are those that can wait
+        now = time.time()
+        prioritized = []
+        for req in requests_list:
+            deadline = deadline_timestamp(req.get("desired_deadline"))
+            size = file_size(req.get("file_path"))
+            slack = (deadline if deadline is not None else float("inf")) - now - size / BYTES_PER_SECOND_ESTIMATE
+            prioritized.append((slack, size, req, deadline))
+        prioritized.sort(key=lambda item: item[:2])
+        for slack, size, req, deadline in prioritized:
+            if self.shutdown_event.is_set():
+                logger.info("Shutting down; leaving remaining requests with the cloud.")
+                break
+            req_id = req["local_analysis_request_id"]
+            # Already queued or running from an earlier poll
+            if self.worker_pool.is_tracked(req_id):
+                continue
+            # Leave the rest with the cloud until the next poll; only an urgent request may preempt
+            if self.worker_pool.available_slots(self.organization_id) <= 0 and \
+                    (not self.worker_pool.preempt or slack > self.worker_pool.urgent_seconds):
+                logger.info("Worker pool is full; deferring remaining requests.")
+                break
+            data = {"organization_id": self.organization_id, "file_path": req["file_path"],
+                    "content_type": req["content_type"], "force_refresh": req.get("force_refresh", False),
+                    "deadline": deadline, "size": size}
+            if self.accept(req_id, data):
+                submitted += 1
+        return submitted
+
+    def accept(self, req_id, data, resumed=False):
+        """Journal a request and queue it; returns False (and hands it back) if the pool is full."""
+        if self.shutdown_event.is_set():
+            # Not journaled or announced, so it is still pending with the cloud (or in the journal, if resumed)
+            return False
+        if not resumed:
+            self.journal.accepted(req_id, data)
+            # Immediately update status to 'Processing Local Analysis'
+            self.update_status(req_id, "Processing Local Analysis")
+        if self.worker_pool.submit(req_id, self.process_request, req_id, data["file_path"], data["content_type"],
+                                   data.get("force_refresh", False), deadline=data.get("deadline"), size=data.get("size", 0),
+                                   tenant=self.organization_id):
+            return True
+        self.release_request(req_id)
+        return False
+
+    def resume(self):
+        """Queue the requests an earlier run accepted but did not finish. Returns how many were resumed."""
+        self.journal.compact()
+        resumed = 0
+        for req_id, data in self.journal.replay():
+            # Another organization's request, when several share the journal
+            if data.get("organization_id", self.organization_id) != self.organization_id:
+                continue
+            if self.worker_pool.is_tracked(req_id):
+                continue
+            if self.accept(req_id, data, resumed=True):
+                resumed += 1
+        if resumed:
+            logger.info(f"Resumed {resumed} unfinished requests from the journal.")
+        return resumed
+
+    def process_request(self, req_id, file_path, content_type, force_refresh=False):
+        """Run the document callback on a worker thread; errors mark the request as failed.
+
+        force_refresh (sent by the cloud) asks for a fresh analysis even if an identical
+        document was analyzed before. The outcome is journaled once it is in the outbox.
+        """
         try:
-            headers = {"X-API-Key": GPO_ORGANIZATION_API_KEY}
-            payload = {"local_analysis_request_id": local_analysis_request_id, "local_analysis_status": status, "timestamp": datetime.utcnow().isoformat() + "Z"}
-            requests.post(f"{GPO_CLOUD_API_URL}/api/local-analysis-results", json=payload, headers=headers, timeout=10)
+            result = self.process_document_callback(file_path, req_id, self.organization_id, content_type,
+                                                    self.linguist_profiles, force_refresh=force_refresh)
         except Exception as e:
-            logger.error(f"Status update error: {e}")
+            self.journal.failed(req_id, str(e))
+            raise
+        if result and result[1]:
+            self.journal.failed(req_id, result[1])
+            raise RuntimeError(result[1])
+        self.journal.completed(req_id)
+
+    def drain(self):
+        """Start a graceful shutdown: finish queued and running work within drain_timeout seconds."""
+        logger.info(f"Draining: finishing in-flight requests within {self.drain_timeout:g}s.")
+        self.worker_pool.shutdown(wait=False, timeout=self.drain_timeout)
+        self.shutdown_event.set()
+
+    def release_request(self, req_id):
+        """Hand a request back to the cloud (e.g. preempted) so it is offered again later."""
+        self.journal.released(req_id)
+        self.update_status(req_id, "Pending Local Analysis")
+
+    def update_status(self, local_analysis_request_id, status):
+        """Queue a status update; it is sent with the next batch."""
+        payload = {"local_analysis_request_id": local_analysis_request_id, "local_analysis_status": status, "timestamp": datetime.utcnow().isoformat() + "Z"}
+        self.cloud.queue_status(payload)
 
     def report_error(self, local_analysis_request_id, organization_id, error_type, error_message):
         try:
-            headers = {"X-API-Key": GPO_ORGANIZATION_API_KEY}
             payload = {
                 "local_analysis_request_id": local_analysis_request_id,
                 "organization_id": organization_id,
@@ -55,32 +205,73 @@ class LocalBrainScheduler:
                 "error_message": error_message,
                 "timestamp": datetime.utcnow().isoformat() + "Z"
             }
-            requests.post(f"{GPO_CLOUD_API_URL}/api/local-brain-errors", json=payload, headers=headers, timeout=10)
+            self.cloud.post("/api/local-brain-errors", payload)
         except Exception as e:
             logger.error(f"Error reporting failed: {e}")
 
     def sync_linguist_profiles(self):
+        """Fetch linguist changes since the last sync and update the local snapshot."""
         try:
-            headers = {"X-API-Key": GPO_ORGANIZATION_API_KEY}
-            resp = requests.get(f"{GPO_CLOUD_API_URL}/api/organization-linguists/{self.organization_id}", headers=headers, timeout=10)
-            resp.raise_for_status()
-            self.linguist_profiles = resp.json().get("linguists", [])
-            self.update_linguists_callback(self.linguist_profiles)
-            logger.info("Linguist profiles updated.")
+            if not self._fetch_linguist_changes():
+                # Profiles were deleted on the cloud; only a full list can tell us which
+                self.linguist_snapshot.reset()
+                self._fetch_linguist_changes()
+            self.linguist_snapshot.save()
         except Exception as e:
             logger.error(f"Linguist sync error: {e}")
             self.report_error(None, self.organization_id, "Linguist Sync Error", str(e))
 
+    def _fetch_linguist_changes(self):
+        """Returns False if the snapshot no longer matches the cloud and needs a full sync."""
+        snapshot = self.linguist_snapshot
+        params = {"since": snapshot.sync_token} if snapshot.sync_token else None
+        headers = {"If-None-Match": snapshot.etag} if snapshot.etag else None
+        resp = self.cloud.get(f"/api/organization-linguists/{self.organization_id}", params=params, headers=headers)
+        if resp.status_code == 304:
+            return True
+        resp.raise_for_status()
+        data = resp.json()
+        complete = snapshot.apply(data, resp.headers.get("ETag"))
+        self.linguist_profiles = snapshot.profiles()
+        self.update_linguists_callback(self.linguist_profiles)
+        logger.info(f"Linguist profiles updated ({len(data.get('linguists', []))} changed, {len(self.linguist_profiles)} total).")
+        return complete
+
+    def log_outbox_depth(self):
+        depth = self.cloud.outbox_depth()
+        if depth["pending"] or depth["dead"]:
+            logger.info(f"Outbox depth: {depth['pending']} pending, {depth['dead']} dead letters.")
+
     def run(self):
         logger.info("Starting Local Brain Scheduler service loop.")
+        self.worker_pool.start()
+        self.resume()
         while not self.shutdown_event.is_set():
             now = time.time()
-            # Poll for new requests
-            self.poll_cloud_gpo()
-            # Sync linguist profiles every 12 hours
+            # Sync linguist profile changes
             if now - self.last_linguist_sync > self.linguist_sync_interval:
                 self.sync_linguist_profiles()
                 self.last_linguist_sync = now
-            # Sleep for poll interval or until shutdown
-            self.shutdown_event.wait(self.poll_interval)
-        logger.info("Scheduler shutting down gracefully.") 
\ No newline at end of file
+            self.log_outbox_depth()
+            self.journal.compact_if_due(self.journal_compact_interval)
+            if not self.long_poll:
+                # Poll for new requests, then sleep for poll interval or until shutdown
+                self.poll_cloud_gpo()
+                self.shutdown_event.wait(self.poll_interval)
+                continue
+            # Long-poll mode: no point asking for work we cannot accept
+            if self.worker_pool.available_slots(self.organization_id) <= 0:
+                # Wake as soon as a job finishes rather than on a fixed tick; with preemption
+                # enabled keep polling (at most once a second) so urgent requests can get in
+                if not self.worker_pool.wait_for_slot(1, (self.organization_id,)) and not self.worker_pool.preempt:
+                    continue
+            submitted = self.poll_cloud_gpo(wait=self.long_poll_wait)
+            if submitted is None:
+                self.shutdown_event.wait(self.long_poll_retry_interval)
+            elif submitted == 0 and time.time() - now < 1:
+                # The cloud answered at once with nothing new (e.g. requests still in flight here)
+                self.shutdown_event.wait(1)
+        self.drained = self.worker_pool.shutdown(wait=True, timeout=self.drain_timeout)
+        self.cloud.close()
+        logger.info("Scheduler shutting down gracefully.")
+ 
\ No newline at end of file
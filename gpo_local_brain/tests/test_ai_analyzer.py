@@ -1,31 +1,71 @@
 import ai_analyzer
 
+
 def test_low_complexity():
     text = "This is a simple document."
     result = ai_analyzer.analyze_document(text, [], "General")
     assert result["ai_document_complexity"] == "Low"
     assert result["ai_overall_risk_status"] == "Normal"
 
+
 def test_high_complexity():
     text = "word " * 4000
     result = ai_analyzer.analyze_document(text, [], "Technical")
     assert result["ai_document_complexity"] == "High"
     assert result["ai_overall_risk_status"] == "Critical"
 
+
 def test_pii_detection():
     text = "This document contains SSN and passport information."
     result = ai_analyzer.analyze_document(text, [], "General")
     assert "PII" in result["ai_sensitive_data_alert_summary"]
     assert result["ai_overall_risk_status"] == "Critical"
 
+
 def test_legal_content():
     text = "This contract is subject to court law."
     result = ai_analyzer.analyze_document(text, [], "Legal")
     assert "legal" in result["ai_key_challenges"].lower()
     assert "Legal specialist" in result["ai_recommended_linguist_profile_text"]
 
+
 def test_medical_content():
     text = "The patient received clinical treatment."
     result = ai_analyzer.analyze_document(text, [], "Medical")
     assert "medical" in result["ai_key_challenges"].lower()
-    assert "Medical specialist" in result["ai_recommended_linguist_profile_text"] 
\ No newline at end of file
+    assert "Medical specialist" in result["ai_recommended_linguist_profile_text"] 
+
+
+def test_keyword_counts_and_first_offsets():
+    text = "Court LAW. The lawyer's law firm went to court."
+    hits = ai_analyzer.scan_keywords(text)
+    assert hits["court"] == [2, 0]
+    assert hits["law"] == [3, 6]
+
+
+def test_stream_keyword_hits_match_single_pass():
+    text = "Witness statements about the patient's medical record and phone. " * 50
+    scanner = ai_analyzer.get_scanner()
+    for size in (5, 64):
+        hits, tail, scanned = {}, "", 0
+        for i in range(0, len(text), size):
+            window = tail + text[i:i + size].lower()
+            scanner.scan(window, hits, offset=scanned - len(tail), skip_before=len(tail))
+            scanned += size
+            tail = window[-(scanner.max_length - 1):]
+        assert hits == ai_analyzer.scan_keywords(text)
+
+
+def test_organization_keywords():
+    text = "Includes a sworn Affidavit."
+    assert "legal" not in ai_analyzer.analyze_document(text, [], "General")["ai_key_challenges"].lower()
+    keyword_sets = ai_analyzer.build_keyword_sets({"legal": ["Affidavit"]})
+    result = ai_analyzer.analyze_document(text, [], "General", keyword_sets)
+    assert "legal" in result["ai_key_challenges"].lower()
+
+
+def test_pii_values():
+    text = "Please wire the fee to DE89 3704 0044 0532 0130 00 and copy jane@example.org."
+    result = ai_analyzer.analyze_document(text, [], "General")
+    assert result["ai_sensitive_data_alert_summary"].startswith("Potential PII/PHI detected: 1 email address, 1 IBAN")
+    assert result["ai_overall_risk_status"] == "Critical"
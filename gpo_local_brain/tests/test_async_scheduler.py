@@ -0,0 +1,143 @@
+import threading
+from async_scheduler import AsyncLocalBrainScheduler
+from journal import RequestJournal
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self.data = data or {}
+        self.headers = {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self.data
+
+
+class SlowLinguistsCloud:
+    """Serves one request to poll; the linguist endpoint hangs until released."""
+
+    def __init__(self):
+        self.release_linguists = threading.Event()
+        self.polled = False
+        self.statuses = []
+        self.errors = []
+        self.closed = False
+
+    def get(self, path, **kwargs):
+        if path.startswith("/api/organization-linguists/"):
+            self.release_linguists.wait(10)
+            return FakeResponse(304)
+        if self.polled:
+            return FakeResponse(500)
+        self.polled = True
+        return FakeResponse(200, {"requests": [
+            {"local_analysis_request_id": "r1", "file_path": "doc.txt", "content_type": "Legal", "desired_deadline": None}
+        ]})
+
+    def post(self, path, payload, **kwargs):
+        self.errors.append(payload["error_type"])
+        return FakeResponse(200)
+
+    def flush(self):
+        return True
+
+    def queue_status(self, payload):
+        self.statuses.append((payload["local_analysis_request_id"], payload["local_analysis_status"]))
+
+    def outbox_depth(self):
+        return {"pending": 0, "dead": 0}
+
+    def close(self):
+        self.closed = True
+
+
+class EmptySnapshot:
+    sync_token = None
+    etag = None
+
+    def profiles(self):
+        return []
+
+    def save(self):
+        pass
+
+
+def test_slow_linguist_sync_does_not_hold_up_polling():
+    cloud = SlowLinguistsCloud()
+    processed = threading.Event()
+    errors_reported = threading.Event()
+    shutdown_event = threading.Event()
+    scheduler = AsyncLocalBrainScheduler(lambda file_path, req_id, *args, **kwargs: processed.set(), lambda profiles: None,
+                                         "org", shutdown_event, max_workers=1, long_poll=True, cloud_client=cloud,
+                                         linguist_snapshot=EmptySnapshot(), journal=RequestJournal())
+    scheduler.long_poll_retry_interval = 0.1
+    original_report = AsyncLocalBrainScheduler.report_error
+    def report_error(*args):
+        original_report(scheduler, *args)
+        errors_reported.set()
+    scheduler.report_error = report_error
+    thread = threading.Thread(target=scheduler.run)
+    thread.start()
+    try:
+        # The linguist request is still hanging, yet the polled request is processed and the failing poll reported
+        assert processed.wait(5)
+        assert errors_reported.wait(5)
+        assert not cloud.release_linguists.is_set()
+        assert ("r1", "Processing Local Analysis") in cloud.statuses
+    finally:
+        cloud.release_linguists.set()
+        scheduler.stop()
+        thread.join(10)
+    assert not thread.is_alive()
+    assert cloud.closed
+    assert "Polling Error" in cloud.errors
+
+
+class HeldPollCloud(SlowLinguistsCloud):
+    """Holds the first poll open until released, then hands out one request."""
+
+    def __init__(self):
+        super().__init__()
+        self.poll_started = threading.Event()
+        self.release_poll = threading.Event()
+        self.events = []
+
+    def get(self, path, **kwargs):
+        if path.startswith("/api/organization-linguists/"):
+            return FakeResponse(304)
+        self.poll_started.set()
+        self.release_poll.wait(10)
+        self.events.append("poll returned")
+        return FakeResponse(200, {"requests": [
+            {"local_analysis_request_id": "late", "file_path": "doc.txt", "content_type": "Legal", "desired_deadline": None}
+        ]})
+
+    def close(self):
+        self.events.append("closed")
+        super().close()
+
+
+def test_drain_waits_for_the_poll_in_flight_and_accepts_nothing_from_it():
+    cloud = HeldPollCloud()
+    processed = []
+    journal = RequestJournal()
+    scheduler = AsyncLocalBrainScheduler(lambda file_path, req_id, *args, **kwargs: processed.append(req_id),
+                                         lambda profiles: None, "org", threading.Event(), max_workers=1,
+                                         long_poll=True, cloud_client=cloud, linguist_snapshot=EmptySnapshot(),
+                                         journal=journal)
+    scheduler.shutdown_check_interval = 0.05
+    thread = threading.Thread(target=scheduler.run)
+    thread.start()
+    assert cloud.poll_started.wait(5)
+    scheduler.drain()
+    threading.Timer(0.3, cloud.release_poll.set).start()
+    thread.join(10)
+    assert not thread.is_alive()
+    assert cloud.events == ["poll returned", "closed"]
+    assert processed == []
+    assert journal.state("late") is None
+    assert cloud.statuses == []
@@ -0,0 +1,17 @@
+from benchmarks.corpus import generate_corpus
+from document_processor import extract_text
+
+def test_corpus_is_reproducible_and_extractable(tmp_path):
+    first = generate_corpus(str(tmp_path / "a"), sizes=["small"], seed=1)
+    second = generate_corpus(str(tmp_path / "b"), sizes=["small"], seed=1)
+    assert {d["format"] for d in first} == {".txt", ".docx", ".pdf"}
+    for a, b in zip(first, second):
+        text, error = extract_text(a["path"])
+        assert error is None and text.strip()
+        assert text == extract_text(b["path"])[0]
+
+def test_larger_sizes_repeat_the_sample_text(tmp_path):
+    small = generate_corpus(str(tmp_path / "s"), sizes=["small"], formats=[".txt"])
+    medium = generate_corpus(str(tmp_path / "m"), sizes=["medium"], formats=[".txt"])
+    for s, m in zip(small, medium):
+        assert m["bytes"] > 20 * s["bytes"]
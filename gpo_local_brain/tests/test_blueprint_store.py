@@ -0,0 +1,31 @@
+import time
+from blueprint_store import BlueprintStore, blueprint_key, linguist_version
+
+def test_key_covers_everything_the_blueprint_depends_on():
+    profiles = [{"id": "l1", "updated_at": "2024-01-01T00:00:00"}]
+    base = blueprint_key("abc", "org-1", "Legal", linguist_version(profiles), "1")
+    assert base == blueprint_key("abc", "org-1", "Legal", linguist_version(list(reversed(profiles))), "1")
+    assert base != blueprint_key("abc", "org-2", "Legal", linguist_version(profiles), "1")
+    assert base != blueprint_key("abc", "org-1", "Medical", linguist_version(profiles), "1")
+    assert base != blueprint_key("abc", "org-1", "Legal", linguist_version([{"id": "l1", "updated_at": "2024-02-01T00:00:00"}]), "1")
+    assert base != blueprint_key("abc", "org-1", "Legal", linguist_version(profiles), "2")
+
+def test_least_recently_used_blueprints_are_evicted():
+    store = BlueprintStore(max_entries=2)
+    store.put("a", {"ai_document_complexity": "Low"})
+    store.put("b", {"ai_document_complexity": "High"})
+    time.sleep(0.01)
+    assert store.get("a") == {"ai_document_complexity": "Low"}
+    store.put("c", {"ai_document_complexity": "Medium"})
+    assert store.get("b") is None
+    assert store.get("a") is not None and store.get("c") is not None
+    assert store.stats() == {"hits": 3, "misses": 1, "evictions": 1, "entries": 2}
+
+def test_expired_blueprints_are_not_reused(tmp_path):
+    path = str(tmp_path / "blueprints.db")
+    store = BlueprintStore(path, max_age=0.05)
+    store.put("a", {"ai_document_complexity": "Low"})
+    store.close()
+    reopened = BlueprintStore(path, max_age=0.05)
+    time.sleep(0.1)
+    assert reopened.get("a") is None
@@ -0,0 +1,94 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from cloud_client import CloudClient
+from outbox import Outbox
+
+class StubCloud(BaseHTTPRequestHandler):
+    received = []
+    batch_enabled = True
+    failures_left = 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.received.append((self.path, self.headers["X-API-Key"], body))
+        if StubCloud.failures_left:
+            StubCloud.failures_left -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        if self.path.endswith("/batch") and not self.batch_enabled:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b'{"success": true, "errors": []}')
+
+    def log_message(self, *args):
+        pass
+
+def start_stub(batch_enabled=True, failures=0):
+    StubCloud.received = []
+    StubCloud.batch_enabled = batch_enabled
+    StubCloud.failures_left = failures
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubCloud)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def test_updates_are_coalesced_into_one_batch():
+    server, url = start_stub()
+    client = CloudClient(url, "key", batch_window=0.5)
+    client.queue_status({"local_analysis_request_id": "a", "local_analysis_status": "Processing Local Analysis"})
+    client.queue_status({"local_analysis_request_id": "b", "local_analysis_status": "Processing Local Analysis"})
+    client.queue_result({"local_analysis_request_id": "a", "local_analysis_status": "Analysis Complete"})
+    client.close()
+    server.shutdown()
+    assert len(StubCloud.received) == 1
+    path, api_key, body = StubCloud.received[0]
+    assert path == "/api/local-analysis-results/batch" and api_key == "key"
+    assert [u["local_analysis_request_id"] for u in body["status_updates"]] == ["b"]
+    assert [r["local_analysis_request_id"] for r in body["results"]] == ["a"]
+
+def test_falls_back_to_single_posts_without_batch_endpoint():
+    server, url = start_stub(batch_enabled=False)
+    client = CloudClient(url, "key")
+    client.queue_result({"local_analysis_request_id": "a", "local_analysis_status": "Analysis Complete"})
+    client.queue_result({"local_analysis_request_id": "b", "local_analysis_status": "Analysis Complete"})
+    client.close()
+    server.shutdown()
+    assert [path for path, _, _ in StubCloud.received] == [
+        "/api/local-analysis-results/batch", "/api/local-analysis-results", "/api/local-analysis-results"]
+
+def test_outbox_survives_restart_and_retries_with_backoff(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    # Nothing listening: the result stays in the outbox
+    client = CloudClient("http://127.0.0.1:9", "key", outbox=Outbox(path, base_delay=0.05))
+    client.queue_result({"local_analysis_request_id": "a", "local_analysis_status": "Analysis Complete"})
+    client.close()
+    assert client.outbox_depth() == {"pending": 1, "dead": 0}
+
+    # After a restart the flusher retries until the cloud accepts it
+    server, url = start_stub(failures=1)
+    client = CloudClient(url, "key", outbox=Outbox(path, base_delay=0.05))
+    for _ in range(100):
+        if client.outbox_depth()["pending"] == 0:
+            break
+        time.sleep(0.05)
+    client.close()
+    server.shutdown()
+    assert client.outbox_depth() == {"pending": 0, "dead": 0}
+    assert len(StubCloud.received) == 2
+
+def test_nothing_overtakes_a_pending_registration():
+    from outbox import REGISTER, RESULT
+    outbox = Outbox()
+    outbox.put(REGISTER, {"local_analysis_request_id": "hot-1", "project_name": "a.txt"})
+    outbox.put(RESULT, {"local_analysis_request_id": "hot-1", "local_analysis_status": "Analysis Complete"})
+    outbox.put(RESULT, {"local_analysis_request_id": "other", "local_analysis_status": "Analysis Complete"})
+    register_id = outbox.due(10)[0][0]
+    outbox.retry_later([register_id], "timeout")
+    # Only the unrelated result may go while the registration backs off
+    assert [payload["local_analysis_request_id"] for _, _, payload in outbox.due(10)] == ["other"]
@@ -0,0 +1,41 @@
+import pytest
+import extraction_cache
+from document_processor import iter_text
+from extraction_cache import ExtractionCache, file_digest
+
+def test_repeat_extraction_is_served_from_cache(tmp_path):
+    doc = tmp_path / "contract.txt"
+    doc.write_text("Line one.\r\nLine two.", encoding="utf-8")
+    cache = ExtractionCache(str(tmp_path / "cache"), max_bytes=1024)
+    first = "".join(iter_text(str(doc), cache=cache))
+    second = "".join(iter_text(str(doc), cache=cache))
+    assert first == second == doc.read_text(encoding="utf-8")
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 1
+    # The index is rebuilt from disk on restart
+    assert ExtractionCache(str(tmp_path / "cache"), max_bytes=1024).stats()["entries"] == 1
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache"), max_bytes=250)
+    paths = []
+    for name in "abc":
+        doc = tmp_path / f"{name}.txt"
+        doc.write_text(name * 100, encoding="utf-8")
+        paths.append(str(doc))
+    list(iter_text(paths[0], cache=cache))
+    list(iter_text(paths[1], cache=cache))
+    list(iter_text(paths[0], cache=cache))  # a is now the most recently used
+    list(iter_text(paths[2], cache=cache))  # evicts b
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["bytes"] == 200
+    list(iter_text(paths[0], cache=cache))
+    assert cache.stats()["hits"] == 2
+
+def test_a_known_digest_is_not_computed_again(tmp_path, monkeypatch):
+    doc = tmp_path / "contract.txt"
+    doc.write_text("Line one.", encoding="utf-8")
+    digest = file_digest(str(doc))
+    cache = ExtractionCache(str(tmp_path / "cache"), max_bytes=1024)
+    monkeypatch.setattr(extraction_cache, "file_digest", lambda path: pytest.fail("file hashed twice"))
+    assert "".join(iter_text(str(doc), cache=cache, digest=digest)) == "Line one."
+    assert "".join(iter_text(str(doc), cache=cache, digest=digest)) == "Line one."
+    assert cache.stats()["hits"] == 1
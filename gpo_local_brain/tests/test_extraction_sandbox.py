@@ -0,0 +1,55 @@
+import os
+import pytest
+from document_processor import extract_text, iter_text
+from extraction_sandbox import ExtractionSandbox, ExtractionTimeout, ExtractionFailed
+
+def test_sandboxed_text_matches_in_process(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text("Confidential agreement. " * 10000, encoding="utf-8")
+    sandbox = ExtractionSandbox(max_workers=1)
+    try:
+        assert extract_text(str(path), sandbox=sandbox) == extract_text(str(path))
+        assert "".join(iter_text(str(path), chunk_size=1000, sandbox=sandbox)) == path.read_text(encoding="utf-8")
+        # The same process served both documents
+        assert len(sandbox.idle) == 1 and sandbox.idle[0].tasks == 2
+    finally:
+        sandbox.close()
+
+def test_parse_errors_are_reported_without_recycling(tmp_path):
+    path = tmp_path / "broken.pdf"
+    path.write_bytes(b"not a pdf")
+    sandbox = ExtractionSandbox(max_workers=1)
+    try:
+        with pytest.raises(ExtractionFailed):
+            sandbox.extract_to_file(str(path))
+        assert len(sandbox.idle) == 1
+    finally:
+        sandbox.close()
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs named pipes")
+def test_hung_extraction_times_out_and_worker_is_replaced(tmp_path):
+    # Opening a FIFO with no writer blocks forever, like a parser stuck on a bad file
+    hang = tmp_path / "hang.txt"
+    os.mkfifo(hang)
+    good = tmp_path / "good.txt"
+    good.write_text("fine", encoding="utf-8")
+    sandbox = ExtractionSandbox(max_workers=1, timeout=1)
+    try:
+        with pytest.raises(ExtractionTimeout):
+            sandbox.extract_to_file(str(hang))
+        assert sandbox.idle == []
+        assert extract_text(str(good), sandbox=sandbox) == ("fine", None)
+    finally:
+        sandbox.close()
+
+def test_workers_are_recycled_after_task_limit(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text("text", encoding="utf-8")
+    sandbox = ExtractionSandbox(max_workers=1, max_tasks_per_child=2)
+    try:
+        extract_text(str(path), sandbox=sandbox)
+        first = sandbox.idle[0]
+        extract_text(str(path), sandbox=sandbox)
+        assert sandbox.idle == [] and first.proc.poll() is not None
+    finally:
+        sandbox.close()
@@ -0,0 +1,48 @@
+import os
+from folder_watcher import FolderWatcher
+
+def test_files_are_reported_once_settled(tmp_path):
+    (tmp_path / "legal").mkdir()
+    doc = tmp_path / "legal" / "contract.txt"
+    doc.write_text("draft", encoding="utf-8")
+    (tmp_path / "~$contract.docx").write_text("lock", encoding="utf-8")
+    (tmp_path / "notes.xlsx").write_text("ignored", encoding="utf-8")
+    watcher = FolderWatcher(str(tmp_path), debounce=2)
+    assert watcher.scan(now=0) == []
+    assert watcher.scan(now=1) == []
+    [(path, request_id, signature)] = watcher.scan(now=2)
+    assert path == str(doc)
+    assert watcher.content_type(path) == "Legal"
+    # Still offered until processed, under the same request id
+    assert watcher.scan(now=3) == [(path, request_id, signature)]
+    watcher.mark_done(path, request_id, signature)
+    assert watcher.scan(now=4) == []
+
+def test_still_changing_file_restarts_debounce(tmp_path):
+    doc = tmp_path / "report.txt"
+    doc.write_text("part", encoding="utf-8")
+    watcher = FolderWatcher(str(tmp_path), debounce=2)
+    watcher.scan(now=0)
+    doc.write_text("part two", encoding="utf-8")
+    assert watcher.scan(now=2) == []
+    assert len(watcher.scan(now=4)) == 1
+
+def test_changed_file_keeps_its_request_id_across_restarts(tmp_path):
+    folder = tmp_path / "hot"
+    folder.mkdir()
+    doc = folder / "memo.txt"
+    doc.write_text("v1", encoding="utf-8")
+    state = str(tmp_path / "state.json")
+    watcher = FolderWatcher(str(folder), debounce=0, state_path=state)
+    watcher.scan(now=0)
+    [(path, request_id, signature)] = watcher.scan(now=0)
+    watcher.mark_done(path, request_id, signature)
+
+    restarted = FolderWatcher(str(folder), debounce=0, state_path=state)
+    assert restarted.scan(now=0) == []
+    doc.write_text("version two", encoding="utf-8")
+    os.utime(doc, ns=(signature[1] + 10**9, signature[1] + 10**9))
+    restarted.scan(now=1)
+    [(_, changed_id, _)] = restarted.scan(now=1)
+    assert changed_id == request_id
+    assert restarted.content_type(path) == "General"
@@ -0,0 +1,84 @@
+import threading
+from journal import RequestJournal, COMPLETED
+from scheduler import LocalBrainScheduler
+
+
+class RecordingCloud:
+    def __init__(self):
+        self.statuses = []
+
+    def queue_status(self, payload):
+        self.statuses.append((payload["local_analysis_request_id"], payload["local_analysis_status"]))
+
+
+class EmptySnapshot:
+    def profiles(self):
+        return []
+
+
+def test_replay_returns_unfinished_requests_and_compact_drops_finished(tmp_path):
+    path = str(tmp_path / "journal.db")
+    journal = RequestJournal(path)
+    for req_id in ("done", "broken", "running", "preempted"):
+        journal.accepted(req_id, {"file_path": f"{req_id}.txt", "content_type": "Legal"})
+    journal.completed("done")
+    journal.failed("broken", "unreadable")
+    journal.released("preempted")
+    journal.close()
+
+    # As after a crash: a fresh process opens the same journal
+    journal = RequestJournal(path)
+    assert journal.replay() == [("running", {"file_path": "running.txt", "content_type": "Legal"})]
+    assert journal.compact() == 6
+    assert journal.replay() == [("running", {"file_path": "running.txt", "content_type": "Legal"})]
+    # Accepted again by a later poll: the newest transition wins
+    journal.accepted("done", {"file_path": "done.txt", "content_type": "Legal"})
+    assert [req_id for req_id, _ in journal.replay()] == ["running", "done"]
+
+
+def test_scheduler_resumes_unfinished_requests_without_reanalyzing_finished_ones():
+    journal = RequestJournal()
+    journal.accepted("finished", {"file_path": "a.txt", "content_type": "Legal"})
+    journal.completed("finished")
+    journal.accepted("interrupted", {"file_path": "b.txt", "content_type": "Medical", "deadline": None, "size": 10})
+
+    processed = []
+    cloud = RecordingCloud()
+    scheduler = LocalBrainScheduler(lambda file_path, req_id, *args, **kwargs: processed.append((req_id, file_path)),
+                                    lambda profiles: None, "org", threading.Event(), max_workers=1,
+                                    cloud_client=cloud, linguist_snapshot=EmptySnapshot(), journal=journal)
+    scheduler.worker_pool.start()
+    assert scheduler.resume() == 1
+    scheduler.worker_pool.shutdown(wait=True)
+    assert processed == [("interrupted", "b.txt")]
+    assert journal.state("interrupted") == COMPLETED
+    # Its "Processing" status was already sent before the crash
+    assert cloud.statuses == []
+
+
+def test_requests_polled_during_the_drain_stay_with_the_cloud():
+    journal = RequestJournal()
+    cloud = RecordingCloud()
+    scheduler = LocalBrainScheduler(lambda *args, **kwargs: None, lambda profiles: None, "org", threading.Event(),
+                                    max_workers=1, cloud_client=cloud, linguist_snapshot=EmptySnapshot(), journal=journal)
+    scheduler.worker_pool.start()
+    scheduler.drain()
+    # A long poll that was in flight when the drain started returns with new work
+    assert scheduler.dispatch([{"local_analysis_request_id": "late", "file_path": "late.txt",
+                                "content_type": "Legal", "desired_deadline": None}]) == 0
+    assert journal.state("late") is None
+    assert cloud.statuses == []
+    assert not scheduler.worker_pool.submit("direct", lambda: None)
+    scheduler.worker_pool.shutdown(wait=True)
+
+
+def test_compaction_runs_again_once_due():
+    journal = RequestJournal()
+    journal.accepted("a", {"file_path": "a.txt"})
+    journal.completed("a")
+    assert journal.compact_if_due(3600) == 2
+    journal.accepted("b", {"file_path": "b.txt"})
+    journal.completed("b")
+    # Compacted moments ago: not due yet
+    assert journal.compact_if_due(3600) == 0
+    assert journal.compact_if_due(0) == 2
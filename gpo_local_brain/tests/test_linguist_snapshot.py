@@ -0,0 +1,18 @@
+from linguist_snapshot import LinguistSnapshot
+
+def test_delta_merge_and_warm_start(tmp_path):
+    path = str(tmp_path / "linguists.json")
+    snapshot = LinguistSnapshot(path)
+    assert snapshot.apply({"linguists": [{"id": "a", "full_name": "A"}, {"id": "b", "full_name": "B"}],
+                           "full": True, "sync_token": "t1", "total": 2}, '"2-t1"')
+    assert snapshot.apply({"linguists": [{"id": "b", "full_name": "B2"}], "full": False, "sync_token": "t2", "total": 2})
+    snapshot.save()
+
+    restored = LinguistSnapshot(path)
+    assert restored.sync_token == "t2"
+    assert sorted(l["full_name"] for l in restored.profiles()) == ["A", "B2"]
+
+def test_deletion_requires_full_sync(tmp_path):
+    snapshot = LinguistSnapshot(str(tmp_path / "linguists.json"))
+    snapshot.apply({"linguists": [{"id": "a"}, {"id": "b"}], "full": True, "sync_token": "t1", "total": 2})
+    assert not snapshot.apply({"linguists": [], "full": False, "sync_token": "t1", "total": 1})
@@ -0,0 +1,38 @@
+import requests
+from metrics import Registry, start_metrics_server, watch_service
+from worker_pool import DocumentWorkerPool
+
+def test_histogram_and_counter_render_prometheus_text():
+    registry = Registry()
+    timer = registry.histogram("job_seconds", "Job time.", ["file_type"], buckets=(0.1, 1))
+    count = registry.counter("bytes_total", "Bytes.", ["file_type"])
+    timer.observe(0.05, file_type=".pdf")
+    timer.observe(0.5, file_type=".pdf")
+    count.inc(100, file_type=".pdf")
+    count.inc(20, file_type=".pdf")
+    text = registry.render()
+    assert "# TYPE job_seconds histogram" in text
+    assert 'job_seconds_bucket{file_type=".pdf",le="0.1"} 1' in text
+    assert 'job_seconds_bucket{file_type=".pdf",le="1"} 2' in text
+    assert 'job_seconds_bucket{file_type=".pdf",le="+Inf"} 2' in text
+    assert 'job_seconds_count{file_type=".pdf"} 2' in text
+    assert 'bytes_total{file_type=".pdf"} 120' in text
+
+def test_metrics_server_exposes_live_service_state():
+    class FakeCloud:
+        def outbox_depth(self):
+            return {"pending": 3, "dead": 1}
+    registry = Registry()
+    pool = DocumentWorkerPool(max_workers=1)
+    pool.submit("a", lambda: None)  # not started, so it stays queued
+    watch_service(pool, FakeCloud(), registry=registry)
+    server = start_metrics_server("127.0.0.1", 0, registry)
+    try:
+        resp = requests.get(f"http://127.0.0.1:{server.server_port}/metrics", timeout=5)
+        assert resp.status_code == 200
+        assert "gpo_local_brain_queue_depth 1" in resp.text
+        assert "gpo_local_brain_in_flight 1" in resp.text
+        assert "gpo_local_brain_outbox_pending 3" in resp.text
+        assert requests.get(f"http://127.0.0.1:{server.server_port}/other", timeout=5).status_code == 404
+    finally:
+        server.shutdown()
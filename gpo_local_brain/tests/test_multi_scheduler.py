@@ -0,0 +1,92 @@
+import threading
+from journal import RequestJournal
+from multi_scheduler import MultiOrganizationScheduler, organization_path
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self.data = data or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self.data
+
+
+class FakeCloud:
+    def __init__(self, api_key, batch=None):
+        self.api_key = api_key
+        self.batch = batch
+        self.posts = []
+        self.gets = []
+        self.statuses = []
+
+    def flush(self):
+        return True
+
+    def post(self, path, payload, **kwargs):
+        self.posts.append((path, payload))
+        if path == "/api/local-brain-requests/batch":
+            return self.batch
+        return FakeResponse(200)
+
+    def get(self, path, **kwargs):
+        self.gets.append(path)
+        organization_id = path.rsplit("/", 1)[1]
+        return FakeResponse(200, {"requests": [request(f"{organization_id}-solo")]})
+
+    def queue_status(self, payload):
+        self.statuses.append((payload["local_analysis_request_id"], payload["local_analysis_status"]))
+
+
+class EmptySnapshot:
+    def profiles(self):
+        return []
+
+
+def request(request_id):
+    return {"local_analysis_request_id": request_id, "file_path": f"{request_id}.txt", "content_type": "Legal",
+            "desired_deadline": None}
+
+
+def make_scheduler(clouds, processed):
+    return MultiOrganizationScheduler(
+        lambda file_path, req_id, organization_id, *args, **kwargs: processed.append((organization_id, req_id)),
+        clouds, threading.Event(), max_workers=1, max_in_flight=4, journal=RequestJournal(),
+        linguist_snapshots={organization_id: EmptySnapshot() for organization_id in clouds})
+
+
+def test_one_poll_serves_every_organization_through_its_own_client():
+    batch = FakeResponse(200, {"requests": {"org-a": [request("a1"), request("a2"), request("a3")],
+                                            "org-b": [request("b1")]},
+                               "errors": {}})
+    clouds = {"org-a": FakeCloud("key-a", batch), "org-b": FakeCloud("key-b", batch)}
+    processed = []
+    scheduler = make_scheduler(clouds, processed)
+    # Four slots shared by two organizations: two each
+    assert scheduler.poll_cloud_gpo(wait=5) == 3
+    path, payload = clouds["org-a"].posts[0]
+    assert payload == {"organizations": {"org-a": "key-a", "org-b": "key-b"}, "wait": 5}
+    assert clouds["org-a"].statuses == [("a1", "Processing Local Analysis"), ("a2", "Processing Local Analysis")]
+    assert clouds["org-b"].statuses == [("b1", "Processing Local Analysis")]
+    assert scheduler.open_organizations() == ["org-b"]
+    scheduler.worker_pool.start()
+    scheduler.worker_pool.shutdown(wait=True)
+    assert sorted(processed) == [("org-a", "a1"), ("org-a", "a2"), ("org-b", "b1")]
+    assert scheduler.journal.request_data("b1")["organization_id"] == "org-b"
+
+
+def test_falls_back_to_polling_each_organization():
+    clouds = {"org-a": FakeCloud("key-a", FakeResponse(404)), "org-b": FakeCloud("key-b", FakeResponse(404))}
+    scheduler = make_scheduler(clouds, [])
+    assert scheduler.poll_cloud_gpo(wait=5) == 2
+    assert not scheduler.batch_poll
+    assert clouds["org-a"].gets == ["/api/local-brain-requests/org-a"]
+    assert clouds["org-b"].gets == ["/api/local-brain-requests/org-b"]
+
+
+def test_organization_paths():
+    assert organization_path("data/outbox.db", "org-a") == "data/outbox-org-a.db"
@@ -0,0 +1,61 @@
+import re
+import time
+import random
+import pii_detector
+
+SAMPLE = ("Contact john.doe+x@example.co.uk or call +44 20 7946 0958 / (555) 123-4567.\n"
+          "DOB: 12/03/1985. SSN 123-45-6789, NI number AB 12 34 56 C.\n"
+          "IBAN DE89 3704 0044 0532 0130 00, card 4111 1111 1111 1111, Passport No. 123456789, MRN: A1234567.")
+
+
+def test_typed_spans():
+    spans = [(kind, SAMPLE[start:end]) for kind, start, end in pii_detector.find_spans(SAMPLE)]
+    assert spans == [
+        ("email", "john.doe+x@example.co.uk"),
+        ("phone", "+44 20 7946 0958"),
+        ("phone", "(555) 123-4567"),
+        ("date_of_birth", "DOB: 12/03/1985"),
+        ("national_id", "123-45-6789"),
+        ("national_id", "AB 12 34 56 C"),
+        ("iban", "DE89 3704 0044 0532 0130 00"),
+        ("payment_card", "4111 1111 1111 1111"),
+        ("passport", "Passport No. 123456789"),
+        ("medical_record", "MRN: A1234567"),
+    ]
+    counts = pii_detector.scan(SAMPLE)
+    assert counts["phone"] == [2, SAMPLE.index("+44")]
+    assert pii_detector.describe(counts).startswith("1 date of birth, 1 email address, 1 IBAN")
+
+
+def test_look_alikes_are_not_reported():
+    text = ("Invoice 2024-001 dated 12/03/2024, total 1,500.00 EUR. Version 10.2.3, order 1234567. "
+            "IBAN DE89 3704 0044 0532 0130 01 and card 4111 1111 1111 1112 fail their checksums. "
+            "Passport information is held by the SSN office; email the agent@ desk.")
+    assert pii_detector.find_spans(text) == []
+
+
+def test_chunked_detection_matches_the_whole_text():
+    rng = random.Random(5)
+    pieces = SAMPLE.replace("\n", " ").split(" ") + ["x" * 400, "filler", "1234", "a@b", "+1"]
+    for _ in range(30):
+        text = " ".join(rng.choice(pieces) for _ in range(rng.randint(1, 400)))
+        cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(1, 40)))) if len(text) > 1 else []
+        partials = [pii_detector.chunk(text[i:j]) for i, j in zip([0] + cuts, cuts + [len(text)])]
+        while len(partials) > 1:
+            partials = [pii_detector.merge(*partials[i:i + 2]) if i + 1 < len(partials) else partials[i]
+                        for i in range(0, len(partials), 2)]
+        assert pii_detector.finish(partials[0]) == pii_detector.scan(text)
+
+
+def test_patterns_are_bounded():
+    for kind, pattern in pii_detector.PATTERNS:
+        assert re._parser.parse(pattern).getwidth()[1] <= pii_detector.MAX_SPAN, kind
+
+
+def test_pathological_input_stays_linear():
+    # Each of these takes minutes with an unbounded or backtracking-prone pattern
+    for text in ["a" * 200000 + "@", "1-" * 100000, "+1 " * 70000, "aaa@aaa." * 25000, "1" * 200000,
+                 "DOB 1/" * 30000, "4111 " * 40000]:
+        started = time.perf_counter()
+        pii_detector.scan(text)
+        assert time.perf_counter() - started < 5
@@ -0,0 +1,58 @@
+import text_stats
+import ai_analyzer
+from document_processor import iter_text, extract_text
+
+def write_sample(tmp_path):
+    path = tmp_path / "long.txt"
+    body = "The patient signed the medical record. Court dates follow! " * 5000
+    path.write_text(body, encoding="utf-8")
+    return path, body
+
+def test_chunks_rebuild_the_full_text(tmp_path):
+    path, body = write_sample(tmp_path)
+    chunks = list(iter_text(str(path), chunk_size=1000, max_chunk_chars=4096))
+    assert len(chunks) > 1
+    assert max(len(c) for c in chunks) <= 4096
+    assert "".join(chunks) == body == extract_text(str(path))[0]
+
+def test_stream_analysis_matches_single_string(tmp_path):
+    path, body = write_sample(tmp_path)
+    # Deliberately awkward chunk sizes that cut words and keywords in two
+    for size in (7, 333, 4096):
+        chunks = [body[i:i + size] for i in range(0, len(body), size)]
+        assert ai_analyzer.analyze_document_stream(chunks, [], "General") == ai_analyzer.analyze_document(body, [], "General")
+
+def random_text(rng, size):
+    words = ["court", "contract", "agreement", "patient", "SSN", "email", "pharma", "clinical", "law", "lawful",
+             "API", "the", "a", "medical record", "DOB"]
+    seps = [" ", " ", "  ", "\n", ". ", "! ", "?", ""]
+    return "".join(rng.choice(words) + rng.choice(seps) for _ in range(size))
+
+def random_chunks(rng, text):
+    cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(1, 40))))
+    return [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+
+def merge_as_tree(partials):
+    while len(partials) > 1:
+        partials = [ai_analyzer.merge_partials(*partials[i:i + 2]) if i + 1 < len(partials) else partials[i]
+                    for i in range(0, len(partials), 2)]
+    return partials[0]
+
+def test_partials_merge_to_the_single_string_result():
+    import random
+    rng = random.Random(7)
+    for _ in range(200):
+        text = random_text(rng, rng.randint(1, 60))
+        chunks = random_chunks(rng, text)
+        merged = merge_as_tree([ai_analyzer.analyze_chunk(c) for c in chunks])
+        assert text_stats.finish(merged["stats"])["tokens"] == len(text.split())
+        assert merged["hits"] == ai_analyzer.scan_keywords(text)
+        assert ai_analyzer.reduce_partial(merged, [], "legal") == ai_analyzer.analyze_document(text, [], "legal")
+
+def test_parallel_analysis_matches_sequential(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    path, body = write_sample(tmp_path)
+    chunks = list(iter_text(str(path), chunk_size=777))
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        parallel = ai_analyzer.analyze_document_parallel(chunks, [], "medical", executor=executor, max_pending=3)
+    assert parallel == ai_analyzer.analyze_document(body, [], "medical")
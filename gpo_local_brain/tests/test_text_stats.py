@@ -0,0 +1,52 @@
+import random
+import numpy as np
+import text_stats
+
+
+def same_stats(a, b):
+    assert a.keys() == b.keys()
+    for key in a:
+        if isinstance(a[key], np.ndarray):
+            assert np.array_equal(a[key], b[key]), key
+        else:
+            assert a[key] == b[key], key
+    return True
+
+
+def test_counts_on_a_known_text():
+    text = 'The court met on 12/03/2024. "Was the contract valid?" The claimant paid 1,500 EUR! the end'
+    summary = text_stats.summarize(text_stats.text_stats(text))
+    assert summary["tokens"] == 16
+    assert summary["words"] == 14
+    # Three terminated sentences (one ends inside its closing quote) plus the unterminated last one
+    assert summary["sentences"] == 4
+    assert summary["max_sentence_length"] == 5
+    assert summary["number_density"] == 2 / 16
+    assert summary["date_density"] == 1 / 16
+    # "The", "the" and '"Was' count as the types "the" and "was"
+    assert summary["type_token_ratio"] == 11 / 14
+    assert summary["long_word_ratio"] == 2 / 14  # contract, claimant
+
+
+def test_chunked_statistics_match_the_whole_text():
+    rng = random.Random(11)
+    words = ["Straße", "court", "contract.", "12/03/2024", "1,500", "é", "naïve", "\U0001F600", "(see", "above.)",
+             "Why?", '"Stop!"', "a", "the", "THE", "λόγος"]
+    seps = [" ", " ", "\n", "\t", "  ", ""]
+    for _ in range(200):
+        text = "".join(rng.choice(words) + rng.choice(seps) for _ in range(rng.randint(1, 80)))
+        cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(1, 30)))) if len(text) > 1 else []
+        partials = [text_stats.chunk_stats(text[i:j]) for i, j in zip([0] + cuts, cuts + [len(text)])]
+        while len(partials) > 1:
+            partials = [text_stats.merge(*partials[i:i + 2]) if i + 1 < len(partials) else partials[i]
+                        for i in range(0, len(partials), 2)]
+        assert same_stats(text_stats.finish(partials[0]), text_stats.text_stats(text))
+
+
+def test_sentence_length_distribution():
+    text = " ".join("word " * (n - 1) + "end." for n in (3, 5, 7, 9, 300))
+    summary = text_stats.summarize(text_stats.text_stats(text))
+    assert summary["sentences"] == 5
+    assert summary["median_sentence_length"] == 7
+    assert summary["max_sentence_length"] == 300
+    assert summary["avg_sentence_length"] == (3 + 5 + 7 + 9 + 300) / 5
@@ -0,0 +1,145 @@
+import time
+import threading
+from worker_pool import DocumentWorkerPool, COMPLETED, FAILED, PREEMPTED
+
+def test_jobs_complete_and_failures_are_tracked():
+    pool = DocumentWorkerPool(max_workers=2)
+    pool.start()
+    def fail():
+        raise ValueError("bad file")
+    assert pool.submit("ok", lambda: None)
+    assert pool.submit("bad", fail)
+    pool.shutdown(wait=True)
+    assert pool.status("ok")["status"] == COMPLETED
+    assert pool.status("bad") == {"status": FAILED, "error": "bad file"}
+    assert pool.snapshot()["in_flight"] == 0
+
+def test_max_in_flight_and_duplicates_rejected():
+    pool = DocumentWorkerPool(max_workers=1, max_in_flight=2)
+    release = threading.Event()
+    pool.start()
+    assert pool.submit("a", release.wait)
+    assert not pool.submit("a", release.wait)
+    assert pool.submit("b", release.wait)
+    assert not pool.submit("c", release.wait)
+    assert pool.available_slots() == 0
+    release.set()
+    pool.shutdown(wait=True)
+    assert pool.available_slots() == 2
+
+def run_in_order(pool, jobs):
+    """Queue jobs (request_id, deadline, size) behind a blocked worker and return the order they run in."""
+    release = threading.Event()
+    order = []
+    pool.start()
+    assert pool.submit("gate", release.wait)
+    for request_id, deadline, size in jobs:
+        assert pool.submit(request_id, order.append, request_id, deadline=deadline, size=size)
+    release.set()
+    pool.shutdown(wait=True)
+    return order
+
+def test_least_slack_runs_first():
+    now = time.time()
+    order = run_in_order(DocumentWorkerPool(max_workers=1, max_in_flight=10), [
+        ("archive", now + 30 * 86400, 10 * 1024 * 1024),
+        ("no-deadline", None, 1000),  # treated as due in a week
+        ("rush", now + 3600, 1000),
+        ("rush-large", now + 3600, 50 * 1024 * 1024),  # same deadline, but needs to start sooner
+    ])
+    assert order == ["rush-large", "rush", "no-deadline", "archive"]
+
+def test_waiting_jobs_age_ahead_of_newer_urgent_ones():
+    now = time.time()
+    pool = DocumentWorkerPool(max_workers=1, max_in_flight=10, aging=1000000)
+    release = threading.Event()
+    order = []
+    pool.start()
+    assert pool.submit("gate", release.wait)
+    assert pool.submit("old", order.append, "old", deadline=now + 86400)
+    time.sleep(0.2)  # at this aging rate, 0.2s of waiting is worth more than the day between the deadlines
+    assert pool.submit("new", order.append, "new", deadline=now + 3600)
+    release.set()
+    pool.shutdown(wait=True)
+    assert order == ["old", "new"]
+
+def test_urgent_job_preempts_largest_queued_job():
+    now = time.time()
+    preempted = []
+    pool = DocumentWorkerPool(max_workers=1, max_in_flight=3, preempt=True, preempt_min_size=1000,
+                              urgent_seconds=86400, on_preempt=preempted.append)
+    release = threading.Event()
+    pool.start()
+    assert pool.submit("gate", release.wait)
+    assert pool.submit("big", lambda: None, deadline=now + 30 * 86400, size=5000000)
+    assert pool.submit("medium", lambda: None, deadline=now + 30 * 86400, size=5000)
+    # Not urgent: a full pool still turns it away
+    assert not pool.submit("later", lambda: None, deadline=now + 10 * 86400)
+    assert pool.submit("rush", lambda: None, deadline=now + 3600)
+    assert preempted == ["big"]
+    assert pool.status("big")["status"] == PREEMPTED
+    assert not pool.is_tracked("big")
+    release.set()
+    pool.shutdown(wait=True)
+    assert pool.status("rush")["status"] == COMPLETED
+    assert pool.snapshot()[PREEMPTED] == 1
+
+def test_jobs_not_handed_out_by_the_cloud_are_not_preempted():
+    now = time.time()
+    preempted = []
+    pool = DocumentWorkerPool(max_workers=1, max_in_flight=2, preempt=True, preempt_min_size=1000, urgent_seconds=86400,
+                              on_preempt=preempted.append)
+    release = threading.Event()
+    pool.start()
+    assert pool.submit("gate", release.wait)
+    assert pool.submit("watched", lambda: None, deadline=now + 30 * 86400, size=5000000, preemptible=False)
+    assert not pool.submit("rush", lambda: None, deadline=now + 3600)
+    assert preempted == []
+    assert pool.is_tracked("watched")
+    release.set()
+    pool.shutdown(wait=True)
+    assert pool.status("watched")["status"] == COMPLETED
+
+def test_wait_for_slot_wakes_when_a_job_finishes():
+    pool = DocumentWorkerPool(max_workers=1, max_in_flight=1)
+    release = threading.Event()
+    pool.start()
+    assert pool.submit("a", release.wait)
+    assert not pool.wait_for_slot(0.05)
+    threading.Timer(0.1, release.set).start()
+    started = time.monotonic()
+    assert pool.wait_for_slot(5)
+    assert time.monotonic() - started < 1
+    pool.shutdown(wait=True)
+
+def test_drain_deadline_stops_starting_queued_jobs():
+    pool = DocumentWorkerPool(max_workers=1, max_in_flight=3)
+    release = threading.Event()
+    ran = []
+    pool.start()
+    assert pool.submit("slow", release.wait, 5)
+    assert pool.submit("queued", ran.append, "queued")
+    started = time.monotonic()
+    assert not pool.shutdown(wait=True, timeout=0.2)
+    assert time.monotonic() - started < 2
+    release.set()
+    time.sleep(0.1)
+    assert ran == []
+    assert pool.status("queued")["status"] != COMPLETED
+
+def test_tenants_take_turns_and_respect_their_share():
+    pool = DocumentWorkerPool(max_workers=1, max_in_flight=10, tenant_limit=4)
+    release = threading.Event()
+    order = []
+    pool.start()
+    assert pool.submit("gate", release.wait, tenant="a")
+    for request_id in ("a1", "a2", "a3"):
+        assert pool.submit(request_id, order.append, request_id, tenant="a")
+    # "a" has its four requests in flight; "b" still has room
+    assert not pool.submit("a4", order.append, "a4", tenant="a")
+    assert pool.available_slots("a") == 0 and pool.available_slots("b") == 4
+    for request_id in ("b1", "b2"):
+        assert pool.submit(request_id, order.append, request_id, tenant="b")
+    release.set()
+    pool.shutdown(wait=True)
+    assert order == ["b1", "a1", "b2", "a2", "a3"]
@@ -0,0 +1,310 @@
+"""Vectorized text statistics used to score document complexity.
+
+Text is turned into an array of code points once and every statistic is a
+NumPy pass over it or over the per-token arrays derived from it: token and
+word counts, letters and syllables per word, number and date tokens, the
+sentence length distribution and the vocabulary (as 64-bit token hashes).
+
+Statistics are computed per chunk and merged, like the analyzer's other
+partials: chunk_stats() keeps the word fragments at a chunk's edges aside
+so that merge() can count a word cut in two by a chunk boundary exactly
+once. summarize() turns the merged result into readability figures.
+"""
+import unicodedata
+from functools import lru_cache
+import numpy as np
+
+# Character classes (bit flags) for every code point in the Basic Multilingual Plane
+WHITESPACE, LETTER, DIGIT, VOWEL, TERMINATOR, CLOSER, DATE_SEPARATOR, LOWERCASE, LINE_BREAK = \
+    1, 2, 4, 8, 16, 32, 64, 128, 256
+
+LONG_WORD_LETTERS = 7  # LIX counts words of more than six letters as long
+MAX_SENTENCE_BIN = 255  # longer sentences share the last histogram bin
+SHORT_TEXT_CHARS = 64  # statistics of shorter texts (mostly words rejoined across chunk edges) are cached
+
+# Token hashes are polynomial in the token's lowercased letters and digits, modulo 2**64
+_HASH_BASE = 1099511628211
+
+
+def _build_tables():
+    classes = np.zeros(0x10000, dtype=np.uint16)
+    lower = np.arange(0x10000, dtype=np.uint32)
+    for cp in range(0x10000):
+        ch = chr(cp)
+        if ch.isspace():
+            classes[cp] = WHITESPACE | (LINE_BREAK if len(("x" + ch + "x").splitlines()) > 1 else 0)
+        elif ch.isalpha():
+            classes[cp] = LETTER | (LOWERCASE if ch.islower() else 0)
+            # Vowels (with or without accents) of Latin scripts, for syllable estimates
+            if cp < 0x250 and unicodedata.normalize("NFD", ch)[0] in "aeiouyAEIOUY":
+                classes[cp] |= VOWEL
+            lowered = ch.lower()
+            if len(lowered) == 1:
+                lower[cp] = ord(lowered)
+        elif ch.isdigit():
+            classes[cp] = DIGIT
+    for ch in ".!?…。！？":
+        classes[ord(ch)] |= TERMINATOR
+    for ch in "\"')]}»”’":
+        classes[ord(ch)] |= CLOSER
+    for ch in "/-.":
+        classes[ord(ch)] |= DATE_SEPARATOR
+    return classes, lower
+
+
+# Class flags and lowercase mapping per code point; code points above the BMP count as "other"
+_CLASSES, _LOWER = _build_tables()
+_ASCII_CLASSES, _ASCII_LOWER = _CLASSES[:128].copy(), _LOWER[:128].astype(np.uint8)
+
+EMPTY_STATS = {
+    "tokens": 0, "words": 0, "letters": 0, "long_words": 0, "syllables": 0, "polysyllables": 0,
+    "numbers": 0, "dates": 0, "types": np.zeros(0, dtype=np.uint64),
+    # Sentence structure. A sentence ends between two tokens if the first ends with a terminator,
+    # or a line break separates them and the second does not start in lowercase (a wrapped line).
+    # Kept: whether there is such a boundary, the tokens before the first (lead) and after the
+    # last (trail), the complete sentences in between, and what decides the boundaries at the
+    # edges: a line break before the first / after the last token, the first token starting in
+    # lowercase and the last one ending a sentence.
+    "boundary": False, "lead": 0, "trail": 0,
+    "leading_break": False, "trailing_break": False, "starts_lowercase": False, "ends_terminated": False,
+    "sentences": 0, "sentence_squares": 0, "longest": 0,
+    "sentence_hist": np.zeros(MAX_SENTENCE_BIN + 1, dtype=np.int64),
+}
+
+# A chunk is its leading word fragment, the statistics of the complete tokens after it and its
+# trailing word fragment; a chunk without whitespace is one fragment ("solid")
+EMPTY_CHUNK = {"solid": True, "head": "", "body": EMPTY_STATS, "tail": ""}
+
+
+def _classify(text):
+    """(lowercased code points, class flags) for every character of text."""
+    if text.isascii():
+        cp = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+        return _ASCII_LOWER[cp], _ASCII_CLASSES[cp]
+    cp = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    if int(cp.max()) < 0x10000:
+        return _LOWER[cp], _CLASSES[cp]
+    bmp = np.minimum(cp, 0xFFFF)
+    return np.where(cp < 0x10000, _LOWER[bmp], cp), _CLASSES[bmp]
+
+
+def _powers(base, count):
+    """[1, base, base**2, ...] modulo 2**64."""
+    powers = np.empty(count, dtype=np.uint64)
+    if count:
+        powers[0] = 1
+        powers[1:] = base
+        np.cumprod(powers, out=powers)
+    return powers
+
+
+def _scan(cp, cls):
+    """Statistics of every whitespace-delimited token in the classified text."""
+    word_char = (cls & WHITESPACE) == 0
+    edges = np.diff(np.concatenate(([False], word_char, [False])).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    tokens = len(starts)
+    if not tokens:
+        line_break = bool((cls & LINE_BREAK).any())
+        return dict(EMPTY_STATS, leading_break=line_break, trailing_break=line_break) if line_break else EMPTY_STATS
+    # Leading whitespace belongs to no token; from here on each token's segment runs to the next token
+    first = starts[0]
+    leading_break = bool((cls[:first] & LINE_BREAK).any())
+    cp, cls = cp[first:], cls[first:]
+    segments = starts - first
+
+    def per_token(values):
+        # Whitespace never carries a counted class, so summing whole segments counts the token alone
+        return np.add.reduceat(values, segments, dtype=np.int32)
+
+    letters = per_token(cls & LETTER) // LETTER
+    digits = per_token(cls & DIGIT) // DIGIT
+    separators = per_token(cls & DATE_SEPARATOR) // DATE_SEPARATOR
+    vowel = (cls & VOWEL) != 0
+    # Syllables are estimated as runs of vowels, at least one per word
+    syllables = per_token(vowel & ~np.concatenate(([False], vowel[:-1])))
+    is_word = letters > 0
+    syllables = np.where(is_word, np.maximum(syllables, 1), 0)
+    last = ends - 1 - first
+    numbers = (digits > 0) & ~is_word
+    # Date-like: 12/03/2024, 2024-03-12, 12.03.24 (a sentence's closing period is not a separator)
+    separators -= (cls[last] & DATE_SEPARATOR) != 0
+    dates = numbers & (separators == 2) & (digits >= 4) & (digits <= 8)
+
+    # A token is terminated if its last character (before any closing quote or bracket) is a terminator
+    terminator = (cls & TERMINATOR) != 0
+    terminated = terminator[last] | (((cls[last] & CLOSER) != 0) & (last > segments) & terminator[last - 1])
+    # Line breaks in the whitespace after each token
+    breaks = per_token(cls & LINE_BREAK) > 0
+    lowercase = (cls[segments] & LOWERCASE) != 0
+    sentence_ends = np.flatnonzero(terminated[:-1] | (breaks[:-1] & ~lowercase[1:]))
+
+    # Vocabulary: a polynomial hash of each word's letters and digits (so surrounding
+    # punctuation does not make a new type), weighted by their position within the word
+    alnum = (cls & (LETTER | DIGIT)) != 0
+    rank = np.cumsum(alnum, dtype=np.int32)
+    position = rank - np.repeat(rank[segments] - alnum[segments], np.diff(np.append(segments, len(cls)))) - 1
+    weights = _powers(_HASH_BASE, int((ends - starts).max()))
+    contributions = np.where(alnum, cp.astype(np.uint64) * weights[np.maximum(position, 0)], np.uint64(0))
+    hashes = np.add.reduceat(contributions, segments)[is_word]
+
+    stats = {
+        "tokens": tokens,
+        "words": int(is_word.sum()),
+        "letters": int(letters.sum()),
+        "long_words": int((letters >= LONG_WORD_LETTERS).sum()),
+        "syllables": int(syllables.sum()),
+        "polysyllables": int((syllables >= 3).sum()),
+        "numbers": int(numbers.sum()),
+        "dates": int(dates.sum()),
+        "types": np.unique(hashes),
+        "boundary": bool(len(sentence_ends)),
+        "leading_break": leading_break,
+        "trailing_break": bool(breaks[-1]),
+        "starts_lowercase": bool(lowercase[0]),
+        "ends_terminated": bool(terminated[-1]),
+    }
+    if len(sentence_ends):
+        inner = np.diff(sentence_ends)
+        stats.update(lead=int(sentence_ends[0]) + 1, trail=tokens - 1 - int(sentence_ends[-1]),
+                     sentences=len(inner), sentence_squares=int((inner * inner).sum()),
+                     longest=int(inner.max(initial=0)),
+                     sentence_hist=np.bincount(np.minimum(inner, MAX_SENTENCE_BIN), minlength=MAX_SENTENCE_BIN + 1))
+    else:
+        stats.update(lead=tokens, trail=tokens, sentences=0, sentence_squares=0, longest=0,
+                     sentence_hist=EMPTY_STATS["sentence_hist"])
+    return stats
+
+
+def text_stats(text):
+    """Statistics of a complete piece of text (both ends are token boundaries)."""
+    if not text:
+        return EMPTY_STATS
+    if len(text) <= SHORT_TEXT_CHARS:
+        return _short_text_stats(text)
+    return _scan(*_classify(text))
+
+
+@lru_cache(maxsize=4096)
+def _short_text_stats(text):
+    # Shared between callers: statistics are never modified in place
+    return _scan(*_classify(text))
+
+
+def _add_sentence(stats, length):
+    hist = stats["sentence_hist"].copy()
+    hist[min(length, MAX_SENTENCE_BIN)] += 1
+    return dict(stats, sentences=stats["sentences"] + 1, sentence_squares=stats["sentence_squares"] + length * length,
+                longest=max(stats["longest"], length), sentence_hist=hist)
+
+
+def combine(a, b):
+    """Statistics of the text of a followed by the text of b. Associative."""
+    if not a["tokens"]:
+        # Only whitespace: a line break in it carries over to the gap before b's first token
+        if not a["trailing_break"] or b["leading_break"]:
+            return b
+        return dict(b, leading_break=True, trailing_break=b["trailing_break"] or not b["tokens"])
+    if not b["tokens"]:
+        return dict(a, trailing_break=True) if b["leading_break"] and not a["trailing_break"] else a
+    merged = {key: a[key] + b[key] for key in ("tokens", "words", "letters", "long_words", "syllables",
+                                                "polysyllables", "numbers", "dates", "sentences",
+                                                "sentence_squares")}
+    merged.update(types=np.union1d(a["types"], b["types"]), boundary=True,
+                  longest=max(a["longest"], b["longest"]), sentence_hist=a["sentence_hist"] + b["sentence_hist"],
+                  leading_break=a["leading_break"], trailing_break=b["trailing_break"],
+                  starts_lowercase=a["starts_lowercase"], ends_terminated=b["ends_terminated"])
+    lead = a["lead"] if a["boundary"] else a["tokens"]
+    trail = b["trail"] if b["boundary"] else b["tokens"]
+    if a["ends_terminated"] or ((a["trailing_break"] or b["leading_break"]) and not b["starts_lowercase"]):
+        # A sentence ends between a and b: the open sentences at both sides of the junction are complete
+        merged.update(lead=lead, trail=trail)
+        if a["boundary"]:
+            merged = _add_sentence(merged, a["trail"])
+        if b["boundary"]:
+            merged = _add_sentence(merged, b["lead"])
+        return merged
+    if a["boundary"] and b["boundary"]:
+        merged.update(lead=lead, trail=trail)
+        return _add_sentence(merged, a["trail"] + b["lead"])
+    if a["boundary"] or b["boundary"]:
+        merged.update(lead=a["lead"] if a["boundary"] else a["tokens"] + b["lead"],
+                      trail=b["trail"] if b["boundary"] else a["trail"] + b["tokens"])
+        return merged
+    merged.update(boundary=False, lead=merged["tokens"], trail=merged["tokens"])
+    return merged
+
+
+def chunk_stats(chunk):
+    """Map step: statistics of one chunk, with the word fragments at its edges kept aside."""
+    if not chunk:
+        return EMPTY_CHUNK
+    cp, cls = _classify(chunk)
+    spaces = np.flatnonzero(cls & WHITESPACE)
+    if not len(spaces):
+        return {"solid": True, "head": chunk, "body": EMPTY_STATS, "tail": ""}
+    first, last = int(spaces[0]), int(spaces[-1])
+    return {"solid": False, "head": chunk[:first], "body": _scan(cp[first:last + 1], cls[first:last + 1]),
+            "tail": chunk[last + 1:]}
+
+
+def merge(a, b):
+    """Combine the chunk statistics of two adjacent chunks (a before b). Associative."""
+    if a["solid"] and b["solid"]:
+        return {"solid": True, "head": a["head"] + b["head"], "body": EMPTY_STATS, "tail": ""}
+    if a["solid"]:
+        return dict(b, head=a["head"] + b["head"])
+    if b["solid"]:
+        return dict(a, tail=a["tail"] + b["head"])
+    # The tail of a and the head of b are the two halves of one token (or one whole token)
+    middle = text_stats(a["tail"] + b["head"])
+    return {"solid": False, "head": a["head"], "body": combine(combine(a["body"], middle), b["body"]),
+            "tail": b["tail"]}
+
+
+def finish(partial):
+    """Statistics of a whole document from its merged chunk statistics."""
+    if partial["solid"]:
+        return text_stats(partial["head"])
+    return combine(combine(text_stats(partial["head"]), partial["body"]), text_stats(partial["tail"]))
+
+
+def summarize(stats):
+    """Readability and structure figures for a whole document's statistics."""
+    # The first and the last (possibly unterminated) sentence were still open
+    if stats["boundary"]:
+        stats = _add_sentence(_add_sentence(stats, stats["lead"]), stats["trail"])
+    elif stats["tokens"]:
+        stats = _add_sentence(stats, stats["tokens"])
+    tokens, words, sentences = stats["tokens"], stats["words"], stats["sentences"]
+    words_per_sentence = tokens / sentences if sentences else 0.0
+    syllables_per_word = stats["syllables"] / words if words else 0.0
+    long_word_ratio = stats["long_words"] / words if words else 0.0
+    variance = stats["sentence_squares"] / sentences - words_per_sentence ** 2 if sentences else 0.0
+    return {
+        "tokens": tokens,
+        "words": words,
+        "sentences": sentences,
+        "avg_sentence_length": words_per_sentence,
+        "median_sentence_length": _percentile(stats["sentence_hist"], 0.5),
+        "p90_sentence_length": _percentile(stats["sentence_hist"], 0.9),
+        "max_sentence_length": stats["longest"],
+        "sentence_length_stdev": max(0.0, variance) ** 0.5,
+        "type_token_ratio": len(stats["types"]) / words if words else 0.0,
+        "long_word_ratio": long_word_ratio,
+        "number_density": stats["numbers"] / tokens if tokens else 0.0,
+        "date_density": stats["dates"] / tokens if tokens else 0.0,
+        "avg_syllables_per_word": syllables_per_word,
+        "flesch_reading_ease": 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word if words else 0.0,
+        "flesch_kincaid_grade": 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59 if words else 0.0,
+        # Läsbarhetsindex: language-independent, so it also suits non-English source documents
+        "lix": words_per_sentence + 100 * long_word_ratio,
+    }
+
+
+def _percentile(hist, q):
+    total = int(hist.sum())
+    if not total:
+        return 0
+    return int(np.searchsorted(np.cumsum(hist), q * total))
@@ -0,0 +1,254 @@
+import time
+import itertools
+import threading
+import logging
+from collections import OrderedDict, Counter
+
+logger = logging.getLogger("GPO Local Brain Worker Pool")
+
+QUEUED = "Queued"
+RUNNING = "Running"
+COMPLETED = "Completed"
+FAILED = "Failed"
+PREEMPTED = "Preempted"
+
+# Rough processing speed used to turn a document's size into a time estimate
+BYTES_PER_SECOND_ESTIMATE = 1024 * 1024
+# Jobs without a deadline are treated as due this far from when they were queued
+DEFAULT_DEADLINE_SECONDS = 7 * 24 * 3600
+
+
+class _Job:
+    def __init__(self, seq, request_id, func, args, kwargs, deadline, size, now, tenant=None, preemptible=True):
+        self.seq = seq
+        self.request_id = request_id
+        self.tenant = tenant
+        self.preemptible = preemptible
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.size = size
+        self.queued_at = now
+        deadline = deadline if deadline is not None else now + DEFAULT_DEADLINE_SECONDS
+        # Latest moment the job can start and still make its deadline
+        self.latest_start = deadline - size / BYTES_PER_SECOND_ESTIMATE
+
+    def priority(self, now, aging):
+        """Lower runs first. Waiting jobs gain aging seconds of urgency per second waited."""
+        return (self.latest_start - aging * (now - self.queued_at), self.size, self.seq)
+
+
+class DocumentWorkerPool:
+    """Bounded pool of worker threads fed by the scheduler's poll loop.
+
+    Queued jobs do not run first-come first-served: the next job is the one
+    with the least slack, i.e. the earliest deadline minus its estimated
+    processing time (from its size). Jobs gain urgency while they wait
+    (aging), so a steady stream of rush jobs cannot starve the rest.
+
+    With preempt enabled, an urgent job arriving at a full pool may push out
+    the largest queued job that is less urgent than it; on_preempt is called
+    with that job's request id so it can be handed back to the cloud. Jobs
+    submitted with preemptible=False (ones the cloud did not hand out, which
+    it cannot offer again) are never pushed out.
+
+    Jobs may belong to a tenant (an organization, when one Local Brain serves
+    several). Tenants take turns: a free worker goes to the tenant with the
+    fewest running jobs, or the one served longest ago, and runs that
+    tenant's most urgent job. With tenant_limit, no tenant may have more than
+    that many jobs in flight, and preemption only replaces a job of the same
+    tenant.
+    """
+
+    def __init__(self, max_workers, max_in_flight=None, history_size=1000, aging=0.0, preempt=False,
+                 preempt_min_size=0, urgent_seconds=24 * 3600, on_preempt=None, tenant_limit=None):
+        self.max_workers = max(1, int(max_workers))
+        self.max_in_flight = max(self.max_workers, int(max_in_flight or self.max_workers))
+        self.history_size = history_size
+        self.aging = aging
+        self.preempt = preempt
+        self.preempt_min_size = preempt_min_size
+        self.urgent_seconds = urgent_seconds
+        self.on_preempt = on_preempt
+        self.tenant_limit = tenant_limit
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.queue = []
+        self.seq = itertools.count()
+        self.stopping = False
+        self.drain_deadline = None
+        self.in_flight = set()
+        self.tenant_in_flight = Counter()
+        self.tenant_running = Counter()
+        self.turns = itertools.count()
+        self.last_turn = {}  # tenant -> turn in which it last got a worker
+        self.statuses = OrderedDict()
+        self.threads = []
+
+    def start(self):
+        if self.threads:
+            return
+        self.stopping = False
+        self.drain_deadline = None
+        for i in range(self.max_workers):
+            thread = threading.Thread(target=self._worker, name=f"gpo-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        logger.info(f"Started {self.max_workers} workers (max in flight: {self.max_in_flight}).")
+
+    def available_slots(self, tenant=None):
+        with self.lock:
+            return self._available(tenant)
+
+    def _available(self, tenant):
+        free = self.max_in_flight - len(self.in_flight)
+        if self.tenant_limit is not None:
+            free = min(free, self.tenant_limit - self.tenant_in_flight[tenant])
+        return free
+
+    def is_tracked(self, request_id):
+        """True while a request is queued or running."""
+        with self.lock:
+            return request_id in self.in_flight
+
+    def wait_for_slot(self, timeout, tenants=(None,)):
+        """Block until one of tenants has a free slot or timeout seconds pass. Returns True if one has."""
+        with self.changed:
+            return self.changed.wait_for(lambda: any(self._available(tenant) > 0 for tenant in tenants), timeout)
+
+    def submit(self, request_id, func, *args, deadline=None, size=0, tenant=None, preemptible=True, **kwargs):
+        """Queue a job. Returns False if the request is already in flight, the pool (or the tenant's share) is full
+        or the pool is shutting down.
+
+        deadline (epoch seconds) and size (bytes) set the job's priority.
+        """
+        victim = None
+        with self.lock:
+            # Once stopping, workers may already have exited and nothing would run the job
+            if self.stopping or request_id in self.in_flight:
+                return False
+            now = time.time()
+            job = _Job(next(self.seq), request_id, func, args, kwargs, deadline, size, now, tenant, preemptible)
+            if self._available(tenant) <= 0:
+                victim = self._preemptable(job, now)
+                if victim is None:
+                    return False
+                self.queue.remove(victim)
+                self._release(victim)
+                self._set_status(victim.request_id, PREEMPTED)
+            self.in_flight.add(request_id)
+            self.tenant_in_flight[tenant] += 1
+            self._set_status(request_id, QUEUED)
+            self.queue.append(job)
+            self.changed.notify_all()
+        if victim is not None:
+            logger.info(f"Request {victim.request_id} preempted by urgent request {request_id}.")
+            if self.on_preempt:
+                self.on_preempt(victim.request_id)
+        return True
+
+    def _preemptable(self, job, now):
+        """The queued job an urgent newcomer may replace: the largest one less urgent than it."""
+        if not self.preempt or job.latest_start - now > self.urgent_seconds:
+            return None
+        priority = job.priority(now, self.aging)
+        candidates = [queued for queued in self.queue if queued.preemptible and queued.tenant == job.tenant
+                      and queued.size >= self.preempt_min_size and queued.priority(now, self.aging) > priority]
+        return max(candidates, key=lambda queued: queued.size, default=None)
+
+    def status(self, request_id):
+        with self.lock:
+            entry = self.statuses.get(request_id)
+            return dict(entry) if entry else None
+
+    def snapshot(self):
+        """Counts of tracked requests per status, plus the in-flight total."""
+        with self.lock:
+            counts = {QUEUED: 0, RUNNING: 0, COMPLETED: 0, FAILED: 0, PREEMPTED: 0}
+            for entry in self.statuses.values():
+                counts[entry["status"]] += 1
+            counts["in_flight"] = len(self.in_flight)
+            return counts
+
+    def shutdown(self, wait=True, timeout=None):
+        """Stop the workers once the queued jobs are done.
+
+        With a timeout, no job is started after it expires and the wait ends
+        there; jobs still queued are dropped and running ones are abandoned.
+        A second call can shorten the deadline but not extend it. Returns True
+        if every worker finished.
+        """
+        with self.changed:
+            self.stopping = True
+            if timeout is not None:
+                deadline = time.monotonic() + timeout
+                self.drain_deadline = deadline if self.drain_deadline is None else min(self.drain_deadline, deadline)
+            self.changed.notify_all()
+        if not wait:
+            return False
+        for thread in self.threads:
+            remaining = None if self.drain_deadline is None else max(0.0, self.drain_deadline - time.monotonic())
+            thread.join(remaining)
+        self.threads = [thread for thread in self.threads if thread.is_alive()]
+        if self.threads:
+            logger.warning(f"Drain deadline passed with {len(self.threads)} jobs still running.")
+        return not self.threads
+
+    def _release(self, job):
+        self.in_flight.discard(job.request_id)
+        self.tenant_in_flight[job.tenant] -= 1
+        if not self.tenant_in_flight[job.tenant]:
+            del self.tenant_in_flight[job.tenant]
+
+    def _past_deadline(self):
+        return self.drain_deadline is not None and time.monotonic() >= self.drain_deadline
+
+    def _set_status(self, request_id, status, error=None):
+        self.statuses[request_id] = {"status": status, "error": error}
+        self.statuses.move_to_end(request_id)
+        while len(self.statuses) > self.history_size:
+            oldest = next(iter(self.statuses))
+            if oldest in self.in_flight:
+                break
+            self.statuses.popitem(last=False)
+
+    def _next_job(self):
+        """The next tenant's most urgent queued job, or None once stopping and the queue is empty
+        (or the drain deadline passed)."""
+        with self.changed:
+            while not self.queue or self._past_deadline():
+                if self.stopping:
+                    return None
+                self.changed.wait()
+            now = time.time()
+            heads = {}
+            for queued in self.queue:
+                priority = queued.priority(now, self.aging)
+                if queued.tenant not in heads or priority < heads[queued.tenant][0]:
+                    heads[queued.tenant] = (priority, queued)
+            tenant = min(heads, key=lambda t: (self.tenant_running[t], self.last_turn.get(t, -1), heads[t][0]))
+            job = heads[tenant][1]
+            self.queue.remove(job)
+            self.tenant_running[tenant] += 1
+            self.last_turn[tenant] = next(self.turns)
+            self._set_status(job.request_id, RUNNING)
+            return job
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                break
+            try:
+                job.func(*job.args, **job.kwargs)
+                status, error = COMPLETED, None
+            except Exception as e:
+                logger.error(f"Request {job.request_id} failed: {e}")
+                status, error = FAILED, str(e)
+            with self.changed:
+                self._release(job)
+                self.tenant_running[job.tenant] -= 1
+                if not self.tenant_running[job.tenant]:
+                    del self.tenant_running[job.tenant]
+                self._set_status(job.request_id, status, error)
+                self.changed.notify_all()
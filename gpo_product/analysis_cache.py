@@ -0,0 +1,200 @@
+"""
+Cache of AI risk analyses.
+
+The Gemini call in analyze_with_genai is the slowest and most expensive step
+of processing an upload, and uploading the same document to a similar project
+asks exactly the same question again. Analyses are cached under a hash of
+their prompt inputs: the text sample, language pair and content type, with the
+word count and the time left until the deadline reduced to buckets (an
+analysis for 12,000 words due in three weeks holds for 14,000 words due in
+20 days). Entries expire after a TTL and the least recently used ones are
+evicted once the cache is full.
+
+Entries live in the analysis_cache_entries table, so every gunicorn worker
+shares them. Each worker counts hits and misses in memory and adds them to the
+totals in analysis_cache_counters every ANALYSIS_CACHE_FLUSH_SECONDS, so
+lookups never wait on a shared counter row. The cache uses its own short
+transactions and never touches the caller's session; if the database cannot
+be reached it acts as a miss.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from database import db, AnalysisCacheEntry, AnalysisCacheCounter
+
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', '1024'))
+ANALYSIS_CACHE_TTL_SECONDS = int(os.getenv('ANALYSIS_CACHE_TTL_SECONDS', str(24 * 3600)))
+ANALYSIS_CACHE_FLUSH_SECONDS = int(os.getenv('ANALYSIS_CACHE_FLUSH_SECONDS', '60'))
+
+# Upper bounds of the word count buckets; larger counts share the last bucket
+WORD_COUNT_BUCKETS = [500, 1000, 2500, 5000, 10000, 25000, 50000, 100000]
+# Upper bounds (days until due) of the deadline buckets; negative means overdue
+DEADLINE_BUCKETS = [-1, 2, 7, 14, 30, 90]
+
+
+def _bucket(value, bounds):
+    for i, bound in enumerate(bounds):
+        if value <= bound:
+            return i
+    return len(bounds)
+
+
+def analysis_key(sample_text, language_pair, content_type, word_count, days_until_due):
+    """Cache key for an analysis: a hash of its prompt inputs, with word count and deadline bucketed"""
+    parts = [
+        sample_text or '',
+        language_pair or '',
+        content_type or '',
+        str(_bucket(word_count or 0, WORD_COUNT_BUCKETS)),
+        str(_bucket(days_until_due, DEADLINE_BUCKETS)),
+    ]
+    return hashlib.sha256('\x00'.join(parts).encode('utf-8')).hexdigest()
+
+
+COUNTERS = ['hits', 'misses', 'expirations', 'evictions']
+
+entries = AnalysisCacheEntry.__table__
+counters = AnalysisCacheCounter.__table__
+
+
+class AnalysisCache:
+    """LRU cache with a TTL and hit/miss counters, shared by all workers through the database"""
+
+    def __init__(self, max_entries=ANALYSIS_CACHE_MAX_ENTRIES, ttl_seconds=ANALYSIS_CACHE_TTL_SECONDS,
+                 flush_seconds=ANALYSIS_CACHE_FLUSH_SECONDS, clock=datetime.utcnow):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.flush_seconds = flush_seconds
+        self.clock = clock
+        self._pending = Counter()  # counts not yet added to analysis_cache_counters
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Cached analysis for key, or None"""
+        now = self.clock()
+        try:
+            with db.engine.begin() as conn:
+                row = conn.execute(select(entries.c.analysis, entries.c.expires_at)
+                                   .where(entries.c.cache_key == key)).first()
+                if row is not None and row.expires_at <= now:
+                    expired = conn.execute(delete(entries).where(entries.c.cache_key == key,
+                                                                 entries.c.expires_at <= now))
+                    self._count('expirations', expired.rowcount)
+                    row = None
+                if row is not None:
+                    conn.execute(update(entries).where(entries.c.cache_key == key).values(last_used_at=now))
+        except SQLAlchemyError as e:
+            current_app.logger.warning(f"Analysis cache lookup failed: {e}")
+            return None
+        self._count('hits' if row is not None else 'misses')
+        self._flush_if_due()
+        return json.loads(row.analysis) if row is not None else None
+
+    def put(self, key, analysis):
+        if self.max_entries <= 0:
+            return
+        now = self.clock()
+        values = {
+            'analysis': json.dumps(analysis),
+            'expires_at': now + timedelta(seconds=self.ttl_seconds),
+            'last_used_at': now
+        }
+        try:
+            if _update_or_insert(entries, entries.c.cache_key == key, values, dict(values, cache_key=key, created_at=now)):
+                self._evict(now)
+        except SQLAlchemyError as e:
+            current_app.logger.warning(f"Analysis cache store failed: {e}")
+        self._flush_if_due()
+
+    def _evict(self, now):
+        """Bring the cache back to max_entries after an insert: expired entries first, then the least recently used"""
+        with db.engine.begin() as conn:
+            if conn.execute(select(func.count()).select_from(entries)).scalar() <= self.max_entries:
+                return
+            conn.execute(delete(entries).where(entries.c.expires_at <= now))
+            surplus = select(entries.c.cache_key).order_by(entries.c.last_used_at.desc()).offset(self.max_entries)
+            evicted = conn.execute(delete(entries).where(entries.c.cache_key.in_(surplus)))
+            self._count('evictions', evicted.rowcount)
+
+    def clear(self):
+        with db.engine.begin() as conn:
+            conn.execute(delete(entries))
+
+    def stats(self):
+        """Size and counters of the cache, totals over all workers (None if the database cannot be read)"""
+        try:
+            self.flush()
+            with db.engine.begin() as conn:
+                size = conn.execute(select(func.count()).select_from(entries)
+                                    .where(entries.c.expires_at > self.clock())).scalar()
+                totals = dict(conn.execute(select(counters.c.name, counters.c.value)).all())
+        except SQLAlchemyError as e:
+            current_app.logger.warning(f"Analysis cache stats unavailable: {e}")
+            return None
+        totals = {name: totals.get(name, 0) for name in COUNTERS}
+        lookups = totals['hits'] + totals['misses']
+        return {
+            'entries': size,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': totals['hits'],
+            'misses': totals['misses'],
+            'hit_rate': totals['hits'] / lookups if lookups else 0.0,
+            'expirations': totals['expirations'],
+            'evictions': totals['evictions']
+        }
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._pending[name] += amount
+
+    def _flush_if_due(self):
+        if time.monotonic() - self._last_flush >= self.flush_seconds:
+            try:
+                self.flush()
+            except SQLAlchemyError as e:
+                current_app.logger.warning(f"Analysis cache counters not saved: {e}")
+
+    def flush(self):
+        """Add this process's counts to the shared totals (kept for the next flush if that fails)"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+        try:
+            for name, amount in pending.items():
+                if amount:
+                    _update_or_insert(counters, counters.c.name == name, {'value': counters.c.value + amount},
+                                      {'name': name, 'value': amount})
+                pending[name] = 0
+        except SQLAlchemyError:
+            with self._lock:
+                self._pending.update(pending)
+            raise
+
+
+def _update_or_insert(table, match, update_values, insert_values):
+    """Update the row matching match, or insert it if there is none; True if a row was inserted"""
+    with db.engine.begin() as conn:
+        if conn.execute(update(table).where(match).values(**update_values)).rowcount:
+            return False
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(insert(table).values(**insert_values))
+        return True
+    except IntegrityError:
+        # Another worker inserted it in between
+        with db.engine.begin() as conn:
+            conn.execute(update(table).where(match).values(**update_values))
+        return False
+
+
+# Shared by every request and background thread of this process; the entries are shared by all processes
+analysis_cache = AnalysisCache()
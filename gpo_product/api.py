@@ -5,6 +5,8 @@ from datetime import datetime, timedelta
 import json
 import uuid
 from database import db, Project, User, Organization, Linguist, AuditLog, Notification
+import blob_store
+from analysis_cache import analysis_cache
 from middleware import require_role, require_organization_access, log_user_activity, create_notification
 
 # Create API blueprint
@@ -21,6 +23,16 @@ def health_check():
         'version': '1.0.0'
     })
 
+@api_bp.route('/metrics/analysis-cache', methods=['GET'])
+@login_required
+@require_role(['admin'])
+def analysis_cache_metrics():
+    """Hit rate and size of the AI analysis cache, over all app processes"""
+    stats = analysis_cache.stats()
+    if stats is None:
+        return jsonify({'error': 'Analysis cache statistics unavailable'}), 503
+    return jsonify(stats)
+
 # Project Management API
 @api_bp.route('/projects', methods=['GET'])
 @login_required
@@ -264,9 +276,14 @@ def delete_project(project_id):
             return jsonify({'error': 'Project not found'}), 404
         
         project_name = project.project_name
+        blob_hashes = [document.blob_sha256 for document in project.documents if document.blob_sha256]
         db.session.delete(project)
         db.session.commit()
         
+        # Stored files are shared between documents; remove them once nothing refers to them
+        for sha256 in blob_hashes:
+            blob_store.release(sha256)
+        
         # Log activity
         log_user_activity('delete', 'project', str(project_id), {
             'project_name': project_name
@@ -2,6 +2,7 @@ from flask import Flask, render_template, request, jsonify, redirect, url_for, f
 from datetime import datetime, timedelta
 import os
 import re
+import hashlib
 from dotenv import load_dotenv
 from faker import Faker
 import random
@@ -9,71 +10,48 @@ import socket
 import sys
 import json
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from werkzeug.utils import secure_filename
 from flask_login import LoginManager, current_user, login_required
 import uuid
-from sqlalchemy import text
-
-# Handle PyMuPDF import
-try:
-    import fitz  # PyMuPDF
-    PYMUPDF_AVAILABLE = True
-except ImportError:
-    PYMUPDF_AVAILABLE = False
-    print("Warning: PyMuPDF not available. PDF processing will be limited.")
-
-# Handle docx import
-try:
-    import docx
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
-    print("Warning: python-docx not available. DOCX processing will be limited.")
-
-# Handle Google Generative AI import
-try:
-    import google.generativeai as genai
-    # Check if the library has the necessary attributes or functions
-    # Different versions of the library might have different APIs
-    GENAI_AVAILABLE = True
-    
-    # Get API key from environment
-    LLM_API_KEY = os.getenv('LLM_API_KEY')
-    
-    # Test if we can configure the API
-    if LLM_API_KEY:
-        try:
-            if hasattr(genai, 'configure'):
-                genai.configure(api_key=LLM_API_KEY)  # type: ignore
-            # For newer versions that might use a different approach
-            elif hasattr(genai, 'set_api_key'):
-                genai.set_api_key(LLM_API_KEY)  # type: ignore
-        except Exception as e:
-            print(f"Warning: Failed to configure Google Generative AI: {str(e)}")
-except ImportError:
-    GENAI_AVAILABLE = False
-    genai = None
-    print("Warning: Google Generative AI library is not available")
+from sqlalchemy import text, func
+from sqlalchemy.exc import IntegrityError
 
 # Import our modules
 from auth import init_auth
 from admin import init_admin
-from database import db, init_database, Organization, User, Linguist, Project, ProjectDocument, AuditLog, Notification, LinguistProfile
+from database import db, init_database, Organization, User, Linguist, Project, ProjectDocument, DocumentBlob, DocumentArtifact, AuditLog, Notification, LinguistProfile
 from middleware import init_middleware
 from api import api_bp
 from forms import LinguistUploadForm, LinguistProfileForm, NewProjectRequestForm
+import document_artifacts
+import blob_store
+from analysis_cache import analysis_cache, analysis_key
+from llm_client import LLMClient, LLMUnavailable
 
 # Load environment variables
 load_dotenv()
 
+# One LLM client per process, shared by requests and background threads
+LLM_API_KEY = os.getenv('LLM_API_KEY')
+llm_client = LLMClient(LLM_API_KEY) if LLM_API_KEY else None
+if not llm_client:
+    print("Warning: LLM_API_KEY is not set. AI analysis is disabled.")
+
 # Create Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-key-for-testing')
 app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
+app.config['BLOB_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], 'blobs')  # uploads, stored by content hash
+app.config['ARTIFACT_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], 'artifacts')  # normalized text of uploads
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload size
 
-# Ensure the upload folder exists
+# Ensure the upload folders exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+os.makedirs(app.config['BLOB_FOLDER'], exist_ok=True)
+os.makedirs(app.config['ARTIFACT_FOLDER'], exist_ok=True)
 
 # Initialize database
 init_database(app)
@@ -272,6 +250,140 @@ def project_detail(project_id):
     project = Project.query.filter_by(id=project_id, organization_id=current_user.organization_id).first_or_404()
     return render_template('project_detail.html', project=project)
 
+# Background processing of uploaded documents (word count and risk analysis)
+UPLOAD_PROCESSING_WORKERS = int(os.getenv('UPLOAD_PROCESSING_WORKERS', '2'))
+# Documents 'Processing' for longer than this were lost (e.g. their worker process exited) and are picked up again
+UPLOAD_PROCESSING_STALE_SECONDS = int(os.getenv('UPLOAD_PROCESSING_STALE_SECONDS', '900'))
+# A document is marked 'Failed' instead of being picked up again once it has been tried this many times
+UPLOAD_PROCESSING_MAX_ATTEMPTS = int(os.getenv('UPLOAD_PROCESSING_MAX_ATTEMPTS', '3'))
+# How often each process looks for lost documents (0 disables the check)
+UPLOAD_RECOVERY_INTERVAL_SECONDS = int(os.getenv('UPLOAD_RECOVERY_INTERVAL_SECONDS', '300'))
+upload_executor = ThreadPoolExecutor(max_workers=UPLOAD_PROCESSING_WORKERS, thread_name_prefix='upload-processing')
+
+def process_uploaded_document(document_id):
+    """Count the words of an uploaded document and re-analyze its project (runs in upload_executor)"""
+    with app.app_context():
+        document = ProjectDocument.query.get(document_id)
+        if document is None:
+            return
+        try:
+            artifact = blob_artifact(document.blob_sha256)
+            
+            # Only one run finishes a document: a run picked up again by recovery may race a slow original
+            finished = ProjectDocument.query.filter_by(id=document_id, status='Processing').update({
+                ProjectDocument.word_count: artifact.word_count,
+                ProjectDocument.status: 'Processed',
+                ProjectDocument.updated_at: datetime.utcnow()
+            }, synchronize_session=False)
+            if not finished:
+                db.session.rollback()
+                return
+            # Atomic increment, so documents of one project processed side by side don't lose each other's words
+            Project.query.filter_by(id=document.project_id).update(
+                {Project.initial_word_count: Project.initial_word_count + artifact.word_count},
+                synchronize_session=False)
+            db.session.commit()
+            
+            project = Project.query.get(document.project_id)
+            analyze_project(project, project_analysis_sample(project))
+            db.session.commit()
+        except Exception as e:
+            app.logger.error(f"Error processing document {document_id}: {str(e)}")
+            db.session.rollback()
+            ProjectDocument.query.filter_by(id=document_id, status='Processing').update({
+                ProjectDocument.status: 'Failed',
+                ProjectDocument.updated_at: datetime.utcnow()
+            }, synchronize_session=False)
+            db.session.commit()
+        finally:
+            db.session.remove()
+
+def recover_stale_uploads(submit=None):
+    """Pick up documents left 'Processing' by a worker that went away.
+    
+    Documents untouched for UPLOAD_PROCESSING_STALE_SECONDS are handed to
+    submit (upload_executor.submit by default) again, or marked 'Failed' once
+    they have been tried UPLOAD_PROCESSING_MAX_ATTEMPTS times. Every process
+    runs this; the conditional updates let only one of them claim a document.
+    Returns (resubmitted, failed) document ids.
+    """
+    submit = submit or upload_executor.submit
+    resubmitted, failed = [], []
+    with app.app_context():
+        try:
+            now = datetime.utcnow()
+            cutoff = now - timedelta(seconds=UPLOAD_PROCESSING_STALE_SECONDS)
+            stale = ProjectDocument.query.filter(
+                ProjectDocument.status == 'Processing',
+                ProjectDocument.updated_at < cutoff
+            ).all()
+            for document in stale:
+                claim = ProjectDocument.query.filter_by(
+                    id=document.id, status='Processing', updated_at=document.updated_at)
+                if document.processing_attempts >= UPLOAD_PROCESSING_MAX_ATTEMPTS:
+                    if claim.update({ProjectDocument.status: 'Failed', ProjectDocument.updated_at: now},
+                                    synchronize_session=False):
+                        failed.append(document.id)
+                elif claim.update({ProjectDocument.processing_attempts: ProjectDocument.processing_attempts + 1,
+                                   ProjectDocument.updated_at: now}, synchronize_session=False):
+                    resubmitted.append(document.id)
+            db.session.commit()
+        except Exception as e:
+            app.logger.error(f"Error recovering stale uploads: {str(e)}")
+            db.session.rollback()
+            return [], []
+        finally:
+            db.session.remove()
+    
+    if failed:
+        app.logger.warning(f"Gave up on documents {failed} after {UPLOAD_PROCESSING_MAX_ATTEMPTS} attempts")
+    for document_id in resubmitted:
+        app.logger.info(f"Processing document {document_id} again, its previous run was lost")
+        submit(process_uploaded_document, document_id)
+    return resubmitted, failed
+
+def run_upload_recovery():
+    """Recover lost uploads now and then every UPLOAD_RECOVERY_INTERVAL_SECONDS (daemon thread)"""
+    while True:
+        recover_stale_uploads()
+        time.sleep(UPLOAD_RECOVERY_INTERVAL_SECONDS)
+
+if UPLOAD_RECOVERY_INTERVAL_SECONDS > 0:
+    threading.Thread(target=run_upload_recovery, name='upload-recovery', daemon=True).start()
+
+def blob_artifact(sha256):
+    """Artifact of an uploaded blob, extracting it only if no earlier upload of the same content did"""
+    artifact = DocumentArtifact.query.filter_by(blob_sha256=sha256).first()
+    if artifact is not None:
+        return artifact
+    
+    # The only pass over the uploaded file; later steps read the artifact instead
+    blob = DocumentBlob.query.get(sha256)
+    extracted = document_artifacts.extract(blob.file_path, blob.file_type)
+    artifact = DocumentArtifact()
+    artifact.blob_sha256 = sha256
+    artifact.word_count = extracted['word_count']
+    artifact.page_count = extracted['page_count']
+    artifact.paragraph_count = extracted['paragraph_count']
+    artifact.max_paragraph_words = extracted['max_paragraph_words']
+    artifact.analysis_sample = extracted['analysis_sample']
+    artifact.text_path = blob_store.blob_path(app.config['ARTIFACT_FOLDER'], sha256) + '.txt'
+    document_artifacts.save_text(extracted['text'], artifact.text_path)
+    db.session.add(artifact)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A duplicate upload was extracted at the same time; use its artifact
+        db.session.rollback()
+        artifact = DocumentArtifact.query.filter_by(blob_sha256=sha256).one()
+    return artifact
+
+def project_analysis_sample(project):
+    """Analysis sample for a project, taken from the artifacts of its processed documents"""
+    samples = [document.blob.artifact.analysis_sample for document in project.documents
+               if document.blob and document.blob.artifact and document.blob.artifact.analysis_sample]
+    return '\n\n'.join(samples)[:document_artifacts.SAMPLE_CHARS]
+
 @app.route('/upload_document/<int:project_id>', methods=['POST'])
 @login_required
 def upload_document(project_id):
@@ -288,34 +400,64 @@ def upload_document(project_id):
     
     if file and file.filename:
         filename = secure_filename(file.filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{project.id}_{filename}")
-        file.save(file_path)
+        file_type = os.path.splitext(filename)[1]
         
-        # Count words in the document
-        word_count = count_words(file_path)
+        # Content already uploaded (to any project) is stored once and shared
+        blob = blob_store.store(file.stream, app.config['BLOB_FOLDER'], file_type.lower())
         
-        # Create project document
+        # Word counting and analysis run in the background; the document stays 'Processing' until they finish
         document = ProjectDocument()
         document.project_id = project.id
         document.file_name = filename
-        document.file_path = file_path
-        document.file_type = os.path.splitext(filename)[1]
-        document.word_count = word_count
+        document.file_path = blob.file_path
+        document.file_type = file_type
+        document.blob_sha256 = blob.sha256
+        document.word_count = 0
+        document.status = 'Processing'
+        document.processing_attempts = 1
         
-        db.session.add(document)
-        
-        # Update project word count
-        project.initial_word_count += word_count
-        
-        # Analyze the document and update risk status
-        analyze_project(project, file_path)
+        try:
+            db.session.add(document)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            blob_store.release(blob.sha256)
+            raise
         
-        db.session.commit()
+        upload_executor.submit(process_uploaded_document, document.id)
         
-        flash('Document uploaded successfully', 'success')
+        flash('Document uploaded, word count and analysis are in progress', 'success')
     
     return redirect(url_for('project_detail', project_id=project_id))
 
+@app.route('/project/<project_id>/documents/status')
+@login_required
+def project_documents_status(project_id):
+    """Processing status of a project's documents, polled by the project page"""
+    project = Project.query.filter_by(id=project_id, organization_id=current_user.organization_id).first_or_404()
+    documents = ProjectDocument.query.filter_by(project_id=project.id).order_by(ProjectDocument.created_at).all()
+    return jsonify({
+        'documents': [{
+            'id': document.id,
+            'file_name': document.file_name,
+            'status': document.status,
+            'word_count': document.word_count
+        } for document in documents],
+        'processing': any(document.status == 'Processing' for document in documents),
+        'initial_word_count': project.initial_word_count,
+        'gpo_risk_status': project.gpo_risk_status
+    })
+
+# The project page's "Run GPO Analysis" button posts here
+@app.route('/project/<project_id>/analyze', methods=['POST'], endpoint='analyze_project')
+@login_required
+def reanalyze_project(project_id):
+    project = Project.query.filter_by(id=project_id, organization_id=current_user.organization_id).first_or_404()
+    analyze_project(project, project_analysis_sample(project))
+    db.session.commit()
+    flash('GPO analysis updated', 'success')
+    return redirect(url_for('project_detail', project_id=project_id))
+
 @app.route('/assign_linguist/<int:project_id>', methods=['POST'])
 @login_required
 def assign_linguist(project_id):
@@ -376,67 +518,25 @@ def update_progress(project_id):
     return redirect(url_for('project_detail', project_id=project_id))
 
 # Utility functions
-def count_words(file_path):
-    """Count words in a document"""
-    ext = os.path.splitext(file_path)[1].lower()
-    
-    try:
-        if ext == '.pdf' and PYMUPDF_AVAILABLE:
-            # Count words in PDF
-            doc = fitz.open(file_path)
-            word_count = 0
-            for page in doc:
-                # Extract text using the appropriate method based on PyMuPDF version
-                text = ""
-                # Try different methods to get text based on PyMuPDF version
-                for method_name in ['get_text', 'getText', 'extractText']:
-                    if hasattr(page, method_name):
-                        try:
-                            text = getattr(page, method_name)()
-                            break
-                        except:
-                            continue
-                
-                words = text.split()
-                word_count += len(words)
-            return word_count
-        
-        elif (ext in ['.doc', '.docx']) and DOCX_AVAILABLE:
-            # Count words in Word document
-            doc = docx.Document(file_path)
-            word_count = 0
-            for para in doc.paragraphs:
-                words = para.text.split()
-                word_count += len(words)
-            return word_count
-        
-        elif ext in ['.txt', '.md', '.html', '.xml']:
-            # Count words in text file
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                text = f.read()
-                words = text.split()
-                return len(words)
-        
-        else:
-            # Default to a reasonable estimate
-            return 1000
-    
-    except Exception as e:
-        app.logger.error(f"Error counting words: {e}")
-        return 1000
-
 # Wrapper for Google Generative AI functionality
 def analyze_with_genai(sample_text, project):
     """
     Analyze project text with Google's Generative AI
     """
-    if not GENAI_AVAILABLE or not LLM_API_KEY:
+    if not llm_client:
         return {
             'risk_status': 'Unknown',
             'risk_reason': 'AI analysis not available',
-            'recommendation': 'Please install the Google Generative AI library and provide an API key.'
+            'recommendation': 'Please provide an LLM API key.'
         }
     
+    # Identical prompt inputs (up to word count and deadline buckets) get the earlier answer
+    cache_key = analysis_key(sample_text[:1000], project.language_pair, project.content_type,
+                             project.initial_word_count, (project.due_date - datetime.now().date()).days)
+    cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
         prompt = f"""
         You are an AI assistant for a translation project management system.
@@ -457,30 +557,12 @@ def analyze_with_genai(sample_text, project):
         3. recommendation: A recommendation for handling this project
         """
         
-        # Try different ways to generate content based on available API
-        response = None
-        
         try:
-            # For newer versions of the library
-            if hasattr(genai, 'GenerativeModel'):
-                model = genai.GenerativeModel('gemini-pro')  # type: ignore
-                result = model.generate_content(prompt)  # type: ignore
-                if hasattr(result, 'text'):
-                    response = result.text  # type: ignore
-                elif hasattr(result, 'parts') and len(result.parts) > 0:
-                    response = result.parts[0].text  # type: ignore
-            # For older versions of the library
-            elif hasattr(genai, 'generate_text'):
-                result = genai.generate_text(prompt=prompt)  # type: ignore
-                if hasattr(result, 'result'):
-                    response = result.result  # type: ignore
-        except Exception as e:
-            current_app.logger.error(f"Error generating AI content: {str(e)}")
-            return {
-                'risk_status': 'Unknown',
-                'risk_reason': f'Error in AI analysis: {str(e)}',
-                'recommendation': 'Please try again later or contact support.'
-            }
+            response = llm_client.generate(prompt)
+        except LLMUnavailable as e:
+            # Provider slow, failing or circuit open: keep the heuristic assessment
+            current_app.logger.warning(f"AI analysis unavailable: {str(e)}")
+            return None
         
         if not response:
             return {
@@ -509,6 +591,7 @@ def analyze_with_genai(sample_text, project):
             if 'risk_status' not in result or result['risk_status'] not in ['Low Risk', 'Medium Risk', 'High Risk', 'Unknown']:
                 result['risk_status'] = 'Medium Risk'
             
+            analysis_cache.put(cache_key, result)
             return result
         except Exception as e:
             current_app.logger.error(f"Error parsing AI response: {str(e)}")
@@ -525,8 +608,8 @@ def analyze_with_genai(sample_text, project):
             'recommendation': 'Please try again later.'
         }
 
-def analyze_project(project, file_path):
-    """Analyze a project and set risk status"""
+def analyze_project(project, sample_text=None):
+    """Analyze a project and set risk status (sample_text: document text sample for the AI analysis)"""
     # Calculate days until due
     days_until_due = (project.due_date - datetime.now().date()).days
     
@@ -551,11 +634,8 @@ def analyze_project(project, file_path):
         project.gpo_risk_reason = f'This project requires translating {int(words_per_day)} words per day, which is manageable.'
         project.gpo_recommendation = 'Proceed as planned with regular progress checks.'
     
-    # If we have a LLM API key and Google Generative AI is available, use it for more advanced analysis
-    if LLM_API_KEY and GENAI_AVAILABLE and genai:
-        # Extract text from the document (limited sample)
-        sample_text = extract_text_sample(file_path)
-        
+    # If we have a LLM API key, use it for more advanced analysis
+    if llm_client and sample_text:
         # Use the wrapper function for Google Generative AI
         analysis = analyze_with_genai(sample_text, project)
         
@@ -565,71 +645,6 @@ def analyze_project(project, file_path):
             project.gpo_risk_reason = analysis.get('risk_reason', project.gpo_risk_reason)
             project.gpo_recommendation = analysis.get('recommendation', project.gpo_recommendation)
 
-def extract_text_sample(file_path):
-    """Extract text from a document file for analysis"""
-    try:
-        file_ext = os.path.splitext(file_path)[1].lower()
-        
-        # PDF extraction
-        if file_ext == '.pdf':
-            if PYMUPDF_AVAILABLE:
-                try:
-                    # Try to open the PDF with PyMuPDF
-                    pdf = fitz.open(file_path)
-                    text = ""
-                    # Extract text from first few pages
-                    max_pages = min(5, len(pdf))
-                    for page_num in range(max_pages):
-                        try:
-                            # Try different methods depending on PyMuPDF version
-                            page = pdf[page_num]
-                            if hasattr(page, 'get_text'):
-                                text += page.get_text()  # type: ignore
-                            elif hasattr(page, 'getText'):
-                                text += page.getText()  # type: ignore
-                            else:
-                                text += page.extractText()  # type: ignore
-                        except Exception as e:
-                            current_app.logger.warning(f"Error extracting text from page {page_num}: {str(e)}")
-                    
-                    # Limit text length
-                    return text[:5000]
-                except Exception as e:
-                    current_app.logger.error(f"Error extracting text from PDF: {str(e)}")
-                    return "Error extracting PDF text: " + str(e)
-            else:
-                return "PDF text extraction not available. Please install PyMuPDF."
-        
-        # DOCX extraction
-        elif file_ext == '.docx':
-            if DOCX_AVAILABLE:
-                try:
-                    doc = docx.Document(file_path)
-                    text = "\n".join([para.text for para in doc.paragraphs])
-                    return text[:5000]  # Limit text length
-                except Exception as e:
-                    current_app.logger.error(f"Error extracting text from DOCX: {str(e)}")
-                    return "Error extracting DOCX text: " + str(e)
-            else:
-                return "DOCX text extraction not available. Please install python-docx."
-        
-        # TXT files
-        elif file_ext == '.txt':
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                    return f.read(5000)  # Read up to 5000 chars
-            except Exception as e:
-                current_app.logger.error(f"Error reading text file: {str(e)}")
-                return "Error reading text file: " + str(e)
-        
-        # Unsupported format
-        else:
-            return f"Text extraction not supported for {file_ext} files."
-    
-    except Exception as e:
-        current_app.logger.error(f"Error in extract_text_sample: {str(e)}")
-        return "Error extracting text: " + str(e)
-
 # Linguist Profile Management Routes
 @app.route('/linguists')
 @login_required
@@ -919,6 +934,7 @@ def new_project_request():
         
         db.session.add(new_project)
         db.session.commit()
+        notify_local_brain_work()
         
         # Generate success message with instructions
         flash(f'Project analysis request created successfully! Local Analysis Request ID: {new_project.id}. Please use your GPO Local Brain to analyze the document with this ID.', 'success')
@@ -937,6 +953,229 @@ def project_details(project_id):
     
     return render_template('project_details.html', project=project)
 
+@app.route('/projects/<project_id>/local-analysis', methods=['POST'])
+@login_required
+def request_local_analysis(project_id):
+    """Send the project back to the Local Brain for a fresh analysis, without reusing a stored blueprint"""
+    project = Project.query.filter_by(
+        id=project_id,
+        organization_id=current_user.organization_id
+    ).first_or_404()
+    
+    project.local_analysis_status = 'Pending Local Analysis'
+    project.local_analysis_force_refresh = True
+    project.updated_at = datetime.utcnow()
+    db.session.commit()
+    notify_local_brain_work()
+    
+    flash('Fresh local analysis requested', 'success')
+    return redirect(url_for('project_details', project_id=project_id))
+
+# Local Brain dispatch
+# Long-poll requests are held for at most this long (must stay below the gunicorn timeout)
+LOCAL_BRAIN_MAX_WAIT_SECONDS = 20
+# Work created in this process wakes held requests at once. Work created by another gunicorn worker
+# is only seen when a held request re-checks the database, at this interval; kept long so an idle
+# Local Brain costs a query or two per hold rather than one a second
+LOCAL_BRAIN_RECHECK_SECONDS = float(os.getenv('LOCAL_BRAIN_RECHECK_SECONDS', '15'))
+local_brain_work_available = threading.Condition()
+
+def notify_local_brain_work():
+    """Wake long-polling Local Brain requests held by this process"""
+    with local_brain_work_available:
+        local_brain_work_available.notify_all()
+
+def authenticate_local_brain(organization_id):
+    """Resolve the X-API-Key header to the organization in the URL.
+    
+    Returns (organization, None) or (None, error_response).
+    """
+    api_key = request.headers.get('X-API-Key')
+    if not api_key:
+        return None, (jsonify({'error': 'API key required'}), 401)
+    
+    organization = Organization.query.filter_by(api_key=api_key).first()
+    if not organization or organization.id != organization_id:
+        return None, (jsonify({'error': 'Invalid API key'}), 401)
+    
+    return organization, None
+
+def get_pending_local_brain_requests(organization_id):
+    """Return the organization's projects still waiting for local analysis"""
+    projects = Project.query.filter_by(
+        organization_id=organization_id,
+        local_analysis_status='Pending Local Analysis'
+    ).order_by(Project.created_at).all()
+    
+    return [{
+        'local_analysis_request_id': p.id,
+        'file_path': p.source_file_path,
+        'content_type': p.content_type,
+        'desired_deadline': p.desired_deadline.isoformat() if p.desired_deadline else None,
+        'force_refresh': bool(p.local_analysis_force_refresh)
+    } for p in projects]
+
+@app.route('/api/local-brain-requests/<organization_id>', methods=['GET'])
+def local_brain_requests(organization_id):
+    """API endpoint for Local Brain to fetch pending analysis requests.
+    
+    Pass ?wait=<seconds> to long-poll: the response is held until work is
+    available or the wait expires, instead of returning an empty list at once.
+    """
+    try:
+        organization, error = authenticate_local_brain(organization_id)
+        if error:
+            return error
+        
+        wait = max(0.0, min(request.args.get('wait', 0, type=float), LOCAL_BRAIN_MAX_WAIT_SECONDS))
+        deadline = time.monotonic() + wait
+        
+        pending = get_pending_local_brain_requests(organization_id)
+        while not pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # End the transaction so the connection goes back to the pool while we wait
+            db.session.rollback()
+            with local_brain_work_available:
+                local_brain_work_available.wait(timeout=min(LOCAL_BRAIN_RECHECK_SECONDS, remaining))
+            pending = get_pending_local_brain_requests(organization_id)
+        
+        return jsonify({'requests': pending})
+        
+    except Exception as e:
+        current_app.logger.error(f"Error fetching local brain requests: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/api/local-brain-requests/batch', methods=['POST'])
+def local_brain_requests_batch():
+    """API endpoint for a Local Brain serving several organizations to poll for all of them at once.
+
+    Payload: {"organizations": {<organization_id>: <api_key>, ...}, "wait": <seconds>}
+    Returns {"requests": {<organization_id>: [...]}, "errors": {<organization_id>: <message>}}.
+    With wait the response is held until any of the organizations has work or the wait expires.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get('organizations'), dict) or not data['organizations']:
+            return jsonify({'error': 'organizations must map organization ids to API keys'}), 400
+        
+        keys = {str(key) for key in data['organizations'].values() if key}
+        organizations = {o.api_key: o for o in Organization.query.filter(Organization.api_key.in_(keys)).all()} if keys else {}
+        authenticated = []
+        errors = {}
+        for organization_id, api_key in data['organizations'].items():
+            organization = organizations.get(api_key)
+            if organization and organization.id == organization_id:
+                authenticated.append(organization_id)
+            else:
+                errors[organization_id] = 'Invalid API key'
+        
+        try:
+            wait = max(0.0, min(float(data.get('wait') or 0), LOCAL_BRAIN_MAX_WAIT_SECONDS))
+        except (TypeError, ValueError):
+            wait = 0.0
+        deadline = time.monotonic() + wait
+        
+        def pending_by_organization():
+            return {organization_id: get_pending_local_brain_requests(organization_id) for organization_id in authenticated}
+        
+        pending = pending_by_organization()
+        while authenticated and not any(pending.values()):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            db.session.rollback()
+            with local_brain_work_available:
+                local_brain_work_available.wait(timeout=min(LOCAL_BRAIN_RECHECK_SECONDS, remaining))
+            pending = pending_by_organization()
+        
+        return jsonify({'requests': pending, 'errors': errors})
+
+    except Exception as e:
+        current_app.logger.error(f"Error fetching batched local brain requests: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+# A profile written in a transaction that commits after a sync read a newer timestamp carries an
+# updated_at older than that sync's token. Deltas reach this far back before the token, and the
+# ETag covers the profiles written in this window, so such profiles are still sent
+LINGUIST_SYNC_OVERLAP_SECONDS = int(os.getenv('LINGUIST_SYNC_OVERLAP_SECONDS', '300'))
+
+@app.route('/api/organization-linguists/<organization_id>', methods=['GET'])
+def organization_linguists(organization_id):
+    """API endpoint for Local Brain to sync the organization's linguist profiles.
+    
+    Without parameters the full list is returned. Pass ?since=<sync_token> from a
+    previous response to receive only profiles changed since then; the client
+    should fall back to a full sync if its total no longer matches `total`
+    (profiles were deleted). Deltas overlap the previous response by
+    LINGUIST_SYNC_OVERLAP_SECONDS, so clients upsert profiles by id. The ETag
+    changes whenever any profile does, so If-None-Match gets a 304 when
+    nothing changed.
+    """
+    try:
+        organization, error = authenticate_local_brain(organization_id)
+        if error:
+            return error
+        
+        total, latest = db.session.query(
+            func.count(LinguistProfile.id),
+            func.max(LinguistProfile.updated_at)
+        ).filter(LinguistProfile.organization_id == organization_id).one()
+        sync_token = latest.isoformat() if latest else None
+        overlap = timedelta(seconds=LINGUIST_SYNC_OVERLAP_SECONDS)
+        
+        # Profiles committed late, with a timestamp below the latest one, change neither the count nor the latest
+        # timestamp; fingerprinting the profiles written just before it catches them
+        recent = hashlib.sha256()
+        if latest:
+            for profile_id, updated_at in db.session.query(LinguistProfile.id, LinguistProfile.updated_at).filter(
+                    LinguistProfile.organization_id == organization_id,
+                    LinguistProfile.updated_at >= latest - overlap).order_by(LinguistProfile.id):
+                recent.update(f"{profile_id}|{updated_at.isoformat()}\n".encode('utf-8'))
+        etag = f"{total}-{sync_token}-{recent.hexdigest()[:16]}"
+        
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+        
+        query = LinguistProfile.query.filter_by(organization_id=organization_id)
+        since = None
+        if request.args.get('since'):
+            try:
+                since = datetime.fromisoformat(request.args['since'])
+            except ValueError:
+                since = None
+        if since:
+            # Reach back before the token for rows committed late with older timestamps; clients upsert by id
+            query = query.filter(LinguistProfile.updated_at >= since - overlap)
+        
+        response = jsonify({
+            'linguists': [{
+                'id': l.id,
+                'internal_id': l.internal_id,
+                'full_name': l.full_name,
+                'email': l.email,
+                'specializations': l.specializations,
+                'source_languages': l.source_languages,
+                'target_languages': l.target_languages,
+                'quality_rating': l.quality_rating,
+                'general_capacity_words_per_day': l.general_capacity_words_per_day,
+                'status': l.status,
+                'updated_at': l.updated_at.isoformat() if l.updated_at else None
+            } for l in query.all()],
+            'full': since is None,
+            'sync_token': sync_token,
+            'total': total
+        })
+        response.set_etag(etag)
+        return response
+        
+    except Exception as e:
+        current_app.logger.error(f"Error fetching organization linguists: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route('/api/local-analysis-results', methods=['POST'])
 def local_analysis_results():
     """API endpoint for receiving analysis results from Local Brain"""
@@ -973,27 +1212,7 @@ def local_analysis_results():
             return jsonify({'error': 'Project not found'}), 404
         
         # Update project with AI analysis results
-        project.ai_overall_risk_status = data.get('ai_overall_risk_status')
-        project.ai_risk_reason = data.get('ai_risk_reason')
-        project.ai_document_complexity = data.get('ai_document_complexity')
-        project.ai_key_challenges = data.get('ai_key_challenges')
-        project.ai_sensitive_data_alert_summary = data.get('ai_sensitive_data_alert_summary')
-        project.ai_recommended_linguist_profile_text = data.get('ai_recommended_linguist_profile_text')
-        project.ai_optimal_team_size = data.get('ai_optimal_team_size')
-        project.ai_deadline_fit_assessment = data.get('ai_deadline_fit_assessment')
-        project.ai_strategic_recommendations = data.get('ai_strategic_recommendations')
-        project.local_analysis_status = data.get('local_analysis_status', 'Analysis Complete')
-        
-        # Parse timestamp if provided
-        if data.get('ai_analysis_timestamp'):
-            try:
-                project.ai_analysis_timestamp = datetime.fromisoformat(data['ai_analysis_timestamp'].replace('Z', '+00:00'))
-            except:
-                project.ai_analysis_timestamp = datetime.utcnow()
-        else:
-            project.ai_analysis_timestamp = datetime.utcnow()
-        
-        project.updated_at = datetime.utcnow()
+        apply_local_analysis_result(project, data)
         
         db.session.commit()
         
@@ -1007,6 +1226,166 @@ def local_analysis_results():
         current_app.logger.error(f"Error processing local analysis results: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+def apply_local_analysis_result(project, data):
+    """Copy a Local Brain analysis result onto its project"""
+    project.ai_overall_risk_status = data.get('ai_overall_risk_status')
+    project.ai_risk_reason = data.get('ai_risk_reason')
+    project.ai_document_complexity = data.get('ai_document_complexity')
+    project.ai_key_challenges = data.get('ai_key_challenges')
+    project.ai_sensitive_data_alert_summary = data.get('ai_sensitive_data_alert_summary')
+    project.ai_recommended_linguist_profile_text = data.get('ai_recommended_linguist_profile_text')
+    project.ai_optimal_team_size = data.get('ai_optimal_team_size')
+    project.ai_deadline_fit_assessment = data.get('ai_deadline_fit_assessment')
+    project.ai_strategic_recommendations = data.get('ai_strategic_recommendations')
+    project.local_analysis_status = data.get('local_analysis_status', 'Analysis Complete')
+    project.ai_blueprint_reused = bool(data.get('ai_blueprint_reused', False))
+    # A forced re-analysis has been answered; later requests may reuse blueprints again
+    project.local_analysis_force_refresh = False
+    
+    # Parse timestamp if provided
+    if data.get('ai_analysis_timestamp'):
+        try:
+            project.ai_analysis_timestamp = datetime.fromisoformat(data['ai_analysis_timestamp'].replace('Z', '+00:00'))
+        except:
+            project.ai_analysis_timestamp = datetime.utcnow()
+    else:
+        project.ai_analysis_timestamp = datetime.utcnow()
+    
+    project.updated_at = datetime.utcnow()
+
+def build_registered_project(organization_id, created_by, data):
+    """Create a project for a document the Local Brain registered itself.
+    
+    Required: local_analysis_request_id (becomes the project id), project_name,
+    client_name, source_lang, target_lang, content_type, desired_deadline (YYYY-MM-DD).
+    Optional: file_path, local_analysis_status.
+    """
+    missing = [field for field in ('project_name', 'client_name', 'source_lang', 'target_lang', 'content_type', 'desired_deadline')
+               if not data.get(field)]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+    try:
+        desired_deadline = datetime.strptime(data['desired_deadline'], '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError('desired_deadline must be YYYY-MM-DD')
+    
+    project = Project()
+    project.id = data['local_analysis_request_id']
+    project.project_name = data['project_name']
+    project.client_name = data['client_name']
+    project.source_lang = data['source_lang']
+    project.target_lang = data['target_lang']
+    project.content_type = data['content_type']
+    project.desired_deadline = desired_deadline
+    project.source_file_path = data.get('file_path')
+    project.organization_id = organization_id
+    project.created_by = created_by
+    project.local_analysis_status = data.get('local_analysis_status', 'Processing Local Analysis')
+    return project
+
+@app.route('/api/local-analysis-results/batch', methods=['POST'])
+def local_analysis_results_batch():
+    """API endpoint for receiving several Local Brain status updates and results in one transaction.
+    
+    Payload: {"registrations": [<project fields, see build_registered_project>, ...],
+              "status_updates": [{"local_analysis_request_id", "local_analysis_status"}, ...],
+              "results": [<same fields as /api/local-analysis-results>, ...]}
+    Registrations (documents the Local Brain found itself, e.g. in a hot folder)
+    create their projects first; status updates are applied before results, so a
+    final result always wins.
+    """
+    try:
+        api_key = request.headers.get('X-API-Key')
+        if not api_key:
+            return jsonify({'error': 'API key required'}), 401
+        
+        organization = Organization.query.filter_by(api_key=api_key).first()
+        if not organization:
+            return jsonify({'error': 'Invalid API key'}), 401
+        
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Invalid JSON payload'}), 400
+        registrations = data.get('registrations') or []
+        status_updates = data.get('status_updates') or []
+        results = data.get('results') or []
+        if not all(isinstance(items, list) for items in (registrations, status_updates, results)):
+            return jsonify({'error': 'registrations, status_updates and results must be lists'}), 400
+        
+        # Load every referenced project with one query
+        request_ids = {item.get('local_analysis_request_id') for item in registrations + status_updates + results if isinstance(item, dict)}
+        request_ids.discard(None)
+        projects = {}
+        taken_ids = set()
+        if request_ids:
+            for p in Project.query.filter(Project.id.in_(request_ids)).all():
+                if p.organization_id == organization.id:
+                    projects[p.id] = p
+                else:
+                    taken_ids.add(p.id)
+        
+        updated = 0
+        errors = []
+        creator = None
+        for item in registrations:
+            request_id = item.get('local_analysis_request_id') if isinstance(item, dict) else None
+            project = projects.get(request_id)
+            if project:
+                # A changed hot-folder file: keep its project and re-analyze
+                project.source_file_path = item.get('file_path', project.source_file_path)
+                project.local_analysis_status = item.get('local_analysis_status', project.local_analysis_status)
+                project.updated_at = datetime.utcnow()
+                updated += 1
+                continue
+            if not request_id or request_id in taken_ids:
+                errors.append({'local_analysis_request_id': request_id, 'type': 'registration',
+                               'error': 'Request ID already in use' if request_id else 'local_analysis_request_id required'})
+                continue
+            if creator is None:
+                # Registered projects belong to the organization's first admin (or first user)
+                creator = User.query.filter_by(organization_id=organization.id).order_by(
+                    User.role != 'admin', User.created_at).first()
+                if creator is None:
+                    errors.append({'local_analysis_request_id': request_id, 'type': 'registration',
+                                   'error': 'Organization has no users'})
+                    continue
+            try:
+                project = build_registered_project(organization.id, creator.id, item)
+            except ValueError as e:
+                errors.append({'local_analysis_request_id': request_id, 'type': 'registration', 'error': str(e)})
+                continue
+            db.session.add(project)
+            projects[request_id] = project
+            updated += 1
+        
+        for kind, items in (('status_update', status_updates), ('result', results)):
+            for item in items:
+                request_id = item.get('local_analysis_request_id') if isinstance(item, dict) else None
+                project = projects.get(request_id)
+                if not project:
+                    errors.append({'local_analysis_request_id': request_id, 'type': kind,
+                                   'error': 'Project not found' if request_id else 'local_analysis_request_id required'})
+                    continue
+                if kind == 'status_update':
+                    project.local_analysis_status = item.get('local_analysis_status', project.local_analysis_status)
+                    project.updated_at = datetime.utcnow()
+                else:
+                    apply_local_analysis_result(project, item)
+                updated += 1
+        
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'updated': updated,
+            'errors': errors
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error processing local analysis results batch: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 # Error handlers
 @app.errorhandler(404)
 def page_not_found(e):
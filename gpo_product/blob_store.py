@@ -0,0 +1,115 @@
+"""
+Content-addressed storage for uploaded documents.
+
+Uploads are hashed (SHA-256) while they are streamed to disk and stored once
+per distinct content, under root/<hash[:2]>/<hash[2:4]>/<hash>. Each blob has
+a row in document_blobs counting the ProjectDocuments that point to it; the
+file (and the artifact extracted from it) is removed when the last reference
+is released. Uploading content that is already stored costs one hash and no
+extra disk space, and its artifact is reused instead of extracting it again.
+"""
+import hashlib
+import os
+import uuid
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from database import db, DocumentBlob
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def blob_path(root, sha256):
+    """Sharded location of a blob (or anything else keyed by a content hash) under root"""
+    return os.path.join(root, sha256[:2], sha256[2:4], sha256)
+
+
+def _write_stream(stream, root):
+    """Stream an upload to a temporary file under root, hashing it on the way; returns (sha256, size, temp_path)"""
+    temp_dir = os.path.join(root, 'tmp')
+    os.makedirs(temp_dir, exist_ok=True)
+    temp_path = os.path.join(temp_dir, uuid.uuid4().hex)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(temp_path, 'wb') as f:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                size += len(chunk)
+                f.write(chunk)
+    except Exception:
+        os.remove(temp_path)
+        raise
+    return digest.hexdigest(), size, temp_path
+
+
+def _place(temp_path, path):
+    """Move a freshly written blob into place, or drop it if the same content is already there"""
+    if os.path.exists(path):
+        os.remove(temp_path)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(temp_path, path)
+
+
+def store(stream, root, file_type):
+    """
+    Store an uploaded file stream and take a reference to its blob.
+    Returns the DocumentBlob; the new reference is committed.
+    """
+    sha256, size, temp_path = _write_stream(stream, root)
+    path = blob_path(root, sha256)
+    try:
+        for _ in range(2):
+            # The row lock serializes this with release() of the same blob, which may be removing the file
+            blob = DocumentBlob.query.filter_by(sha256=sha256).with_for_update().first()
+            if blob is None:
+                blob = DocumentBlob()
+                blob.sha256 = sha256
+                blob.size = size
+                blob.file_path = path
+                blob.file_type = file_type
+                blob.ref_count = 1
+                db.session.add(blob)
+                try:
+                    db.session.flush()
+                except IntegrityError:
+                    # The same content was uploaded at the same moment; take a reference to that blob instead
+                    db.session.rollback()
+                    continue
+            else:
+                blob.ref_count += 1
+                blob.updated_at = datetime.utcnow()
+            _place(temp_path, path)
+            db.session.commit()
+            return blob
+        raise RuntimeError(f"Could not register blob {sha256}")
+    except Exception:
+        db.session.rollback()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def release(sha256):
+    """Drop one reference to a blob, removing its file and artifact when it was the last one"""
+    blob = DocumentBlob.query.filter_by(sha256=sha256).with_for_update().first()
+    if blob is None or blob.ref_count <= 0:
+        db.session.rollback()
+        return
+    blob.ref_count -= 1
+    blob.updated_at = datetime.utcnow()
+    if blob.ref_count == 0:
+        # The row itself is kept, with no file, so that a later upload of the same content locks it again
+        if blob.artifact is not None:
+            _remove(blob.artifact.text_path)
+            db.session.delete(blob.artifact)
+        _remove(blob.file_path)
+    db.session.commit()
+
+
+def _remove(path):
+    if path and os.path.exists(path):
+        os.remove(path)
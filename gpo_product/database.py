@@ -8,6 +8,9 @@ from dotenv import load_dotenv
 # Create a single SQLAlchemy instance
 db = SQLAlchemy()
 
+# Auto-incrementing BIGINT ids; SQLite only auto-increments INTEGER PRIMARY KEY columns
+BigIntegerId = db.BigInteger().with_variant(db.Integer, 'sqlite')
+
 # Always load the root .env file
 root_env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
 print(f"[DEBUG] Loading .env from: {root_env_path}")
@@ -27,9 +30,9 @@ def init_database(app):
     print(f"[DEBUG] DB USER: {SUPABASE_USER}")
     print(f"[DEBUG] DB PASSWORD: {SUPABASE_PASSWORD}")
 
-    # Only use the provided host
+    # Only use the provided host (DATABASE_URL, e.g. a SQLite file for tests, takes precedence)
     try:
-        app.config['SQLALCHEMY_DATABASE_URI'] = f"postgresql://{SUPABASE_USER}:{SUPABASE_PASSWORD}@{SUPABASE_HOST}:{SUPABASE_PORT}/{SUPABASE_DB}"
+        app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL') or f"postgresql://{SUPABASE_USER}:{SUPABASE_PASSWORD}@{SUPABASE_HOST}:{SUPABASE_PORT}/{SUPABASE_DB}"
     except Exception as e:
         print(f"❌ Failed to connect to {SUPABASE_HOST}: {str(e)}")
         # Fall back to SQLite
@@ -61,14 +64,15 @@ def init_database(app):
             print("✅ Database tables already exist")
             
             # Ensure all required tables exist
-            required_tables = ['organizations', 'users', 'linguists', 'projects', 'project_documents', 
-                              'password_resets', 'audit_logs', 'notifications', 'linguist_profiles']
+            required_tables = ['organizations', 'users', 'linguists', 'projects', 'document_blobs', 'project_documents', 
+                              'document_artifacts', 'analysis_cache_entries', 'analysis_cache_counters', 'password_resets',
+                              'audit_logs', 'notifications', 'linguist_profiles']
             
             missing_tables = [table for table in required_tables if table not in existing_tables]
             if missing_tables:
                 print(f"⚠️ Missing tables detected: {missing_tables}")
                 # Create only the missing tables
-                for model in [Organization, User, Linguist, Project, ProjectDocument, PasswordReset, AuditLog, Notification, LinguistProfile]:
+                for model in [Organization, User, Linguist, Project, DocumentBlob, ProjectDocument, DocumentArtifact, AnalysisCacheEntry, AnalysisCacheCounter, PasswordReset, AuditLog, Notification, LinguistProfile]:
                     if model.__tablename__ in missing_tables:
                         model.__table__.create(db.engine)
                         print(f"✅ Created missing table: {model.__tablename__}")
@@ -140,6 +144,11 @@ def init_database(app):
                     print("✅ Project documents table has correct schema")
                 else:
                     print("✅ Project documents table has correct schema")
+                
+                # Documents uploaded since content-addressed storage point to their blob
+                db.session.execute(db.text("ALTER TABLE project_documents ADD COLUMN IF NOT EXISTS blob_sha256 VARCHAR(64) REFERENCES document_blobs(sha256)"))
+                db.session.execute(db.text("ALTER TABLE project_documents ADD COLUMN IF NOT EXISTS processing_attempts INTEGER NOT NULL DEFAULT 0"))
+                db.session.commit()
             except Exception as e:
                 print(f"⚠️ Could not verify schema: {e}")
         
@@ -176,6 +185,20 @@ def init_database(app):
         except Exception as e:
             print(f"⚠️ Could not update projects schema: {e}")
         
+        # Columns added since: forced re-analysis requests and blueprint reuse reported by the Local Brain
+        try:
+            db.session.execute(db.text("ALTER TABLE projects ADD COLUMN IF NOT EXISTS local_analysis_force_refresh BOOLEAN NOT NULL DEFAULT FALSE"))
+            db.session.execute(db.text("ALTER TABLE projects ADD COLUMN IF NOT EXISTS ai_blueprint_reused BOOLEAN"))
+            db.session.commit()
+        except Exception as e:
+            print(f"⚠️ Could not add local analysis columns: {e}")
+        
+        # Index used by incremental linguist sync (organization_id, updated_at)
+        try:
+            db.session.execute(db.text("CREATE INDEX IF NOT EXISTS idx_linguist_org_updated ON linguist_profiles (organization_id, updated_at)"))
+        except Exception as e:
+            print(f"⚠️ Could not create linguist sync index: {e}")
+        
         # Commit any pending changes
         db.session.commit()
 
@@ -224,7 +247,7 @@ class User(db.Model):
 class Linguist(db.Model):
     __tablename__ = 'linguists'
     
-    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    id = db.Column(BigIntegerId, primary_key=True, autoincrement=True)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='CASCADE'))
     name = db.Column(db.Text, nullable=False)
     languages = db.Column(db.Text, nullable=False)
@@ -263,6 +286,8 @@ class Project(db.Model):
     ai_strategic_recommendations = db.Column(db.Text, nullable=True)
     ai_analysis_timestamp = db.Column(db.DateTime, nullable=True)
     local_analysis_status = db.Column(db.String(50), default='Pending Local Analysis')  # Pending Local Analysis, Analysis Complete, Error in Local Analysis
+    local_analysis_force_refresh = db.Column(db.Boolean, nullable=False, default=False)  # Local Brain must not reuse a stored blueprint
+    ai_blueprint_reused = db.Column(db.Boolean, nullable=True)  # Blueprint copied from an identical document the Local Brain analyzed before
     
     # Legacy fields (keeping for compatibility)
     language_pair = db.Column(db.Text, nullable=True)
@@ -292,22 +317,66 @@ class Project(db.Model):
 class ProjectDocument(db.Model):
     __tablename__ = 'project_documents'
     
-    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    id = db.Column(BigIntegerId, primary_key=True, autoincrement=True)
     project_id = db.Column(db.String(36), db.ForeignKey('projects.id', ondelete='CASCADE'), nullable=False)
     file_name = db.Column(db.Text, nullable=False)
     file_path = db.Column(db.Text, nullable=False)
     file_type = db.Column(db.Text, nullable=False)
     word_count = db.Column(db.Integer, nullable=False, default=0)
     status = db.Column(db.Text, nullable=False, default='Uploaded')
+    processing_attempts = db.Column(db.Integer, nullable=False, default=0)  # Background processing runs started
+    blob_sha256 = db.Column(db.String(64), db.ForeignKey('document_blobs.sha256'), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    project = db.relationship('Project', backref=db.backref('documents', lazy=True, cascade='all, delete-orphan'))
+    blob = db.relationship('DocumentBlob', backref=db.backref('documents', lazy=True))
+
+class DocumentBlob(db.Model):
+    __tablename__ = 'document_blobs'
+    
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.BigInteger, nullable=False)
+    file_path = db.Column(db.Text, nullable=False)
+    file_type = db.Column(db.Text, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class DocumentArtifact(db.Model):
+    __tablename__ = 'document_artifacts'
+    
+    id = db.Column(BigIntegerId, primary_key=True, autoincrement=True)
+    blob_sha256 = db.Column(db.String(64), db.ForeignKey('document_blobs.sha256', ondelete='CASCADE'), nullable=False, unique=True)
+    word_count = db.Column(db.Integer, nullable=False, default=0)
+    page_count = db.Column(db.Integer, nullable=True)
+    paragraph_count = db.Column(db.Integer, nullable=False, default=0)
+    max_paragraph_words = db.Column(db.Integer, nullable=False, default=0)
+    analysis_sample = db.Column(db.Text, nullable=False, default='')
+    text_path = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    blob = db.relationship('DocumentBlob', backref=db.backref('artifact', uselist=False, lazy=True))
+
+class AnalysisCacheEntry(db.Model):
+    __tablename__ = 'analysis_cache_entries'
+    
+    cache_key = db.Column(db.String(64), primary_key=True)  # analysis_cache.analysis_key of the prompt inputs
+    analysis = db.Column(db.Text, nullable=False)  # JSON
+    expires_at = db.Column(db.DateTime, nullable=False)
+    last_used_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class AnalysisCacheCounter(db.Model):
+    __tablename__ = 'analysis_cache_counters'
     
-    project = db.relationship('Project', backref=db.backref('documents', lazy=True))
+    name = db.Column(db.String(32), primary_key=True)  # hits, misses, expirations, evictions
+    value = db.Column(db.BigInteger, nullable=False, default=0)
 
 class PasswordReset(db.Model):
     __tablename__ = 'password_resets'
     
-    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    id = db.Column(BigIntegerId, primary_key=True, autoincrement=True)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     token = db.Column(db.Text, unique=True, nullable=False)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -319,7 +388,7 @@ class PasswordReset(db.Model):
 class AuditLog(db.Model):
     __tablename__ = 'audit_logs'
     
-    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    id = db.Column(BigIntegerId, primary_key=True, autoincrement=True)
     organization_id = db.Column(db.String(36), db.ForeignKey('organizations.id', ondelete='CASCADE'), nullable=False)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='SET NULL'))
     action = db.Column(db.Text, nullable=False)  # create, update, delete, login, etc.
@@ -336,7 +405,7 @@ class AuditLog(db.Model):
 class Notification(db.Model):
     __tablename__ = 'notifications'
     
-    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    id = db.Column(BigIntegerId, primary_key=True, autoincrement=True)
     organization_id = db.Column(db.String(36), db.ForeignKey('organizations.id', ondelete='CASCADE'), nullable=False)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     title = db.Column(db.Text, nullable=False)
@@ -374,4 +443,5 @@ class LinguistProfile(db.Model):
         db.Index('idx_linguist_org_internal', 'organization_id', 'internal_id'),
         db.Index('idx_linguist_organization', 'organization_id'),
         db.Index('idx_linguist_status', 'status'),
+        db.Index('idx_linguist_org_updated', 'organization_id', 'updated_at'),
     ) 
\ No newline at end of file
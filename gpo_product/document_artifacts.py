@@ -0,0 +1,121 @@
+"""
+Single-pass text extraction for uploaded documents.
+
+A document is opened and parsed once, when it is uploaded. Everything later
+steps need (word count, page and paragraph statistics, the sample sent for
+AI analysis and the normalized plain text) comes out of that one pass and is
+stored as the document's artifact, so nothing has to parse the original
+file again.
+"""
+import os
+import re
+import unicodedata
+
+# Handle PyMuPDF import
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+    print("Warning: PyMuPDF not available. PDF processing will be limited.")
+
+# Handle docx import
+try:
+    import docx
+    DOCX_AVAILABLE = True
+except ImportError:
+    DOCX_AVAILABLE = False
+    print("Warning: python-docx not available. DOCX processing will be limited.")
+
+# Characters of normalized text sent for AI analysis
+SAMPLE_CHARS = 5000
+# Word count assumed for documents whose text cannot be extracted
+ESTIMATED_WORD_COUNT = 1000
+TEXT_EXTENSIONS = ['.txt', '.md', '.html', '.xml']
+
+_BLANK_LINE = re.compile(r'\n\s*\n')
+
+
+def _page_text(page):
+    """Text of a PDF page, whichever PyMuPDF version is installed"""
+    for method_name in ['get_text', 'getText', 'extractText']:
+        if hasattr(page, method_name):
+            return getattr(page, method_name)()
+    return ""
+
+
+def _split_paragraphs(text):
+    return _BLANK_LINE.split(text)
+
+
+def _read(file_path, file_type):
+    """(page_count, raw paragraphs) of a document, or None if its text cannot be extracted"""
+    ext = (file_type or os.path.splitext(file_path)[1]).lower()
+
+    if ext == '.pdf' and PYMUPDF_AVAILABLE:
+        pdf = fitz.open(file_path)
+        try:
+            paragraphs = []
+            for page in pdf:
+                paragraphs.extend(_split_paragraphs(_page_text(page)))
+            return len(pdf), paragraphs
+        finally:
+            pdf.close()
+
+    if ext in ['.doc', '.docx'] and DOCX_AVAILABLE:
+        doc = docx.Document(file_path)
+        return None, [para.text for para in doc.paragraphs]
+
+    if ext in TEXT_EXTENSIONS:
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            return None, _split_paragraphs(f.read())
+
+    return None
+
+
+def normalize_paragraph(text):
+    """NFC-normalized paragraph with every run of whitespace collapsed to one space"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def extract(file_path, file_type=None):
+    """
+    Parse a document once and return its artifact (file_type, e.g. '.pdf',
+    defaults to the file's extension):
+    word_count, page_count (PDF only), paragraph_count, max_paragraph_words,
+    analysis_sample and text (paragraphs separated by blank lines).
+
+    Documents of an unsupported type get an estimated word count and no text;
+    errors while parsing a supported type are raised.
+    """
+    content = _read(file_path, file_type)
+    if content is None:
+        return {
+            'word_count': ESTIMATED_WORD_COUNT,
+            'page_count': None,
+            'paragraph_count': 0,
+            'max_paragraph_words': 0,
+            'analysis_sample': '',
+            'text': ''
+        }
+
+    page_count, raw_paragraphs = content
+    paragraphs = [p for p in (normalize_paragraph(raw) for raw in raw_paragraphs) if p]
+    paragraph_words = [len(p.split()) for p in paragraphs]
+    text = '\n\n'.join(paragraphs)
+    return {
+        'word_count': sum(paragraph_words),
+        'page_count': page_count,
+        'paragraph_count': len(paragraphs),
+        'max_paragraph_words': max(paragraph_words, default=0),
+        'analysis_sample': text[:SAMPLE_CHARS],
+        'text': text
+    }
+
+
+def save_text(text, text_path):
+    """Write a document's normalized text to text_path"""
+    os.makedirs(os.path.dirname(text_path), exist_ok=True)
+    with open(text_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
@@ -0,0 +1,164 @@
+"""
+Process-wide client for the Gemini API used by the cloud risk analysis.
+
+One LLMClient is shared by every request and background thread of a worker
+process. It keeps one HTTP connection pool for the configured model, lets at
+most LLM_MAX_CONCURRENCY calls be in flight at once, gives every call a
+deadline (waiting for a free slot and retries included) and retries
+throttling, server errors and timeouts with jittered exponential backoff.
+
+A circuit breaker stops calling the provider after LLM_BREAKER_FAILURES
+calls in a row have failed or run out of time. Calls are then refused at
+once until LLM_BREAKER_RESET_SECONDS have passed, after which a single trial
+call decides whether the circuit closes again. Callers treat LLMUnavailable
+as "no AI analysis" and keep the heuristic risk assessment.
+
+The client talks to the REST generateContent endpoint directly, so it can be
+pointed at a stub server with LLM_API_BASE_URL.
+"""
+import os
+import random
+import threading
+import time
+import requests
+
+LLM_API_BASE_URL = os.getenv('LLM_API_BASE_URL', 'https://generativelanguage.googleapis.com')
+LLM_MODEL = os.getenv('LLM_MODEL', 'gemini-pro')
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '4'))
+LLM_CALL_DEADLINE_SECONDS = float(os.getenv('LLM_CALL_DEADLINE_SECONDS', '20'))
+LLM_MAX_ATTEMPTS = int(os.getenv('LLM_MAX_ATTEMPTS', '3'))
+LLM_BREAKER_FAILURES = int(os.getenv('LLM_BREAKER_FAILURES', '5'))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv('LLM_BREAKER_RESET_SECONDS', '60'))
+
+# Backoff before retry n (from 0) is up to RETRY_BASE_SECONDS * 2**n, capped, with full jitter
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 8.0
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class LLMUnavailable(Exception):
+    """No answer from the provider in time (or the circuit is open); fall back to the heuristic analysis"""
+
+
+class CircuitBreaker:
+    """Opens after failure_threshold consecutive failures; lets one trial call through after reset_seconds"""
+
+    def __init__(self, failure_threshold=LLM_BREAKER_FAILURES, reset_seconds=LLM_BREAKER_RESET_SECONDS, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return 'closed'
+            if self.clock() - self.opened_at >= self.reset_seconds:
+                return 'half-open'
+            return 'open'
+
+    def allow(self):
+        """Whether a call may be made now"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.clock() - self.opened_at < self.reset_seconds or self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self.trial_in_flight = False
+
+    def record_abandoned(self):
+        """A call let through did not reach the provider; it says nothing about the provider's health"""
+        with self._lock:
+            self.trial_in_flight = False
+
+
+class LLMClient:
+    """Shared, concurrency-limited Gemini client with deadlines, retries and a circuit breaker"""
+
+    def __init__(self, api_key, model=LLM_MODEL, base_url=LLM_API_BASE_URL, max_concurrency=LLM_MAX_CONCURRENCY,
+                 deadline_seconds=LLM_CALL_DEADLINE_SECONDS, max_attempts=LLM_MAX_ATTEMPTS, breaker=None,
+                 session=None, sleep=time.sleep):
+        self.api_key = api_key
+        self.model = model
+        self.url = f"{base_url.rstrip('/')}/v1beta/models/{model}:generateContent"
+        self.deadline_seconds = deadline_seconds
+        self.max_attempts = max_attempts
+        self.breaker = breaker or CircuitBreaker()
+        self.session = session or requests.Session()
+        # In a header rather than the query string, so the key never shows up in URLs quoted by errors and logs
+        self.session.headers['x-goog-api-key'] = api_key
+        self.sleep = sleep
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def generate(self, prompt, deadline_seconds=None):
+        """Text the model generates for prompt; raises LLMUnavailable if there is none within the deadline"""
+        deadline = time.monotonic() + (deadline_seconds or self.deadline_seconds)
+        if not self.breaker.allow():
+            raise LLMUnavailable(f"Circuit open after {self.breaker.failures} failed calls")
+        if not self._slots.acquire(timeout=max(0, deadline - time.monotonic())):
+            self.breaker.record_abandoned()
+            raise LLMUnavailable("No free slot for an LLM call before the deadline")
+        try:
+            return self._generate(prompt, deadline)
+        finally:
+            self._slots.release()
+
+    def _generate(self, prompt, deadline):
+        last_error = None
+        for attempt in range(self.max_attempts):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                response = self.session.post(
+                    self.url,
+                    json={'contents': [{'parts': [{'text': prompt}]}]},
+                    timeout=remaining
+                )
+            except requests.RequestException as e:
+                last_error = f"{type(e).__name__}: {e}"
+            else:
+                if response.status_code < 400:
+                    self.breaker.record_success()
+                    return self._text(response)
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    # The request itself is wrong; retrying will not help, and the provider is not at fault
+                    self.breaker.record_abandoned()
+                    raise LLMUnavailable(f"LLM request rejected: HTTP {response.status_code}")
+                last_error = f"HTTP {response.status_code}"
+
+            if attempt + 1 < self.max_attempts:
+                backoff = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+                if time.monotonic() + backoff >= deadline:
+                    break
+                self.sleep(backoff)
+
+        self.breaker.record_failure()
+        raise LLMUnavailable(f"LLM call failed: {last_error or 'deadline exceeded'}")
+
+    @staticmethod
+    def _text(response):
+        """Generated text of a generateContent response ('' if there is none, e.g. when blocked)"""
+        try:
+            parts = response.json()['candidates'][0]['content']['parts']
+        except (ValueError, KeyError, IndexError, TypeError):
+            return ''
+        return ''.join(part.get('text', '') for part in parts)
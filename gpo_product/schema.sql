@@ -75,12 +75,25 @@ CREATE TABLE IF NOT EXISTS projects (
     gpo_risk_reason TEXT,
     gpo_recommendation TEXT,
     source_file_path TEXT,
+    local_analysis_force_refresh BOOLEAN NOT NULL DEFAULT FALSE,
+    ai_blueprint_reused BOOLEAN,
     organization_id UUID NOT NULL REFERENCES organizations(id) ON DELETE CASCADE,
     created_by UUID NOT NULL REFERENCES users(id),
     created_at TIMESTAMP NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
+-- Uploaded files, stored once per distinct content and shared by the documents referencing them
+CREATE TABLE IF NOT EXISTS document_blobs (
+    sha256 VARCHAR(64) PRIMARY KEY,
+    size BIGINT NOT NULL,
+    file_path TEXT NOT NULL,
+    file_type TEXT NOT NULL,
+    ref_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
 -- Project documents
 CREATE TABLE IF NOT EXISTS project_documents (
     id BIGSERIAL PRIMARY KEY,
@@ -90,10 +103,40 @@ CREATE TABLE IF NOT EXISTS project_documents (
     file_type TEXT NOT NULL,
     word_count INTEGER NOT NULL DEFAULT 0,
     status TEXT NOT NULL DEFAULT 'Uploaded',
+    processing_attempts INTEGER NOT NULL DEFAULT 0,
+    blob_sha256 VARCHAR(64) REFERENCES document_blobs(sha256),
     created_at TIMESTAMP NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
+-- Text extracted from an uploaded file in one pass
+CREATE TABLE IF NOT EXISTS document_artifacts (
+    id BIGSERIAL PRIMARY KEY,
+    blob_sha256 VARCHAR(64) NOT NULL UNIQUE REFERENCES document_blobs(sha256) ON DELETE CASCADE,
+    word_count INTEGER NOT NULL DEFAULT 0,
+    page_count INTEGER,
+    paragraph_count INTEGER NOT NULL DEFAULT 0,
+    max_paragraph_words INTEGER NOT NULL DEFAULT 0,
+    analysis_sample TEXT NOT NULL DEFAULT '',
+    text_path TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- AI risk analyses cached by their prompt inputs, shared by all app processes
+CREATE TABLE IF NOT EXISTS analysis_cache_entries (
+    cache_key VARCHAR(64) PRIMARY KEY,
+    analysis TEXT NOT NULL,
+    expires_at TIMESTAMP NOT NULL,
+    last_used_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Hit/miss counters of the analysis cache, one row per counter
+CREATE TABLE IF NOT EXISTS analysis_cache_counters (
+    name VARCHAR(32) PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0
+);
+
 -- Billing information
 CREATE TABLE IF NOT EXISTS billing_info (
     id UUID PRIMARY KEY,
@@ -28,7 +28,8 @@ echo "🔥 Starting Gunicorn server..."
 exec gunicorn \
     --bind 0.0.0.0:5000 \
     --workers 4 \
-    --worker-class sync \
+    --worker-class gthread \
+    --threads 8 \
     --worker-connections 1000 \
     --max-requests 1000 \
     --max-requests-jitter 100 \
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the database-backed cache of AI risk analyses, run on SQLite.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+# Add the current directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import db
+from analysis_cache import AnalysisCache, analysis_key
+
+
+class AnalysisCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(self.directory.name, 'cache.db')}"
+        db.init_app(self.app)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.now = datetime(2026, 1, 1, 12, 0)
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.context.pop()
+        self.directory.cleanup()
+
+    def cache(self, **kwargs):
+        kwargs.setdefault('flush_seconds', 3600)
+        return AnalysisCache(clock=lambda: self.now, **kwargs)
+
+    def test_hit_after_put(self):
+        cache = self.cache()
+        key = analysis_key('sample', 'EN-ES', 'Legal', 12000, 21)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, {'risk_status': 'Low Risk'})
+        cache.put(key, {'risk_status': 'High Risk'})
+        self.assertEqual(cache.get(key), {'risk_status': 'High Risk'})
+
+    def test_entries_are_shared_between_processes(self):
+        key = analysis_key('sample', 'EN-ES', 'Legal', 12000, 21)
+        self.cache().put(key, {'risk_status': 'Low Risk'})
+        self.assertEqual(self.cache().get(key), {'risk_status': 'Low Risk'})
+
+    def test_expired_entries_are_misses(self):
+        cache = self.cache(ttl_seconds=60)
+        cache.put('key', {'risk_status': 'Low Risk'})
+        self.now += timedelta(seconds=61)
+        self.assertIsNone(cache.get('key'))
+        stats = cache.stats()
+        self.assertEqual((stats['entries'], stats['misses'], stats['expirations']), (0, 1, 1))
+
+    def test_least_recently_used_entries_are_evicted_beyond_capacity(self):
+        cache = self.cache(max_entries=2)
+        for key in ['a', 'b']:
+            cache.put(key, {'key': key})
+            self.now += timedelta(seconds=1)
+        self.assertIsNotNone(cache.get('a'))
+        self.now += timedelta(seconds=1)
+        cache.put('c', {'key': 'c'})
+
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_counters_are_totals_over_processes(self):
+        first, second = self.cache(), self.cache()
+        first.put('key', {'risk_status': 'Low Risk'})
+        first.get('key')
+        second.get('key')
+        second.get('other')
+        # Counts stay in memory until a flush is due (or stats are read)
+        self.assertEqual(db.session.execute(db.text("SELECT COUNT(*) FROM analysis_cache_counters")).scalar(), 0)
+        first.flush()
+        stats = second.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+        self.assertAlmostEqual(stats['hit_rate'], 2 / 3)
+
+    def test_database_errors_act_as_a_miss(self):
+        cache = self.cache()
+        cache.put('key', {'risk_status': 'Low Risk'})
+        db.session.execute(db.text("DROP TABLE analysis_cache_entries"))
+        db.session.commit()
+        self.assertIsNone(cache.get('key'))
+        cache.put('key', {'risk_status': 'Low Risk'})
+        self.assertIsNone(cache.stats())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for the Local Brain linguist sync endpoint: full lists, deltas since a
+sync token and ETags, including profiles whose transaction committed late.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+# Add the current directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# A throwaway SQLite database unless DATABASE_URL points elsewhere
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test_linguist_sync.db')}")
+os.environ['UPLOAD_RECOVERY_INTERVAL_SECONDS'] = '0'
+
+from app import app
+from database import db, Organization, LinguistProfile
+
+
+class LinguistSyncTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.context = app.app_context()
+        self.context.push()
+        db.create_all()
+
+        organization = Organization()
+        organization.id = str(uuid.uuid4())
+        organization.name = "Sync Test Organization"
+        organization.api_key = f"sync-key-{organization.id}"
+        db.session.add(organization)
+        db.session.commit()
+        self.org_id, self.api_key = organization.id, organization.api_key
+        self.client = app.test_client()
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.add_profile('Ana', self.now - timedelta(hours=1))
+        self.add_profile('Ben', self.now)
+
+    def tearDown(self):
+        db.session.remove()
+        LinguistProfile.query.filter_by(organization_id=self.org_id).delete()
+        Organization.query.filter_by(id=self.org_id).delete()
+        db.session.commit()
+        self.context.pop()
+
+    def add_profile(self, name, updated_at):
+        profile = LinguistProfile()
+        profile.organization_id = self.org_id
+        profile.internal_id = name.lower()
+        profile.full_name = name
+        profile.source_languages = 'EN'
+        profile.target_languages = 'ES'
+        profile.updated_at = updated_at
+        db.session.add(profile)
+        db.session.commit()
+        return profile.id
+
+    def sync(self, **kwargs):
+        headers = {'X-API-Key': self.api_key}
+        if 'etag' in kwargs:
+            headers['If-None-Match'] = f'"{kwargs.pop("etag")}"'
+        return self.client.get(f'/api/organization-linguists/{self.org_id}', headers=headers, query_string=kwargs)
+
+    def test_full_sync_and_not_modified(self):
+        response = self.sync()
+        data = response.get_json()
+        self.assertTrue(data['full'])
+        self.assertEqual(sorted(l['full_name'] for l in data['linguists']), ['Ana', 'Ben'])
+        self.assertEqual(self.sync(etag=response.get_etag()[0]).status_code, 304)
+
+    def test_delta_returns_changed_profiles(self):
+        token = self.sync().get_json()['sync_token']
+        self.add_profile('Cleo', self.now + timedelta(seconds=5))
+        data = self.sync(since=token).get_json()
+        self.assertFalse(data['full'])
+        self.assertIn('Cleo', [l['full_name'] for l in data['linguists']])
+        self.assertNotIn('Ana', [l['full_name'] for l in data['linguists']])
+
+    def test_profiles_committed_late_reach_clients(self):
+        response = self.sync()
+        token, etag = response.get_json()['sync_token'], response.get_etag()[0]
+        # Written before the client's sync read Ben's timestamp, but committed after it
+        late_id = self.add_profile('Dana', self.now - timedelta(seconds=10))
+
+        response = self.sync(etag=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['sync_token'], token)
+        data = self.sync(since=token).get_json()
+        self.assertIn(late_id, [l['id'] for l in data['linguists']])
+        self.assertEqual(self.sync(etag=response.get_etag()[0]).status_code, 304)
+
+
+if __name__ == '__main__':
+    unittest.main()
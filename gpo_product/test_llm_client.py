@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared LLM client, run against a local stub of the Gemini REST API.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the current directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from llm_client import LLMClient, LLMUnavailable, CircuitBreaker
+
+
+class StubGemini(BaseHTTPRequestHandler):
+    """Answers generateContent with the next scripted (status, delay) from the server's queue"""
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with server.lock:
+            server.requests.append((self.path, self.headers, body))
+            status, delay = server.script.pop(0) if server.script else (200, 0)
+        server.release.wait(delay)
+        payload = {'candidates': [{'content': {'parts': [{'text': '{"risk_status": "Low Risk"}'}]}}]}
+        data = json.dumps(payload if status == 200 else {'error': {'code': status}}).encode()
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except OSError:
+            pass  # the client gave up waiting
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LLMClientTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubGemini)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.script = []
+        self.server.release = threading.Event()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def client(self, **kwargs):
+        kwargs.setdefault('sleep', lambda seconds: None)
+        return LLMClient('test-key', model='gemini-pro', base_url=self.base_url, **kwargs)
+
+    def test_generates_text(self):
+        text = self.client().generate('Assess this sample')
+        self.assertEqual(text, '{"risk_status": "Low Risk"}')
+        path, headers, body = self.server.requests[0]
+        self.assertEqual(path, '/v1beta/models/gemini-pro:generateContent')
+        self.assertEqual(headers['x-goog-api-key'], 'test-key')
+        self.assertEqual(body['contents'][0]['parts'][0]['text'], 'Assess this sample')
+
+    def test_connection_errors_do_not_reveal_the_api_key(self):
+        # Nothing listens on the port of a closed server
+        closed = ThreadingHTTPServer(('127.0.0.1', 0), StubGemini)
+        port = closed.server_address[1]
+        closed.server_close()
+        client = LLMClient('secret-key-123', base_url=f"http://127.0.0.1:{port}", max_attempts=2, sleep=lambda seconds: None)
+        with self.assertRaises(LLMUnavailable) as raised:
+            client.generate('prompt')
+        self.assertIn('ConnectionError', str(raised.exception))
+        self.assertNotIn('secret-key-123', str(raised.exception))
+
+    def test_retries_server_errors(self):
+        self.server.script = [(503, 0), (429, 0)]
+        client = self.client(max_attempts=3)
+        self.assertTrue(client.generate('prompt'))
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(client.breaker.state, 'closed')
+
+    def test_client_errors_are_not_retried(self):
+        self.server.script = [(400, 0)]
+        client = self.client(max_attempts=3, breaker=CircuitBreaker(failure_threshold=1))
+        with self.assertRaises(LLMUnavailable):
+            client.generate('prompt')
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(client.breaker.state, 'closed')
+
+    def test_slow_provider_hits_the_deadline_and_opens_the_circuit(self):
+        self.server.script = [(200, 5), (200, 5)]
+        client = self.client(max_attempts=1, deadline_seconds=0.3, breaker=CircuitBreaker(failure_threshold=2))
+        for _ in range(2):
+            started = time.monotonic()
+            with self.assertRaises(LLMUnavailable):
+                client.generate('prompt')
+            self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(client.breaker.state, 'open')
+        # While open, calls fail at once without reaching the provider
+        with self.assertRaises(LLMUnavailable):
+            client.generate('prompt')
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_half_open_trial_closes_the_circuit(self):
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30, clock=lambda: now[0])
+        self.server.script = [(500, 0)]
+        client = self.client(max_attempts=1, breaker=breaker)
+        with self.assertRaises(LLMUnavailable):
+            client.generate('prompt')
+        self.assertEqual(breaker.state, 'open')
+        now[0] = 31.0
+        self.assertEqual(breaker.state, 'half-open')
+        self.assertTrue(client.generate('prompt'))
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_concurrency_limit(self):
+        self.server.script = [(200, 5)]
+        client = self.client(max_concurrency=1, deadline_seconds=10)
+        results = []
+        first = threading.Thread(target=lambda: results.append(client.generate('first')))
+        first.start()
+        while not self.server.requests:
+            time.sleep(0.01)
+        # The only slot is taken: a second call waits for it and gives up at its own deadline
+        with self.assertRaises(LLMUnavailable):
+            client.generate('second', deadline_seconds=0.2)
+        self.assertEqual(len(self.server.requests), 1)
+        self.server.release.set()
+        first.join(5)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(client.breaker.state, 'closed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Tests for background processing of uploaded documents: the worker that counts
+words, recovery of documents whose worker went away, and the status endpoint
+the project page polls.
+"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+# Add the current directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# A throwaway SQLite database unless DATABASE_URL points elsewhere
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test_upload_processing.db')}")
+# Recovery is called directly by the tests, not from the background thread
+os.environ['UPLOAD_RECOVERY_INTERVAL_SECONDS'] = '0'
+
+import app as app_module
+from app import app, process_uploaded_document, recover_stale_uploads
+from database import db, Organization, User, Project, ProjectDocument
+import blob_store
+
+
+class UploadProcessingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.context = app.app_context()
+        self.context.push()
+        db.create_all()
+
+        self.org = Organization()
+        self.org.id = str(uuid.uuid4())
+        self.org.name = "Upload Test Organization"
+        db.session.add(self.org)
+        db.session.commit()
+
+        self.user = User()
+        self.user.id = str(uuid.uuid4())
+        self.user.email = f"upload-{self.user.id}@example.com"
+        self.user.name = "Upload Test User"
+        self.user.organization_id = self.org.id
+        self.user.role = "pm"
+        self.user.password_hash = "test_hash"
+        db.session.add(self.user)
+        db.session.commit()
+
+        self.project = Project()
+        self.project.id = str(uuid.uuid4())
+        self.project.client_name = "Test Client"
+        self.project.project_name = "Upload Test Project"
+        self.project.source_lang = "EN"
+        self.project.target_lang = "ES"
+        self.project.content_type = "Legal"
+        self.project.desired_deadline = datetime.now().date() + timedelta(days=30)
+        self.project.due_date = self.project.desired_deadline
+        self.project.language_pair = "EN-ES"
+        self.project.organization_id = self.org.id
+        self.project.created_by = self.user.id
+        self.project.initial_word_count = 0
+        db.session.add(self.project)
+        db.session.commit()
+
+        # Processing and recovery remove the session, so the tests keep plain ids
+        self.org_id, self.user_id, self.project_id = self.org.id, self.user.id, self.project.id
+
+    def tearDown(self):
+        db.session.remove()
+        project = Project.query.get(self.project_id)
+        for document in ProjectDocument.query.filter_by(project_id=self.project_id).all():
+            sha256 = document.blob_sha256
+            db.session.delete(document)
+            db.session.commit()
+            blob_store.release(sha256)
+        db.session.delete(project)
+        db.session.delete(User.query.get(self.user_id))
+        db.session.delete(Organization.query.get(self.org_id))
+        db.session.commit()
+        self.context.pop()
+
+    def upload(self, text, attempts=1, updated_at=None):
+        """A 'Processing' document for text, as upload_document leaves it"""
+        blob = blob_store.store(io.BytesIO(text.encode('utf-8')), app.config['BLOB_FOLDER'], '.txt')
+        document = ProjectDocument()
+        document.project_id = self.project_id
+        document.file_name = 'sample.txt'
+        document.file_path = blob.file_path
+        document.file_type = '.txt'
+        document.blob_sha256 = blob.sha256
+        document.word_count = 0
+        document.status = 'Processing'
+        document.processing_attempts = attempts
+        if updated_at is not None:
+            document.updated_at = updated_at
+        db.session.add(document)
+        db.session.commit()
+        return document.id
+
+    def document(self, document_id):
+        db.session.expire_all()
+        return ProjectDocument.query.get(document_id)
+
+    def test_processing_counts_words_once(self):
+        document_id = self.upload(f"one two three four five {uuid.uuid4()}")
+        process_uploaded_document(document_id)
+        # A second run (e.g. picked up again by recovery) finds the document done and changes nothing
+        process_uploaded_document(document_id)
+
+        document = self.document(document_id)
+        self.assertEqual(document.status, 'Processed')
+        self.assertEqual(document.word_count, 6)
+        self.assertEqual(Project.query.get(self.project_id).initial_word_count, 6)
+
+    def test_recovery_resubmits_stale_documents(self):
+        stale_at = datetime.utcnow() - timedelta(seconds=app_module.UPLOAD_PROCESSING_STALE_SECONDS + 60)
+        stale_id = self.upload(f"lost by its worker {uuid.uuid4()}", updated_at=stale_at)
+        fresh_id = self.upload(f"still being processed {uuid.uuid4()}")
+
+        submitted = []
+        resubmitted, failed = recover_stale_uploads(submit=lambda fn, *args: submitted.append((fn, args)))
+
+        self.assertIn(stale_id, resubmitted)
+        self.assertNotIn(fresh_id, resubmitted)
+        self.assertEqual(failed, [])
+        self.assertIn((process_uploaded_document, (stale_id,)), submitted)
+        self.assertEqual(self.document(stale_id).processing_attempts, 2)
+
+        # The claim moved updated_at forward, so the next check leaves the document alone
+        resubmitted, failed = recover_stale_uploads(submit=lambda fn, *args: submitted.append((fn, args)))
+        self.assertNotIn(stale_id, resubmitted)
+
+    def test_recovery_gives_up_after_max_attempts(self):
+        stale_at = datetime.utcnow() - timedelta(seconds=app_module.UPLOAD_PROCESSING_STALE_SECONDS + 60)
+        document_id = self.upload(f"fails every time {uuid.uuid4()}",
+                                  attempts=app_module.UPLOAD_PROCESSING_MAX_ATTEMPTS, updated_at=stale_at)
+
+        submitted = []
+        resubmitted, failed = recover_stale_uploads(submit=lambda fn, *args: submitted.append((fn, args)))
+
+        self.assertIn(document_id, failed)
+        self.assertEqual(submitted, [])
+        self.assertEqual(self.document(document_id).status, 'Failed')
+
+    def test_status_endpoint(self):
+        document_id = self.upload(f"status endpoint sample {uuid.uuid4()}")
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = self.user_id
+            session['_fresh'] = True
+
+        response = client.get(f'/project/{self.project_id}/documents/status')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertTrue(data['processing'])
+        self.assertEqual([d['status'] for d in data['documents']], ['Processing'])
+
+        process_uploaded_document(document_id)
+        db.session.expire_all()
+        data = client.get(f'/project/{self.project_id}/documents/status').get_json()
+        self.assertFalse(data['processing'])
+        self.assertEqual(data['documents'][0]['word_count'], 4)
+        self.assertEqual(data['initial_word_count'], 4)
+
+    def test_status_endpoint_hides_other_organizations_projects(self):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = self.user_id
+            session['_fresh'] = True
+
+        response = client.get(f'/project/{uuid.uuid4()}/documents/status')
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()